@@ -0,0 +1,70 @@
+"""
+Benchmark of the micro-batching consumer.
+
+Compares the throughput of consuming a queue item by item, with ``get()`` and ``task_done()`` per item,
+with the ``BatchConsumer`` of the ``common.pipeline`` module, that takes and acks the items in batches.
+The handler simulates a sink, that has a fixed cost per call, e.g. a round-trip to a database.
+
+Usage::
+
+    python benchmarks/bench_batching.py [number-of-items]
+"""
+import asyncio
+import sys
+import time
+from common.logger import get_logger
+from common.pipeline import BatchConsumer, StageQueue
+
+CALL_COST = 0.0001
+"""The simulated cost of a sink call in seconds"""
+
+
+async def sink(_items):
+    """Simulates a sink call"""
+    time.sleep(CALL_COST)
+
+
+async def produce(queue, items):
+    """Puts the items into the queue"""
+    for item in range(items):
+        await queue.put(item)
+
+
+async def per_item(items):
+    """Consumes the items one by one"""
+    queue = StageQueue(1000)
+
+    async def consume():
+        while True:
+            item = await queue.get()
+            await sink([item])
+            queue.task_done()
+
+    consumer = asyncio.create_task(consume())
+    await produce(queue, items)
+    await queue.join()
+    consumer.cancel()
+
+
+async def batched(items):
+    """Consumes the items in batches"""
+    queue = StageQueue(1000)
+    consumer = BatchConsumer(get_logger(), queue, sink, max_batch=100, max_latency_ms=5)
+    consumer.start()
+    await produce(queue, items)
+    await consumer.drain()
+
+
+def main():
+    """Runs the benchmark"""
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"Consuming {items} items, with {CALL_COST * 1e6:.0f} us cost per sink call")
+    for label, function in [("per item", per_item), ("BatchConsumer", batched)]:
+        started = time.perf_counter()
+        asyncio.run(function(items))
+        rate = items / (time.perf_counter() - started)
+        print(f"  {label:16} {rate:12.0f} items/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark of the config startup.
+
+Measures the time of creating a ``Config`` with hundreds of entries, and resolving the command-line
+parameters via ``apply_cli_args()``, that is the startup path of the ``application_entrypoint()``.
+The repeated calls of ``get_the_cli_args()`` reuse the cached CLI args parser.
+
+Usage::
+
+    python benchmarks/bench_config_startup.py [number-of-entries]
+"""
+import sys
+import time
+from common.config import Config, ConfigEntry, CliEntry
+
+
+def make_entries(count):
+    """Creates the given number of config entries of mixed kinds"""
+    entries = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            cli = CliEntry(short_flag=None, name=f"--param-{i}", entry_type=int)
+        elif kind == 1:
+            cli = CliEntry(short_flag=None, name=f"--param-{i}", action="store_true")
+        elif kind == 2:
+            cli = CliEntry(short_flag=None, name=f"--param-{i}", choices=["a", "b"])
+        else:
+            cli = None
+        entries.append(
+            ConfigEntry(
+                name=f"PARAM_{i}", help_text=f"Parameter {i}", default="0", cli=cli
+            )
+        )
+    return entries
+
+
+def measure(function, repeat):
+    """Calls the function repeatedly, and returns with the mean duration of a call in milliseconds"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    """Runs the benchmark"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    entries = make_entries(count)
+    argv = ["--param-0", "42", "--param-1", "--param-2", "b"]
+    print(f"Config startup with {count} entries")
+
+    def startup():
+        Config("bench", "Config startup benchmark", entries).apply_cli_args(argv)
+
+    config = Config("bench", "Config startup benchmark", entries)
+    config.get_the_cli_args(argv)
+
+    for label, function, repeat in [
+        ("Config() + apply_cli_args()", startup, 20),
+        ("cached get_the_cli_args()", lambda: config.get_the_cli_args(argv), 200),
+    ]:
+        print(f"  {label:28} {measure(function, repeat):10.3f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark of the JSON log formats.
+
+Compares the throughput of the compact JSON formatter of the ``common.logger`` module
+with the ``serialize=True`` option of loguru, that was used earlier for the ``json`` log format.
+
+Usage::
+
+    python benchmarks/bench_json_logging.py [number-of-records]
+"""
+import io
+import sys
+import time
+from loguru import logger
+from common.logger.logger import _json_format, orjson
+
+
+def measure(records, **sink_options):
+    """Logs the given number of records into a memory stream, and returns with the records/sec rate"""
+    logger.remove()
+    stream = io.StringIO()
+    logger.add(stream, level="INFO", **sink_options)
+    bound = logger.bind(request_id="c0ffee", user="someone")
+
+    started = time.perf_counter()
+    for i in range(records):
+        bound.info("Consumer {} got element <{}>", i % 8, "5f3a9b0c1d")
+    elapsed = time.perf_counter() - started
+
+    logger.remove()
+    return records / elapsed, len(stream.getvalue()) / records
+
+
+def main():
+    """Runs the benchmark"""
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"JSON logging of {records} records, orjson installed: {orjson is not None}")
+    for label, options in [
+        ("loguru serialize=True", {"serialize": True}),
+        ("compact JSON format", {"format": _json_format}),
+    ]:
+        rate, size = measure(records, **options)
+        print(f"  {label:24} {rate:12.0f} records/sec {size:8.1f} bytes/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,11 @@ The common packages is made of the following sub-modules:
     - *app*: A base class for generic, asynchronous applications with config, logging and graceful shut-down.
     - *config*: A configuration class, to collect and access to deployment-dependend configuration parameters.
     - *logger*: A simple, central logger used by the application.
+    - *metrics*: A metrics registry, that renders the metrics of the application in Prometheus text format.
+    - *pipeline*: A chain of processing stages, connected with bounded queues.
+    - *profiler*: A startup profiler, that measures the duration of the startup phases of the application.
 """
+# The profiler is imported first, to start the measurement of the imports
+from . import profiler
 
-__all__ = ["app", "config", "logger"]
+__all__ = ["app", "config", "logger", "metrics", "pipeline", "profiler"]
@@ -7,8 +7,22 @@ accompanied with the ``terminate()`` helper function that shuts the application
 The module also provides the ``application_entrypoint`` which implements a generic entrypoint to an application.
 It helps to significantly shorten the boilerplate, which every application needs to have.
 """
-from .app_base import ApplicationBase
-from .app_entrypoint import application_entrypoint
-from .app_terminate import terminate
+from typing import TYPE_CHECKING
+from ..lazy_import import lazy_attributes
+
+# The public names are imported on demand, see: common.lazy_import
+if TYPE_CHECKING:
+    from .app_base import ApplicationBase
+    from .app_entrypoint import application_entrypoint
+    from .app_terminate import terminate
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "ApplicationBase": ".app_base",
+        "application_entrypoint": ".app_entrypoint",
+        "terminate": ".app_terminate",
+    },
+)
 
 __all__ = ["app_base", "app_entrypoint"]
@@ -7,10 +7,28 @@ The application base class [1]_.
 """
 from abc import ABC, abstractmethod
 import asyncio
-from ..logger.logger import init_logger
-from .signals import DelayedKeyboardInterrupt, add_term_signal_handler
+import time
+from ..logger.logger import init_logger, flush_logger, get_dropped_count
+from ..metrics import MetricsRegistry, ProcessMetrics
+from ..profiler import startup_profiler
+from ..pipeline import Pipeline
+from ..config import ConfigError
+from ..config import config as config_module
+from .signals import (
+    SIGNAL_MODES,
+    DelayedKeyboardInterrupt,
+    add_term_signal_handler,
+    add_loop_term_signal_handler,
+    add_hup_signal_handler,
+    restore_hup_signal_handler,
+)
+from .event_loop import get_event_loop_factory
+from .loop_monitor import LoopLagMonitor
+from .config_reload import ConfigFileWatcher
+from .executors import ManagedExecutors
+from .supervisor import TaskSupervisor
+from .shutdown import ShutdownBudget
 from .app_terminate import terminate, TerminalException
-from .tests.exceptions import HealthCheckTestError
 
 
 class ApplicationBase(ABC):
@@ -28,7 +46,9 @@ class ApplicationBase(ABC):
     When you create a new instance of a derived application class, you are handing over the actual
     deployment-dependent configuration to it.
     The constructor of the base class stores this config, as well as it initializes the logger,
-    according to the configuration's ``LOG_LEVEL`` and ``LOG_FORMAT`` properties.
+    according to the configuration's ``LOG_LEVEL`` and ``LOG_FORMAT`` properties, and the optional
+    ``LOG_ASYNC``, ``LOG_QUEUE_SIZE`` and ``LOG_OVERFLOW`` properties of the asynchronous logging,
+    as well as the ``LOG_SAMPLE_RATE``, ``LOG_SAMPLE_RATE_LIMIT`` and ``LOG_SAMPLE_LEVEL`` properties of the sampling.
 
     Applications that are subclass of this base class must implement two ``async`` member functions:
     ``start()`` and ``stop()``.
@@ -50,6 +70,34 @@ class ApplicationBase(ABC):
     The default implementation of ``jobs()`` is empty. You can overload it with your implementation.
     It is also possible to execute the ``terminate()`` function at the end of the ``jobs()`` function,
     then the application will automatically shuts down, after finished the jobs.
+    The cooperative alternative is to ``await self.request_shutdown(reason, exit_code)``, then return from
+    the ``jobs()``: it does not raise an exception, so the other tasks are not interrupted, and the exit code
+    is returned by the ``run()`` function.
+
+    The application holds a metrics registry in its ``metrics`` property. It is preloaded with the default
+    process metrics, and the applications can register their own metrics into it.
+    If the health check is enabled, the metrics are served at the ``/metrics`` endpoint.
+
+    The configuration can be reloaded at runtime via the ``reload_config()`` function. If the ``CONFIG_RELOAD``
+    config parameter is true, the application reloads its configuration when it receives a ``SIGHUP`` signal,
+    and if ``CONFIG_RELOAD_INTERVAL`` is greater than zero, it polls the ``.env`` file for changes in every
+    ``CONFIG_RELOAD_INTERVAL`` seconds. The application can react to the changes via the callbacks
+    registered by the ``on_config_change()`` function.
+
+    The pipelines created by the ``create_pipeline()`` function are drained, before the ``stop()`` is called.
+
+    The blocking and the CPU-bound functions can be offloaded from the event loop to the thread pool
+    and the process pool of the application via the ``run_blocking()`` and ``run_cpu()`` functions.
+    The size of the pools is given by the ``THREAD_POOL_SIZE`` and ``PROCESS_POOL_SIZE`` config parameters.
+
+    The termination signals are handled according to the ``SIGNAL_MODE`` config parameter. In the ``exception``
+    mode (default) the signal handler calls ``terminate()``, that raises an exception in the frame being executed.
+    In the ``loop`` mode the event loop handles the signal, and the application leaves its wait loop normally,
+    so the running tasks are not interrupted in a random state. Any other value is refused with a ``ConfigError``.
+
+    The background tasks can be started under supervision via ``self.tasks.spawn()``, so they are restarted
+    if they fail, and cancelled in dependency order, when the application shuts down.
+    See also: :mod:`common.app.supervisor`.
     """
 
     def __init__(self, config):
@@ -58,15 +106,181 @@ class ApplicationBase(ABC):
 
         :param Config config: the configuration object of the overall application.
 
+        The application stores an immutable snapshot of the configuration in its ``config`` property,
+        see also: :class:`~common.config.config.ConfigSnapshot`.
+
         It creates an internal event-loop, that will be used to create and run the application's
         internal services, tasks.
+
+        :raises ConfigError: if the ``SIGNAL_MODE`` config parameter is not one of ``SIGNAL_MODES``.
         """
+        self._config_source = config if hasattr(config, "reload") else None
+        self._config_callbacks = {}
+        self._config_watcher = None
+        self._previous_hup_handler = None
         self._loop = None
         self._wait_event = None
         self._wait_task = None
-        self.logger = init_logger(config.get("LOG_LEVEL"), config.get("LOG_FORMAT"))
-        self.config = config
+        self._shutdown_requested = False
+        self._shutdown_budget = None
+        self.exit_code = 0
+        self.work_abandoned = False
+        self.worker_id = None
+        self.config = config.snapshot()
+        self._signal_mode = self.config.get("SIGNAL_MODE") or "exception"
+        if self._signal_mode not in SIGNAL_MODES:
+            raise ConfigError(
+                [
+                    f"SIGNAL_MODE: '{self._signal_mode}' is not one of {list(SIGNAL_MODES)}"
+                ]
+            )
+        with startup_profiler.phase("init_logger"):
+            self.logger = self._init_logger()
         self.health_check = HealthCheckMock(self.logger)
+        self.metrics = MetricsRegistry()
+        self._process_metrics = ProcessMetrics(self.metrics)
+        self.metrics.gauge(
+            "log_records_dropped",
+            "The number of log records dropped because the log queue was full",
+        ).set_function(get_dropped_count)
+        self._loop_monitor = None
+        self.pipelines = []
+        self.tasks = TaskSupervisor(
+            self.logger, self.metrics, health_check=self.health_check
+        )
+        thread_pool_size = self.config.get("THREAD_POOL_SIZE")
+        process_pool_size = self.config.get("PROCESS_POOL_SIZE")
+        self.executors = ManagedExecutors(
+            self.logger,
+            self.metrics,
+            thread_pool_size=None
+            if thread_pool_size is None
+            else int(thread_pool_size),
+            process_pool_size=None
+            if process_pool_size is None
+            else int(process_pool_size),
+        )
+
+    def _init_logger(self):
+        """
+        Initializes the logger according to the ``LOG_*`` config parameters.
+        """
+        return init_logger(
+            self.config.get("LOG_LEVEL"),
+            self.config.get("LOG_FORMAT"),
+            log_async=self.config.get("LOG_ASYNC"),
+            queue_size=self.config.get("LOG_QUEUE_SIZE"),
+            overflow=self.config.get("LOG_OVERFLOW"),
+            sample_rate=self.config.get("LOG_SAMPLE_RATE"),
+            rate_limit=self.config.get("LOG_SAMPLE_RATE_LIMIT"),
+            sample_level=self.config.get("LOG_SAMPLE_LEVEL"),
+        )
+
+    def on_config_change(self, name, callback):
+        """
+        Registers a callback, that is called when the value of a config parameter changes by a reload.
+
+        :param str name: The name of the config parameter.
+        :param callback: An async function, that is called with the ``(name, old_value, new_value)`` arguments.
+        """
+        self._config_callbacks.setdefault(name, []).append(callback)
+
+    async def reload_config(self):
+        """
+        Reloads the configuration.
+
+        It re-resolves the config parameters from the ``.env`` file, the environment and the command-line,
+        then replaces the ``config`` property with a new snapshot.
+        If any of the ``LOG_*`` parameters has changed, the logger is re-initialized.
+        Finally, it calls the callbacks registered to the changed parameters via ``on_config_change()``.
+
+        If the new config parameters are invalid, the error is logged, and the application keeps its actual config.
+
+        :return dict: The ``(old value, new value)`` pairs of the changed parameters by their names.
+        """
+        if self._config_source is None:
+            self.logger.warning(
+                "Application.reload_config: the config can not be reloaded"
+            )
+            return {}
+
+        try:
+            self._config_source.reload()
+        except ConfigError as err:
+            self.logger.error("Application.reload_config: {}", err)
+            return {}
+
+        old_config = self.config
+        self.config = self._config_source.snapshot()
+        changes = {
+            name: (old_value, self.config.get(name))
+            for name, old_value in old_config.items()
+            if self.config.get(name) != old_value
+        }
+        if not changes:
+            self.logger.info("Application.reload_config: the config has not changed")
+            return changes
+
+        self.logger.info(
+            "Application.reload_config: changed parameters: {}", ", ".join(changes)
+        )
+        if any(name.startswith("LOG_") for name in changes):
+            self.logger = self._init_logger()
+
+        for name, (old_value, new_value) in changes.items():
+            for callback in self._config_callbacks.get(name, []):
+                await callback(name, old_value, new_value)
+
+        return changes
+
+    def create_pipeline(self, name):
+        """
+        Creates a new pipeline, that is drained automatically, when the application shuts down.
+
+        The pipeline records its metrics into the ``metrics`` registry of the application.
+        The drain of all the pipelines together may take at most ``PIPELINE_DRAIN_TIMEOUT`` seconds (default: 30).
+        See also: :mod:`common.pipeline.pipeline`.
+
+        :param str name: The name of the pipeline.
+
+        :return Pipeline: The new pipeline. Add its stages, then start it.
+        """
+        pipeline = Pipeline(self.logger, name, metrics=self.metrics)
+        self.pipelines.append(pipeline)
+        return pipeline
+
+    async def _drain_pipelines(self, budget=None):
+        """
+        Drains the started pipelines, in the order of their creation
+
+        The pipelines share a single deadline, each one gets the time remaining from it.
+
+        :param float budget: The time in seconds, the drain of all the pipelines can take, if given.
+        """
+        timeout = self.config.get("PIPELINE_DRAIN_TIMEOUT")
+        timeout = 30.0 if timeout is None else float(timeout)
+        if budget is not None:
+            timeout = min(timeout, budget)
+        deadline = time.monotonic() + timeout
+        for pipeline in self.pipelines:
+            if pipeline.started:
+                self.logger.info("Application: draining the {} pipeline", pipeline.name)
+                await pipeline.drain(max(0.0, deadline - time.monotonic()))
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """
+        Runs a blocking function in the thread pool of the application, and returns with its result.
+        See also: :mod:`common.app.executors`.
+        """
+        return await self.executors.run_blocking(func, *args, **kwargs)
+
+    async def run_cpu(self, func, *args, **kwargs):
+        """
+        Runs a CPU-bound function in the process pool of the application, and returns with its result.
+        The function and its arguments must be picklable.
+        See also: :mod:`common.app.executors`.
+        """
+        return await self.executors.run_cpu(func, *args, **kwargs)
 
     async def jobs(self):
         """
@@ -84,8 +298,20 @@ class ApplicationBase(ABC):
            an unhandled interruption occur, or the application receives a signal for stopping.
         4. Shuts down the internal services according to the implementation of the ``stop()`` function.
         5. Exits.
+
+        The event loop is created by the factory selected via the ``EVENT_LOOP`` config parameter.
+        See also: :mod:`common.app.event_loop`.
+
+        :return: The exit code of the application: ``0`` if it was shut down normally,
+            ``1`` if it was shut down because of an unhandled error.
         """
-        self._loop = asyncio.new_event_loop()
+        loop_factory = get_event_loop_factory(
+            self.logger, self.config.get("EVENT_LOOP")
+        )
+        self._loop = loop_factory()
+        asyncio.set_event_loop(self._loop)
+        self._loop.set_default_executor(self.executors.thread_pool)
+        self._process_metrics.install(self._loop)
 
         try:
             # Shield start() from termination.
@@ -107,10 +333,28 @@ class ApplicationBase(ABC):
                 self.logger.info("Application.run: got KeyboardInterrupt during start")
                 raise
 
-            def signal_cb():
-                terminate()
+            if self._signal_mode == "loop":
+                add_loop_term_signal_handler(
+                    self.logger, self._loop, self._request_stop
+                )
+            else:
+
+                def signal_cb():
+                    terminate()
 
-            add_term_signal_handler(self.logger, signal_cb)
+                add_term_signal_handler(self.logger, signal_cb)
+
+            if self.config.get("CONFIG_RELOAD"):
+                loop = self._loop
+
+                def reload_cb():
+                    loop.call_soon_threadsafe(
+                        lambda: loop.create_task(self.reload_config())
+                    )
+
+                self._previous_hup_handler = add_hup_signal_handler(
+                    self.logger, reload_cb
+                )
 
             # Application is started now and is running.
             # Wait for a termination event infinitely.
@@ -118,28 +362,28 @@ class ApplicationBase(ABC):
             self._wait()
             self.logger.info("Application.run: exiting wait loop")
 
-        # Raise error when test_health_check fails
-        except HealthCheckTestError as err:
-            raise HealthCheckTestError(err) from err
         # Any unhandled exception occurs, the application will terminate
         # Log all exceptions except TerminalException
         except TerminalException:
-            # The stop() is also shielded from termination.
-            try:
-                with DelayedKeyboardInterrupt(self.logger):
-                    self._stop()
-            except KeyboardInterrupt:
-                self.logger.info("Application.run: got KeyboardInterrupt during stop")
+            pass
         except BaseException as err:
-            # The stop() is also shielded from termination.
-            try:
-                self.logger.opt(exception=True).error(
-                    f"An error occurred, application shuts down: {err}"
-                )
+            self.exit_code = 1
+            self.logger.opt(exception=True).error(
+                "An error occurred, application shuts down: {}", err
+            )
+
+        # The stop() is also shielded from termination.
+        # In the loop mode the signal handlers of the event loop are kept, they do not interrupt the stop().
+        try:
+            if self._signal_mode == "loop":
+                self._stop()
+            else:
                 with DelayedKeyboardInterrupt(self.logger):
                     self._stop()
-            except KeyboardInterrupt:
-                self.logger.info("Application.run: got KeyboardInterrupt during stop")
+        except KeyboardInterrupt:
+            self.logger.info("Application.run: got KeyboardInterrupt during stop")
+
+        return self.exit_code
 
     @abstractmethod
     async def start(self):
@@ -166,27 +410,273 @@ class ApplicationBase(ABC):
         """
 
     # pylint: disable=import-outside-toplevel
+    def _health_check_options(self):
+        """
+        Returns with the binding options of the health check web service from the configuration
+
+        In a worker process the path of the Unix domain socket is suffixed with the id of the worker,
+        so the workers do not remove the sockets of each other.
+        """
+        reuse_port = self.config.get("HEALTH_CHECK_REUSE_PORT")
+        if reuse_port is None:
+            # The worker processes share the port by default
+            reuse_port = int(self.config.get("WORKERS") or 1) > 1
+        socket_path = self.config.get("HEALTH_CHECK_SOCKET")
+        if socket_path and self.worker_id is not None:
+            socket_path = f"{socket_path}.{self.worker_id}"
+        backlog = self.config.get("HEALTH_CHECK_BACKLOG")
+        keepalive_timeout = self.config.get("HEALTH_CHECK_KEEPALIVE_TIMEOUT")
+        return {
+            "socket_path": socket_path,
+            "reuse_port": bool(reuse_port),
+            "backlog": 128 if backlog is None else int(backlog),
+            "keepalive_timeout": (
+                75.0 if keepalive_timeout is None else float(keepalive_timeout)
+            ),
+        }
+
     def _start(self):
         """
         Start health check web service if it is required and then run the application
         """
         if self.config.get("HEALTH_CHECK"):
-            # The HealthCheck import must be here (after/in the 'with DelayedKeyboardInterrupt(self.logger)' line) so
-            # that KeyboardInterrupt can be handled during start
-            from .health_check import HealthCheck
+            with startup_profiler.phase("health_check"):
+                # The HealthCheck import must be here (after/in the 'with DelayedKeyboardInterrupt(self.logger)' line)
+                # so that KeyboardInterrupt can be handled during start
+                from .health_check import HealthCheck
+
+                self.health_check = HealthCheck(
+                    self.logger,
+                    self.config.app_name,
+                    self.config.get("HEALTH_CHECK_HOST"),
+                    self.config.get("HEALTH_CHECK_PORT"),
+                    metrics=self.metrics,
+                    **self._health_check_options(),
+                )
+                self._loop.run_until_complete(self.health_check.run_server())
+            self.tasks.health_check = self.health_check
+
+        self._start_loop_monitor()
+        self._start_config_watcher()
+        with startup_profiler.phase("start"):
+            self._loop.run_until_complete(self.start())
+        startup_profiler.report(self.logger)
 
-            self.health_check = HealthCheck(
+    def _start_config_watcher(self):
+        """
+        Start polling the ``.env`` file for changes, if ``CONFIG_RELOAD_INTERVAL`` is greater than zero.
+        See also: :mod:`common.app.config_reload`.
+        """
+        interval = float(self.config.get("CONFIG_RELOAD_INTERVAL") or 0)
+        if interval <= 0 or self._config_source is None:
+            return
+
+        self._config_watcher = ConfigFileWatcher(
+            self.logger, config_module.DOTENV_PATH, interval, self.reload_config
+        )
+        self._config_watcher.start(self._loop)
+
+    def _start_loop_monitor(self):
+        """
+        Start the event loop lag monitor, unless it is disabled by setting ``LOOP_MONITOR_INTERVAL`` to zero.
+        See also: :mod:`common.app.loop_monitor`.
+        """
+        interval = self.config.get("LOOP_MONITOR_INTERVAL")
+        interval = 0.5 if interval is None else float(interval)
+        if interval <= 0:
+            return
+
+        threshold = self.config.get("LOOP_MONITOR_THRESHOLD")
+        slow_callback_duration = self.config.get("LOOP_MONITOR_SLOW_CALLBACK")
+        self._loop_monitor = LoopLagMonitor(
+            self.logger,
+            self.metrics,
+            self.health_check,
+            interval=interval,
+            window=int(self.config.get("LOOP_MONITOR_WINDOW") or 120),
+            threshold=None if threshold is None else float(threshold),
+            slow_callback_duration=None
+            if slow_callback_duration is None
+            else float(slow_callback_duration),
+        )
+        self._loop_monitor.start(self._loop)
+
+    def _run_phase(self, name, coro, timeout):
+        """
+        Runs a coroutine of a shutdown phase until it completes, or its timeout is elapsed.
+
+        The task of a timed out phase is left running: it is cancelled in the ``cancel`` phase,
+        together with the other remaining tasks, so a task that suppresses the cancellation
+        can not hang the shutdown.
+
+        If the coroutine raises an exception, it is logged, the exit code is set to ``1``,
+        and the shutdown continues with the next phase.
+        """
+        task = self._loop.create_task(coro)
+        done, _ = self._loop.run_until_complete(asyncio.wait({task}, timeout=timeout))
+        if not done:
+            self.logger.warning(
+                "Application._stop: the {} phase timed out after {:0.3f} seconds",
+                name,
+                timeout,
+            )
+        elif not task.cancelled() and task.exception() is not None:
+            self.exit_code = 1
+            self.logger.opt(exception=task.exception()).error(
+                "Application._stop: the {} phase failed: {}", name, task.exception()
+            )
+
+    def _stop(self):
+        """
+        Shuts down the application in phases, within the ``SHUTDOWN_TIMEOUT`` budget.
+        See also: :mod:`common.app.shutdown`.
+        """
+        budget = self._get_shutdown_budget()
+
+        try:
+            if not self._shutdown_requested:
+                with budget.phase("health"):
+                    self._set_state_shut_down()
+
+            with budget.phase("intake") as timeout:
+                if self._config_watcher is not None:
+                    self._config_watcher.stop()
+
+                if self._loop_monitor is not None:
+                    self._loop_monitor.stop()
+
+                # The supervised tasks are cancelled first, because they usually feed the pipelines.
+                self._run_phase("intake", self.tasks.shutdown(timeout), timeout)
+
+            with budget.phase("drain") as timeout:
+                # The pipelines are drained before the stop(), so their handlers can still use the resources of the application
+                self._run_phase("drain", self._drain_pipelines(timeout), timeout)
+
+            with budget.phase("stop") as timeout:
+                self._run_phase("stop", self._stop_and_wait(), timeout)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            self.exit_code = 1
+            self.logger.opt(exception=True).error(
+                "Application._stop: the shutdown failed: {}", err
+            )
+        finally:
+            # The remaining tasks are cancelled, and the loop is closed, even if an earlier phase failed.
+            #
+            # Before the loop is finalized, we setup an exception handler that
+            # suppresses several nasty exceptions.
+            #
+            # ConnectionResetError
+            # --------------------
+            # This exception is sometimes raised on Windows, possibly because of a bug in Python.
+            #
+            # ref: https://bugs.python.org/issue39010
+            #
+            # When this exception is raised, the context looks like this:
+            # context = {
+            #     'message': 'Error on reading from the event loop self pipe',
+            #     'exception': ConnectionResetError(
+            #         22, 'The I/O operation has been aborted because of either a thread exit or an application request',
+            #         None, 995, None
+            #       ),
+            #     'loop': <ProactorEventLoop running=True closed=False debug=False>
+            # }
+            #
+            # OSError
+            # -------
+            # This exception is sometimes raised on Windows - usually when application is
+            # interrupted early after start.
+            #
+            # When this exception is raised, the context looks like this:
+            # context = {
+            #     'message': 'Cancelling an overlapped future failed',
+            #     'exception': OSError(9, 'The handle is invalid', None, 6, None),
+            #     'future': <_OverlappedFuture pending overlapped=<pending, 0x1d8937601f0>
+            #                 cb=[BaseProactorEventLoop._loop_self_reading()]>,
+            # }
+            #
+
+            def __loop_exception_handler(_, context):
+                # Not every loop implementation puts an exception into the context
+                if isinstance(context.get("exception"), ConnectionResetError):
+                    self.logger.info(
+                        "Application._stop.__loop_exception_handler: suppressing ConnectionResetError"
+                    )
+                elif isinstance(context.get("exception"), OSError):
+                    self.logger.info(
+                        "Application._stop.__loop_exception_handler: suppressing OSError"
+                    )
+                else:
+                    self.logger.info(
+                        "Application._stop.__loop_exception_handler: unhandled exception: {}",
+                        context,
+                    )
+
+            self._loop.set_exception_handler(__loop_exception_handler)
+
+            try:
+                with budget.phase("cancel") as timeout:
+                    # Cancel all remaining uncompleted tasks.
+                    # We should strive to not make any, but mistakes happen and laziness
+                    # is also a thing.
+                    #
+                    # Generally speaking, cancelling tasks shouldn't do any harm (unless
+                    # they do...).
+                    self._cancel_all_tasks(timeout)
+            finally:
+                with budget.phase("close") as timeout:
+                    # The health check serves the failing readiness probe until this point
+                    self._run_phase("close", self.health_check.stop_server(), timeout)
+
+                    # Shutdown all active asynchronous generators.
+                    self._run_phase(
+                        "close", self._loop.shutdown_asyncgens(), budget.remaining()
+                    )
+
+                    # Wait for the running tasks of the executors, first the thread pool, then the process pool
+                    if not self.executors.shutdown(budget.remaining()):
+                        self.work_abandoned = True
+
+                    # The SIGHUP handler schedules the reload on the loop, so it is restored before the loop is closed
+                    restore_hup_signal_handler(self._previous_hup_handler)
+                    self._previous_hup_handler = None
+
+                    # ... and close the loop.
+                    self.logger.info("Application._stop: closing event loop")
+                    self._process_metrics.uninstall()
+                    self._loop.close()
+                    asyncio.set_event_loop(None)
+
+                budget.report()
+
+                # Make sure the asynchronously written log records reach the output
+                flush_logger()
+
+    def _get_shutdown_budget(self):
+        """
+        Returns with the budget of the shutdown. It is started, when the shutdown is requested,
+        or when the ``_stop()`` is called, whichever comes first.
+        """
+        if self._shutdown_budget is None:
+            shutdown_timeout = self.config.get("SHUTDOWN_TIMEOUT")
+            self._shutdown_budget = ShutdownBudget(
                 self.logger,
-                self.config.app_name,
-                self.config.get("HEALTH_CHECK_HOST"),
-                self.config.get("HEALTH_CHECK_PORT"),
+                None if shutdown_timeout is None else float(shutdown_timeout),
             )
-            self._loop.run_until_complete(self.health_check.run_server())
+        return self._shutdown_budget
 
-        self._loop.run_until_complete(self.start())
+    def _set_state_shut_down(self):
+        """
+        Stops the component checks, and flips the health state to 'Shutting down', so the readiness probe fails
+        """
+        self.health_check.stop_checks()
+        if not isinstance(self.health_check, HealthCheckMock):
+            self.health_check.set_state_shut_down()
 
-    def _stop(self):
-        self._loop.run_until_complete(self.stop())
+    async def _stop_and_wait(self):
+        """
+        Calls the stop() of the application, then waits for the completion of the wait task
+        """
+        await self.stop()
 
         # Because we want clean exit, we patiently wait for completion
         # of the _wait_task (otherwise this task might get cancelled
@@ -201,87 +691,94 @@ class ApplicationBase(ABC):
             self._wait_event.set()
 
         if self._wait_task:
-            self._loop.run_until_complete(self._wait_task)
+            await self._wait_task
 
-        #
-        # Before the loop is finalized, we setup an exception handler that
-        # suppresses several nasty exceptions.
-        #
-        # ConnectionResetError
-        # --------------------
-        # This exception is sometimes raised on Windows, possibly because of a bug in Python.
-        #
-        # ref: https://bugs.python.org/issue39010
-        #
-        # When this exception is raised, the context looks like this:
-        # context = {
-        #     'message': 'Error on reading from the event loop self pipe',
-        #     'exception': ConnectionResetError(
-        #         22, 'The I/O operation has been aborted because of either a thread exit or an application request',
-        #         None, 995, None
-        #       ),
-        #     'loop': <ProactorEventLoop running=True closed=False debug=False>
-        # }
-        #
-        # OSError
-        # -------
-        # This exception is sometimes raised on Windows - usually when application is
-        # interrupted early after start.
-        #
-        # When this exception is raised, the context looks like this:
-        # context = {
-        #     'message': 'Cancelling an overlapped future failed',
-        #     'exception': OSError(9, 'The handle is invalid', None, 6, None),
-        #     'future': <_OverlappedFuture pending overlapped=<pending, 0x1d8937601f0>
-        #                 cb=[BaseProactorEventLoop._loop_self_reading()]>,
-        # }
-        #
+    async def request_shutdown(self, reason=None, exit_code=0):
+        """
+        Requests the graceful shutdown of the application, without raising an exception
 
-        def __loop_exception_handler(_, context):
-            if isinstance(context["exception"], ConnectionResetError):
-                self.logger.info(
-                    "Application._stop.__loop_exception_handler: suppressing ConnectionResetError"
-                )
-            elif isinstance(context["exception"], OSError):
-                self.logger.info(
-                    "Application._stop.__loop_exception_handler: suppressing OSError"
-                )
-            else:
-                self.logger.info(
-                    f"Application._stop.__loop_exception_handler: unhandled exception: {context}"
-                )
+        The application leaves its wait loop, as soon as the ``jobs()`` returns, then it shuts down,
+        and the ``run()`` returns with the given exit code. The ``jobs()`` is not cancelled, it can finish
+        its work, but it is waited for at most the drain budget (see: :meth:`_jobs_timeout`).
+        The ``SHUTDOWN_TIMEOUT`` budget starts, and the health state is flipped to 'Shutting down', when the request arrives.
+        If the shutdown has already been requested, the reason and the exit code of the first request are kept.
 
-        self._loop.set_exception_handler(__loop_exception_handler)
+        :param str reason: The reason of the shutdown, that is logged.
+        :param int exit_code: The exit code of the application.
+        """
+        if self._wait_event is not None and self._wait_event.is_set():
+            self.logger.debug(
+                "Application.request_shutdown: already requested, ignoring: {}", reason
+            )
+            return
 
-        try:
-            # Cancel all remaining uncompleted tasks.
-            # We should strive to not make any, but mistakes happen and laziness
-            # is also a thing.
-            #
-            # Generally speaking, cancelling tasks shouldn't do any harm (unless
-            # they do...).
-            self._cancel_all_tasks()
+        self.logger.info(
+            "Application.request_shutdown: {}, exit code: {}", reason, exit_code
+        )
+        self.exit_code = exit_code
+        self._shutdown_requested = True
+        with self._get_shutdown_budget().phase("health"):
+            self._set_state_shut_down()
+        self._request_stop()
 
-            # Shutdown all active asynchronous generators.
-            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
-        finally:
-            # ... and close the loop.
-            self.logger.info("Application._stop: closing event loop")
-            self._loop.close()
+    def _request_stop(self):
+        """
+        Sets the wait event, so the application leaves its wait loop, and shuts down without an exception
+        """
+        if self._wait_event is None:
+            self._wait_event = asyncio.Event()
+        self._wait_event.set()
 
     async def wait(self):
         """
         Wait until the application got stop signal
+
+        The wait ends, when the ``jobs()`` raises an exception, e.g. by calling ``terminate()``,
+        or when the wait event is set. If the event was set by ``request_shutdown()``, the ``jobs()``
+        can finish its work within the drain budget. If it was set by a termination signal in the ``loop``
+        signal mode, or the ``jobs()`` does not finish in time, the ``jobs()`` is cancelled.
         """
-        self._wait_event = asyncio.Event()
+        if self._wait_event is None:
+            self._wait_event = asyncio.Event()
         self._wait_task = asyncio.create_task(self._wait_event.wait())
-        await asyncio.gather(self.jobs(), self._wait_task)
-        # await self._wait_task
+        jobs_task = asyncio.ensure_future(self.jobs())
+        await asyncio.wait(
+            [jobs_task, self._wait_task], return_when=asyncio.FIRST_COMPLETED
+        )
+        if not jobs_task.done() and self._shutdown_requested:
+            timeout = self._jobs_timeout()
+            await asyncio.wait([jobs_task], timeout=timeout)
+            if not jobs_task.done():
+                self.logger.warning(
+                    "Application.wait: the jobs did not finish in {:0.3f} seconds after the shutdown was requested",
+                    timeout,
+                )
+
+        if jobs_task.done():
+            # Raises the exception of the jobs, if any
+            jobs_task.result()
+            await self._wait_task
+        else:
+            jobs_task.cancel()
+            await asyncio.wait([jobs_task])
+
+    def _jobs_timeout(self):
+        """
+        Returns with the time in seconds, the ``jobs()`` can take after the shutdown was requested:
+        the ``PIPELINE_DRAIN_TIMEOUT`` (default: 30), but at most the time of the drain phase left
+        from the shutdown budget, if the ``SHUTDOWN_TIMEOUT`` is set.
+        """
+        timeout = self.config.get("PIPELINE_DRAIN_TIMEOUT")
+        timeout = 30.0 if timeout is None else float(timeout)
+        budget_timeout = self._get_shutdown_budget().timeout("drain")
+        if budget_timeout is not None:
+            timeout = min(timeout, budget_timeout)
+        return timeout
 
     def _wait(self):
         self._loop.run_until_complete(self.wait())
 
-    def _cancel_all_tasks(self):
+    def _cancel_all_tasks(self, timeout=None):
         """
         Cancel all tasks in the loop.
 
@@ -295,7 +792,7 @@ class ApplicationBase(ABC):
         >>> except asyncio.CancelledError:
         >>>     await asyncio.Event().wait()
 
-        ... then the loop doesn't ever finish.
+        ... then the loop doesn't ever finish, unless a timeout is given.
         """
 
         #
@@ -304,7 +801,7 @@ class ApplicationBase(ABC):
 
         to_cancel = asyncio.tasks.all_tasks(self._loop)
         self.logger.info(
-            f"Application._cancel_all_tasks: cancelling {len(to_cancel)} tasks ..."
+            "Application._cancel_all_tasks: cancelling {} tasks ...", len(to_cancel)
         )
 
         if not to_cancel:
@@ -313,11 +810,18 @@ class ApplicationBase(ABC):
         for task in to_cancel:
             task.cancel()
 
-        self._loop.run_until_complete(
-            asyncio.tasks.gather(*to_cancel, return_exceptions=True)
+        _, pending = self._loop.run_until_complete(
+            asyncio.wait(to_cancel, timeout=timeout)
         )
+        if pending:
+            self.logger.warning(
+                "Application._cancel_all_tasks: {} tasks did not finish in {:0.3f} seconds: {}",
+                len(pending),
+                timeout,
+                sorted(task.get_name() for task in pending),
+            )
 
-        for task in to_cancel:
+        for task in to_cancel - pending:
             if task.cancelled():
                 continue
 
@@ -333,7 +837,7 @@ class ApplicationBase(ABC):
 
 class HealthCheckMock:
     """
-    Mock class of HealthCheck to swallow the set_state_* calls
+    Mock class of HealthCheck to swallow the set_state_*, degrade, recover, add_check and stop_server calls
     """
 
     def __init__(self, logger):
@@ -351,6 +855,12 @@ class HealthCheckMock:
             "An attempt was made to set service state but health check is not running"
         )
 
+    def set_state_degraded(self):
+        """Mock set_state_degraded method"""
+        self.logger.warning(
+            "An attempt was made to set service state but health check is not running"
+        )
+
     def set_state_shut_down(self):
         """Mock set_state_shut_down method"""
         self.logger.warning(
@@ -362,3 +872,24 @@ class HealthCheckMock:
         self.logger.warning(
             "An attempt was made to set service state but health check is not running"
         )
+
+    def add_check(self, name, _check, **_kwargs):
+        """Mock add_check method"""
+        self.logger.debug(
+            "The {} health check is not run, because health check is not running",
+            name,
+        )
+
+    def stop_checks(self):
+        """Mock stop_checks method"""
+
+    async def stop_server(self):
+        """Mock stop_server method"""
+
+    def degrade(self, _reason):
+        """Mock degrade method"""
+        return False
+
+    def recover(self, _reason):
+        """Mock recover method"""
+        return False
@@ -1,8 +1,11 @@
 """
 The boilerplate implementation of an application
 """
+import os
 import sys
 from common.config import Config
+from common.logger import flush_logger, init_logger
+from common.profiler import startup_profiler
 
 
 def application_entrypoint(application_class, config: Config, argv=None):
@@ -19,6 +22,15 @@ def application_entrypoint(application_class, config: Config, argv=None):
     :param Array argv: The array of CLI arguments. If not defined or ``None``,
         then the ``sys.argv[1:]`` will be used instead.
 
+    :return: The exit code of the application.
+
+    If the running tasks of the executors were abandoned, because the shutdown budget ran out,
+    the process exits immediately with the exit code, instead of returning it, so the exit hooks
+    do not wait for the abandoned threads. See also: :mod:`common.app.executors`.
+
+    If the ``WORKERS`` config parameter is greater than one, then the application runs in a pool of
+    forked worker processes. See also: :mod:`common.app.workers`.
+
     Example of usage:
 
     .. highlight:: python
@@ -27,6 +39,7 @@ def application_entrypoint(application_class, config: Config, argv=None):
         #!/usr/bin/env python
         # -*- coding: utf-8 -*-
         '''The main entry-point of the application.'''
+        import sys
         from common.app import application_entrypoint
         from config import config
         from app import Application
@@ -34,23 +47,44 @@ def application_entrypoint(application_class, config: Config, argv=None):
 
         def main():
             '''The main entry point of the application'''
-            application_entrypoint(Application, config)
+            sys.exit(application_entrypoint(Application, config))
 
 
         if __name__ == "__main__":
             main()
     """
     # Parses the CLI arguments, and merge them into the configuration
-    if argv is None:
-        config.apply_cli_args(sys.argv[1:])
-    else:
-        config.apply_cli_args(argv)
+    with startup_profiler.phase("config"):
+        config.apply_cli_args(sys.argv[1:] if argv is None else argv)
 
     if config.get("DUMP_CONFIG"):
         config.dump()
 
+    workers = int(config.get("WORKERS") or 1)
+    if workers > 1:
+        # pylint: disable=import-outside-toplevel
+        from .workers import WorkerSupervisor
+
+        logger = init_logger(config.get("LOG_LEVEL"), config.get("LOG_FORMAT"))
+        supervisor = WorkerSupervisor(
+            logger,
+            application_class,
+            config,
+            workers,
+            float(config.get("WORKER_RESTART_DELAY") or 1.0),
+            max_restart_delay=float(config.get("WORKER_MAX_RESTART_DELAY") or 30.0),
+            max_restarts=int(config.get("WORKER_MAX_RESTARTS") or 5),
+            restart_window=float(config.get("WORKER_RESTART_WINDOW") or 60.0),
+        )
+        return supervisor.run()
+
     # Create an application instance
     app = application_class(config)
 
     # Run the application until a shutdown signal arrives
-    app.run()
+    exit_code = app.run()
+    if app.work_abandoned:
+        # The exit hooks of concurrent.futures would join the abandoned threads
+        flush_logger()
+        os._exit(exit_code)  # pylint: disable=protected-access
+    return exit_code
@@ -16,6 +16,9 @@ def terminate():
     Terminator function.
 
     Its call will kill the application.
+
+    It raises an exception in the frame, that calls it. Inside the application, prefer the cooperative
+    :meth:`~common.app.app_base.ApplicationBase.request_shutdown` function, that does not unwind the stack.
     """
     get_logger().info("Terminate the application")
     raise TerminalException
@@ -0,0 +1,68 @@
+"""
+Config file watcher module.
+
+The ``ConfigFileWatcher`` polls the modification time of the ``.env`` file, and calls back
+the application to reload its configuration, when the file has changed.
+If the callback fails, the error is logged, and the watcher keeps polling.
+"""
+import asyncio
+import os
+
+
+def _mtime(path):
+    """
+    Returns with the modification time of the file, or ``None`` if it does not exist
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ConfigFileWatcher:
+    """
+    Watches the changes of a config file by polling its modification time
+    """
+
+    def __init__(self, logger, path, interval, callback):
+        """
+        Initializes the watcher
+
+        :param logger: The application logger.
+        :param str path: The path of the watched file.
+        :param float interval: The polling interval in seconds.
+        :param callback: An async function without arguments, that is called when the file has changed.
+        """
+        self.logger = logger
+        self.path = path
+        self.interval = interval
+        self.callback = callback
+        self._task = None
+
+    def start(self, loop):
+        """
+        Starts the watcher task on the given event loop
+        """
+        self._task = loop.create_task(self._run())
+
+    def stop(self):
+        """
+        Stops the watcher task
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        last_mtime = _mtime(self.path)
+        while True:
+            await asyncio.sleep(self.interval)
+            mtime = _mtime(self.path)
+            if mtime != last_mtime:
+                last_mtime = mtime
+                try:
+                    await self.callback()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    self.logger.opt(exception=True).error(
+                        "ConfigFileWatcher: the reload of the config failed"
+                    )
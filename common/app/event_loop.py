@@ -0,0 +1,86 @@
+"""
+Event loop selection module.
+
+The ``ApplicationBase`` creates its own event loop when ``run()`` is called.
+This module resolves the ``EVENT_LOOP`` config parameter to a factory function, that creates that loop.
+
+The possible values of ``EVENT_LOOP`` are:
+
+- ``asyncio``: the default event loop implementation of the standard library,
+- ``uvloop``: the `uvloop <https://github.com/MagicStack/uvloop>`_ implementation, if it is installed,
+- the fully qualified name of a callable, e.g. ``mypackage.loops:new_event_loop``,
+  that takes no arguments and returns with a new event loop instance.
+
+If the selected implementation can not be loaded, the factory falls back to the default ``asyncio`` loop.
+"""
+import asyncio
+import importlib
+
+
+def get_event_loop_choices():
+    """
+    Provides the list of the built-in event loop implementation names
+
+    :return Array[str]: The array of the event loop names that can be used without any further setup.
+    """
+    return ["asyncio", "uvloop"]
+
+
+def _import_callable(path):
+    """
+    Import a callable by its fully qualified name.
+
+    Both the ``package.module:callable`` and the ``package.module.callable`` notations are accepted.
+    """
+    if ":" in path:
+        module_name, attr_name = path.split(":", 1)
+    else:
+        module_name, _, attr_name = path.rpartition(".")
+
+    if not module_name or not attr_name:
+        raise ValueError(f"'{path}' is not a fully qualified callable name")
+
+    factory = getattr(importlib.import_module(module_name), attr_name)
+    if not callable(factory):
+        raise ValueError(f"'{path}' is not callable")
+
+    return factory
+
+
+def get_event_loop_factory(logger, event_loop=None):
+    """
+    Resolves the event loop factory function
+
+    :param logger: The logger to report the fallback to the default loop.
+    :param event_loop: The name of the event loop implementation, or a callable that creates a new loop.
+        If ``None``, the default ``asyncio`` loop will be used.
+
+    :return: A function without arguments, that returns with a new event loop.
+    """
+    if event_loop is None or event_loop == "asyncio":
+        return asyncio.new_event_loop
+
+    if callable(event_loop):
+        return event_loop
+
+    if event_loop == "uvloop":
+        try:
+            # pylint: disable=import-outside-toplevel
+            import uvloop
+        except ImportError:
+            logger.warning(
+                "The uvloop event loop is not installed, falling back to the asyncio loop"
+            )
+            return asyncio.new_event_loop
+
+        return uvloop.new_event_loop
+
+    try:
+        return _import_callable(event_loop)
+    except (ImportError, AttributeError, ValueError) as err:
+        logger.warning(
+            "Can not load the '{}' event loop factory ({}), falling back to the asyncio loop",
+            event_loop,
+            err,
+        )
+        return asyncio.new_event_loop
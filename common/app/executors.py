@@ -0,0 +1,162 @@
+"""
+Managed executors module.
+
+The application owns a thread pool and a process pool executor, that are the sanctioned ways
+to offload the blocking, and the CPU-bound work from the event loop:
+
+- ``run_blocking()`` runs a blocking function, e.g. a synchronous I/O call, in the thread pool,
+- ``run_cpu()`` runs a CPU-bound function in the process pool, so it does not hold the GIL of the event loop.
+  The function and its arguments must be picklable.
+
+The size of the pools is given by the ``THREAD_POOL_SIZE`` and ``PROCESS_POOL_SIZE`` config parameters.
+If they are not set, the defaults of the standard library executors are used.
+The process pool is created on its first use. The thread pool is set as the default executor of the event loop,
+so the ``loop.run_in_executor(None, ...)`` calls use it too.
+
+The executors record the number of the pending tasks, i.e. the submitted, but not yet finished tasks,
+and the latency of the tasks from the submission until the result, into the metrics.
+
+The application shuts down the executors in order, first the thread pool, then the process pool,
+waiting for the running tasks to finish, before the event loop is closed, but at most for the time left
+from the shutdown budget (see :mod:`common.app.shutdown`). If the budget runs out, the running tasks are abandoned:
+the threads can not be interrupted, so a hung thread keeps running, until the process exits.
+The exit hooks of ``concurrent.futures`` would wait for the abandoned threads, therefore the
+``application_entrypoint()`` exits the process immediately via ``os._exit()`` in this case.
+"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class ManagedExecutors:
+    """
+    The thread pool and process pool executors of the application
+    """
+
+    def __init__(
+        self, logger, metrics, *, thread_pool_size=None, process_pool_size=None
+    ):
+        """
+        Initializes the executors
+
+        :param logger: The application logger.
+        :param MetricsRegistry metrics: The registry to record the metrics of the executors into.
+        :param int thread_pool_size: The maximum number of threads. If ``None``, the default of the standard library.
+        :param int process_pool_size: The maximum number of processes. If ``None``, the number of the CPUs.
+        """
+        self.logger = logger
+        self.thread_pool_size = thread_pool_size
+        self.process_pool_size = process_pool_size
+        self._thread_pool = None
+        self._process_pool = None
+        self._unfinished = {"thread": set(), "process": set()}
+
+        self.pending = metrics.gauge(
+            "executor_pending_tasks",
+            "The number of the tasks submitted to the executor, that are not finished yet",
+            ["executor"],
+        )
+        self.latency = metrics.histogram(
+            "executor_task_latency_seconds",
+            "The time elapsed from the submission of the tasks until their results are available",
+            ["executor"],
+        )
+
+    @property
+    def thread_pool(self):
+        """
+        The thread pool executor, that is created on the first access
+        """
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                self.thread_pool_size, thread_name_prefix="app-blocking"
+            )
+        return self._thread_pool
+
+    @property
+    def process_pool(self):
+        """
+        The process pool executor, that is created on the first access
+        """
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(self.process_pool_size)
+        return self._process_pool
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """
+        Runs a blocking function in the thread pool, and returns with its result
+        """
+        return await self._run("thread", self.thread_pool, func, args, kwargs)
+
+    async def run_cpu(self, func, *args, **kwargs):
+        """
+        Runs a CPU-bound function in the process pool, and returns with its result
+        """
+        return await self._run("process", self.process_pool, func, args, kwargs)
+
+    async def _run(self, name, executor, func, args, kwargs):
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+
+        pending = self.pending.labels(name)
+        submitted = time.perf_counter()
+        pending.inc()
+        try:
+            # The future of the executor is tracked until it is finished, even if the awaiting task is cancelled
+            future = executor.submit(func, *args)
+            unfinished = self._unfinished[name]
+            unfinished.add(future)
+            future.add_done_callback(unfinished.discard)
+            return await asyncio.wrap_future(future)
+        finally:
+            pending.dec()
+            self.latency.labels(name).observe(time.perf_counter() - submitted)
+
+    def shutdown(self, timeout=None):
+        """
+        Shuts down the thread pool, then the process pool, waiting for their running tasks to finish.
+        The tasks, that are not started yet, are cancelled.
+
+        :param float timeout: The maximum time in seconds to wait for the running tasks.
+            If it is elapsed, the running tasks are abandoned.
+
+        :return bool: ``False`` if running tasks were abandoned, because the timeout elapsed.
+        """
+        executors = [
+            ("thread", self._thread_pool),
+            ("process", self._process_pool),
+        ]
+        self._thread_pool = None
+        self._process_pool = None
+
+        def shutdown_all():
+            for name, executor in executors:
+                if executor is not None:
+                    self.logger.debug(
+                        "ManagedExecutors: shutting down the {} pool", name
+                    )
+                    executor.shutdown(wait=True, cancel_futures=True)
+
+        if timeout is None:
+            shutdown_all()
+            return True
+
+        thread = threading.Thread(
+            target=shutdown_all, name="app-executors-shutdown", daemon=True
+        )
+        thread.start()
+        thread.join(timeout)
+        if not thread.is_alive():
+            return True
+
+        for _, executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self.logger.warning(
+            "ManagedExecutors: the running tasks did not finish in {:0.3f} seconds, abandoned tasks: {}",
+            timeout,
+            {name: len(futures) for name, futures in self._unfinished.items()},
+        )
+        return False
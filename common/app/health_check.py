@@ -1,15 +1,45 @@
 """
 Health check module. It runs a web service on localhost and the specified port. The health state of the application can
-be queried at the 'health' end point.
+be queried at the 'health' end point. If a metrics registry is given, the metrics of the application
+are also served at the 'metrics' end point in Prometheus text format.
+
+The Kubernetes probes have their own end points, that map the state of the application to pass (200) or fail (503):
+
+- 'livez': the liveness probe fails only in the ``NOINFO`` state, so the service is not restarted,
+  while it is warming up, or it is shutting down,
+- 'readyz': the readiness probe passes only in the ``WORK`` and ``DEGRADED`` states, so the service gets no traffic,
+  while it is warming up, and it stops getting traffic as soon as it starts shutting down,
+- 'startupz': the startup probe passes, once the service has reached the ``WORK`` (or ``DEGRADED``) state, and it keeps passing
+  after that, whatever the state is.
+
+The server binds to a TCP socket by default. It can bind with ``SO_REUSEPORT``, so the worker processes
+of the application can share the port, or it can serve over a Unix domain socket instead, e.g. for a sidecar scraper.
+Note that the kernel distributes the connections of a shared port among the workers randomly, so each probe
+checks a random worker: a single wedged worker makes the probes fail only intermittently. Use per-worker
+Unix domain sockets, or separate ports, to check every worker.
+
+The health of the components the service depends on, e.g. a database pool or a downstream API, can be reported
+in the ``checks`` object of the 'health' response. The async component checks registered by ``add_check()`` run
+in the background, in every ``interval`` seconds, with a timeout. Their results are cached, and the responses are
+re-encoded only when a check has run, so the requests never execute the checks.
+The overall status of the 'health' response is the worst of the status of the service state, and the statuses
+of the checks, e.g. a failing check makes the response ``fail`` with 503 HTTP status code.
 
 
 The implementation of health check response is based on 'Health Check Response Format for HTTP APIs'
 (https://datatracker.ietf.org/doc/html/draft-inadarei-api-health-check-06)
 """
+import asyncio
+import json
+import os
+import stat
+import time
+from datetime import datetime, timezone
 from enum import Enum
 from typing import List
 
 from aiohttp import web
+from common.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 
 class State(Enum):
@@ -19,6 +49,7 @@ class State(Enum):
 
     WARMUP = "Warming up"
     WORK = "Working"
+    DEGRADED = "Degraded"
     SHUTDOWN = "Shutting down"
     NOINFO = "No information"
 
@@ -42,20 +73,24 @@ class Response:
     status: Status
     notes: List[str]
 
-    def __init__(self, service_name: str):
+    def __init__(self, service_name: str, checks=None):
         self.service_name = service_name
+        self.checks = checks
 
     @property
     def create_response(self):
         """
         Composes the response to an http request
         """
-        return {
+        response = {
             "status": self.status.value,
             "notes": self.notes,
             "serviceId": "get-health",
             "description": f"Returns the health of the '{self.service_name}' service",
         }
+        if self.checks:
+            response["checks"] = self.checks
+        return response
 
 
 # pylint: disable=too-few-public-methods
@@ -95,44 +130,386 @@ class Warn(Response):
     notes = ["Service is not healthy, it is warming up or shutting down"]
 
 
+# pylint: disable=too-few-public-methods
+class Degraded(Warn):
+    """
+    Response of warning status, when the service is working, but it is degraded, e.g. its event loop is lagging.
+    """
+
+    notes = ["Service is degraded, it is working but slowly"]
+
+
+PROBES = {
+    "livez": lambda state, started: state != State.NOINFO,
+    "readyz": lambda state, started: state in (State.WORK, State.DEGRADED),
+    "startupz": lambda state, started: started,
+}
+"""The rules of the probe end points, that decide whether the probe passes in the given state of the service"""
+
+
+def _serializable(value):
+    """
+    Returns with the value, if it can be encoded to JSON format, otherwise with its string representation
+    """
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return value
+
+
+# pylint: disable=too-few-public-methods
+class ComponentCheck:
+    """
+    A registered component check, and its last result
+    """
+
+    def __init__(self, name, check, *, interval, timeout):
+        self.name = name
+        self.check = check
+        self.interval = interval
+        self.timeout = timeout
+        self.task = None
+        self.result = {"status": Status.WARN.value, "output": "Not checked yet"}
+
+    async def run(self):
+        """
+        Runs the check once, and returns with its result in the format of the ``checks`` object
+        """
+        started = time.perf_counter()
+        try:
+            value = await asyncio.wait_for(self.check(), self.timeout)
+        except asyncio.TimeoutError:
+            status, output, value = (
+                Status.FAIL,
+                f"Timed out after {self.timeout} seconds",
+                None,
+            )
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            status, output, value = Status.FAIL, f"{type(err).__name__}: {err}", None
+        else:
+            if isinstance(value, Status):
+                status, value = value, None
+            elif isinstance(value, bool):
+                status, value = Status.PASS if value else Status.FAIL, None
+            else:
+                status = Status.PASS
+            output = None
+
+        result = {
+            "status": status.value,
+            "time": datetime.now(timezone.utc).isoformat(),
+            "observedDuration": round(time.perf_counter() - started, 6),
+        }
+        if value is not None:
+            result["observedValue"] = _serializable(value)
+        if output is not None:
+            result["output"] = output
+        return result
+
+
+STATUS_SEVERITY = [Status.PASS, Status.WARN, Status.FAIL]
+"""The statuses in the order of their severity"""
+
+STATUS_CODES = {
+    Status.PASS: Pass.status_code,
+    Status.WARN: Warn.status_code,
+    Status.FAIL: Fail.status_code,
+}
+"""The HTTP status codes of the statuses"""
+
+
 class HealthCheck:
     """
     Class for running web service to access the 'health' endpoint
+
+    The response bodies are encoded in advance for every possible state, so the
+    endpoint only has to select the body that belongs to the actual state of the service.
     """
 
-    def __init__(self, logger, service_name: str, host="127.0.0.1", port=8008):
+    def __init__(
+        self,
+        logger,
+        service_name: str,
+        host="127.0.0.1",
+        port=8008,
+        metrics=None,
+        *,
+        socket_path=None,
+        reuse_port=False,
+        backlog=128,
+        keepalive_timeout=75.0,
+    ):
+        """
+        Initializes the health check web service
+
+        :param logger: The application logger.
+        :param str service_name: The name of the service, that appears in the responses.
+        :param str host: The host to bind the TCP socket to.
+        :param int port: The port to bind the TCP socket to.
+        :param MetricsRegistry metrics: The metrics registry to serve at the 'metrics' end point, if given.
+        :param str socket_path: The path of the Unix domain socket to serve on, instead of the TCP socket, if given.
+        :param bool reuse_port: Bind the TCP socket with ``SO_REUSEPORT``, so more processes can share the port.
+        :param int backlog: The maximum number of the pending connections of the socket.
+        :param float keepalive_timeout: The time in seconds, an idle keep-alive connection is kept open.
+        """
         self.logger = logger
         self.service_name = service_name
         self.host = host
         self.port = port
+        self.socket_path = socket_path
+        self.reuse_port = reuse_port
+        self.backlog = backlog
+        self.keepalive_timeout = keepalive_timeout
+        self._runner = None
+
+        self._checks = {}
+        self._checks_started = False
+        self._responses = {state: self._encode_response(state) for state in State}
+        self._probe_responses = {
+            (probe, state, passed): self._encode_probe(probe, state, passed)
+            for probe in PROBES
+            for state in State
+            for passed in (True, False)
+        }
+        self._service_state = None
+        self._body = None
+        self._status_code = None
+        self._started = False
+        self._probes = {}
+        self.degraded_reasons = set()
         self.service_state = State.NOINFO
 
         self.app = web.Application()
         self.app.router.add_get("/health", self.health)
+        for probe in PROBES:
+            self.app.router.add_get(f"/{probe}", self._probe_handler(probe))
 
-    async def health(self, _msg):
+        self.metrics = metrics
+        if metrics is not None:
+            self.app.router.add_get("/metrics", self.metrics_handler)
+
+    @property
+    def service_state(self):
         """
-        Handler for the health check endpoint. The response is in JSON format.
+        The actual state of the service
         """
-        if self.service_state == State.WORK:
-            resp = Pass(self.service_name)
-        elif self.service_state == State.NOINFO:
-            resp = Fail(self.service_name)
+        return self._service_state
+
+    @service_state.setter
+    def service_state(self, state: State):
+        self._service_state = state
+        self._body, self._status_code = self._responses[state]
+        self._started = self._started or state in (State.WORK, State.DEGRADED)
+        self._probes = {
+            probe: self._probe_responses[probe, state, rule(state, self._started)]
+            for probe, rule in PROBES.items()
+        }
+
+    def _encode_response(self, state: State):
+        """
+        Composes the response that belongs to the given state, and encodes it to JSON format.
+
+        :return: The tuple of the encoded response body and the HTTP status code.
+        """
+        checks = {name: [check.result] for name, check in self._checks.items()}
+        if state == State.WORK:
+            resp = Pass(self.service_name, checks)
+        elif state == State.NOINFO:
+            resp = Fail(self.service_name, checks)
+        elif state == State.DEGRADED:
+            resp = Degraded(self.service_name, checks)
         else:
-            resp = Warn(self.service_name)
+            resp = Warn(self.service_name, checks)
+
+        response = resp.create_response
+        status_code = resp.status_code
+
+        # The overall status is the worst of the status of the state, and the statuses of the component checks
+        not_passing = [
+            name
+            for name, check in self._checks.items()
+            if check.result["status"] != Status.PASS.value
+        ]
+        worst = max(
+            [resp.status]
+            + [Status(self._checks[name].result["status"]) for name in not_passing],
+            key=STATUS_SEVERITY.index,
+        )
+        if worst != resp.status:
+            response["status"] = worst.value
+            response["notes"] = resp.notes + [
+                f"Component checks not passing: {', '.join(not_passing)}"
+            ]
+            status_code = STATUS_CODES[worst]
+
+        return json.dumps(response).encode("utf-8"), status_code
+
+    def _refresh_responses(self):
+        """
+        Re-encodes the health responses, after the results of the component checks have changed
+        """
+        self._responses = {state: self._encode_response(state) for state in State}
+        self._body, self._status_code = self._responses[self._service_state]
 
-        return web.json_response(resp.create_response, status=resp.status_code)
+    def add_check(self, name, check, *, interval=10.0, timeout=5.0):
+        """
+        Registers an async component check, that runs in the background, and its result is reported
+        in the ``checks`` object of the 'health' response.
+
+        The check is an async function without arguments. It passes, if it returns ``True``, ``None``
+        or any other value, which is reported as the ``observedValue`` of the check. It fails, if it returns
+        ``False``, raises an exception, or it does not finish in time. It can also return a :class:`Status`.
+
+        :param str name: The name of the check, e.g. ``"postgres:connections"``.
+        :param check: The async function of the check.
+        :param float interval: The time in seconds between the runs of the check.
+        :param float timeout: The time in seconds, a run of the check can take.
+        """
+        if name in self._checks:
+            raise ValueError(f"The '{name}' health check is already registered")
+
+        self._checks[name] = ComponentCheck(
+            name, check, interval=interval, timeout=timeout
+        )
+        self._refresh_responses()
+        if self._checks_started:
+            self._start_check(self._checks[name])
+
+    def start_checks(self):
+        """
+        Starts running the registered component checks on the running event loop
+        """
+        self._checks_started = True
+        for check in self._checks.values():
+            self._start_check(check)
+
+    def stop_checks(self):
+        """
+        Stops running the component checks
+        """
+        self._checks_started = False
+        for check in self._checks.values():
+            if check.task is not None:
+                check.task.cancel()
+                check.task = None
+
+    def _start_check(self, check):
+        check.task = asyncio.create_task(
+            self._run_check(check), name=f"health-check-{check.name}"
+        )
+
+    async def _run_check(self, check):
+        while True:
+            previous = check.result
+            try:
+                result = await check.run()
+                if result["status"] != previous["status"]:
+                    log = (
+                        self.logger.info
+                        if result["status"] == Status.PASS.value
+                        else self.logger.warning
+                    )
+                    log("HealthCheck: the {} check is {}", check.name, result["status"])
+                check.result = result
+                self._refresh_responses()
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                # The check keeps running, with its previous result
+                check.result = previous
+                self.logger.opt(exception=True).error(
+                    "HealthCheck: the {} check could not be recorded: {}",
+                    check.name,
+                    err,
+                )
+            await asyncio.sleep(check.interval)
+
+    def _encode_probe(self, probe, state: State, passed):
+        """
+        Composes the response of a probe end point, and encodes it to JSON format.
+
+        :return: The tuple of the encoded response body and the HTTP status code.
+        """
+        resp = {
+            "status": (Status.PASS if passed else Status.FAIL).value,
+            "notes": [f"Service state: {state.value}"],
+            "serviceId": f"get-{probe}",
+            "description": f"Returns the '{probe}' probe of the '{self.service_name}' service",
+        }
+        return json.dumps(resp).encode("utf-8"), 200 if passed else 503
+
+    def _probe_handler(self, probe):
+        """
+        Creates the handler of a probe end point. The response is in JSON format.
+        """
+
+        async def handler(_msg):
+            body, status_code = self._probes[probe]
+            return web.Response(
+                body=body,
+                status=status_code,
+                content_type="application/json",
+                charset="utf-8",
+            )
+
+        return handler
+
+    async def health(self, _msg):
+        """
+        Handler for the health check endpoint. The response is in JSON format.
+        """
+        return web.Response(
+            body=self._body,
+            status=self._status_code,
+            content_type="application/json",
+            charset="utf-8",
+        )
+
+    async def metrics_handler(self, _msg):
+        """
+        Handler for the metrics endpoint. The response is in Prometheus text exposition format.
+        """
+        return web.Response(
+            body=self.metrics.render().encode("utf-8"),
+            headers={"Content-Type": METRICS_CONTENT_TYPE},
+        )
 
     async def run_server(self):
         """
-        Run the web service on localhost and the specified port
+        Run the web service on the specified host and port, or on the Unix domain socket, if its path is given
         """
-        runner = web.AppRunner(self.app)
+        runner = web.AppRunner(self.app, keepalive_timeout=self.keepalive_timeout)
         await runner.setup()
-        site = web.TCPSite(runner, host=self.host, port=self.port)
+        self._runner = runner
+        if self.socket_path:
+            # The socket file of a previous run would make the bind fail
+            if os.path.exists(self.socket_path) and stat.S_ISSOCK(
+                os.stat(self.socket_path).st_mode
+            ):
+                os.unlink(self.socket_path)
+            site = web.UnixSite(runner, self.socket_path, backlog=self.backlog)
+        else:
+            site = web.TCPSite(
+                runner,
+                host=self.host,
+                port=self.port,
+                backlog=self.backlog,
+                reuse_port=self.reuse_port or None,
+            )
         await site.start()
+        self.start_checks()
 
-        self.logger.info(f"Health check serving on {self.host}:{self.port}/health")
+        self.logger.info("Health check serving on {}/health", site.name)
+
+    async def stop_server(self):
+        """
+        Stops the web service, closes its socket, and removes the socket file, if it serves on a Unix domain socket
+        """
+        self.stop_checks()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
 
     def set_state_warm_up(self):
         """
@@ -142,9 +519,47 @@ class HealthCheck:
 
     def set_state_working(self):
         """
-        Set the service state to 'Working'
+        Set the service state to 'Working', or to 'Degraded' if there are reasons of the degradation
+        """
+        self.service_state = State.DEGRADED if self.degraded_reasons else State.WORK
+
+    def degrade(self, reason):
+        """
+        Adds a reason of the degradation of the service, and flips the state from 'Working' to 'Degraded'.
+        The other states are kept, so the warm-up and the shut-down are not interfered.
+
+        :param str reason: The reason of the degradation, e.g. ``"loop-lag"``.
+
+        :return bool: ``True`` if the reason was not present yet.
+        """
+        added = reason not in self.degraded_reasons
+        self.degraded_reasons.add(reason)
+        if self._service_state == State.WORK:
+            self.service_state = State.DEGRADED
+        return added
+
+    def recover(self, reason):
+        """
+        Removes a reason of the degradation of the service. The state is flipped from 'Degraded' back to 'Working',
+        only if no reasons remain.
+
+        :param str reason: The reason of the degradation, that was given to :meth:`degrade`.
+
+        :return bool: ``True`` if the reason was present.
+        """
+        if reason not in self.degraded_reasons:
+            return False
+
+        self.degraded_reasons.discard(reason)
+        if not self.degraded_reasons and self._service_state == State.DEGRADED:
+            self.service_state = State.WORK
+        return True
+
+    def set_state_degraded(self):
+        """
+        Set the service state to 'Degraded'
         """
-        self.service_state = State.WORK
+        self.service_state = State.DEGRADED
 
     def set_state_shut_down(self):
         """
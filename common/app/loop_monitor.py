@@ -0,0 +1,175 @@
+"""
+Event loop lag monitor module.
+
+The monitor runs as a background task of the application. It periodically sleeps for a given interval,
+and measures how late it wakes up compared to the expected time. This delay is the lag of the event loop,
+which grows when the loop is blocked by CPU-bound work, or by blocking calls.
+
+The monitor
+
+- records the last lag and its 99th percentile, calculated on a rolling window of samples, into the metrics,
+- logs a warning, if a sample exceeds the threshold,
+- flips the health check state to ``DEGRADED``, while the 99th percentile of the lag exceeds the threshold,
+- optionally turns on the slow callback logging of the event loop, to find the offending callbacks.
+"""
+import asyncio
+import logging
+from collections import deque
+
+SLOW_CALLBACK_LOGGER = "asyncio"
+"""The name of the standard library logger the event loop reports the slow callbacks to"""
+
+DEGRADED_REASON = "loop-lag"
+"""The reason of the degradation of the service, that the monitor adds to the health check"""
+
+
+def percentile(samples, percent):
+    """
+    Calculates the percentile of the samples with the nearest-rank method
+
+    :param samples: The collection of samples.
+    :param float percent: The percentile to calculate, between 0 and 100.
+
+    :return: The percentile, or ``0.0`` if there are no samples.
+    """
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class _SlowCallbackLogHandler(logging.Handler):
+    """
+    Forwards the slow callback reports of the event loop to the application logger
+    """
+
+    def __init__(self, logger):
+        super().__init__(logging.WARNING)
+        self.logger = logger
+
+    def emit(self, record):
+        self.logger.warning("LoopLagMonitor: {}", record.getMessage())
+
+
+class LoopLagMonitor:
+    """
+    Monitors the lag of the event loop
+    """
+
+    def __init__(
+        self,
+        logger,
+        metrics,
+        health_check,
+        *,
+        interval=0.5,
+        window=120,
+        threshold=None,
+        slow_callback_duration=None,
+    ):
+        """
+        Initializes the monitor
+
+        :param logger: The application logger.
+        :param MetricsRegistry metrics: The metrics registry to record the lag into.
+        :param health_check: The health check of the application, to flip its state.
+        :param float interval: The sampling interval in seconds.
+        :param int window: The number of the samples to calculate the percentiles of.
+        :param float threshold: The lag in seconds, above which the samples are logged, and the health state
+            is flipped to ``DEGRADED``. If ``None``, then no warnings are made.
+        :param float slow_callback_duration: If given, the event loop runs in debug mode,
+            and logs the callbacks that run longer than this duration in seconds.
+        """
+        self.logger = logger
+        self.health_check = health_check
+        self.interval = interval
+        self.threshold = threshold
+        self.slow_callback_duration = slow_callback_duration
+        self.samples = deque(maxlen=window)
+        self._task = None
+        self._log_handler = None
+
+        self.lag = metrics.gauge(
+            "asyncio_loop_lag_seconds",
+            "The delay of the last scheduled event loop callback",
+        )
+        self.lag_p99 = metrics.gauge(
+            "asyncio_loop_lag_p99_seconds",
+            "The 99th percentile of the event loop lag within the monitoring window",
+        )
+
+    def start(self, loop):
+        """
+        Starts the monitoring task on the given event loop
+        """
+        if self.slow_callback_duration is not None:
+            loop.slow_callback_duration = self.slow_callback_duration
+            loop.set_debug(True)
+            self._log_handler = _SlowCallbackLogHandler(self.logger)
+            logging.getLogger(SLOW_CALLBACK_LOGGER).addHandler(self._log_handler)
+
+        self._task = loop.create_task(self._run())
+
+    def stop(self):
+        """
+        Stops the monitoring task
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        if self._log_handler is not None:
+            logging.getLogger(SLOW_CALLBACK_LOGGER).removeHandler(self._log_handler)
+            self._log_handler = None
+
+    def p99(self):
+        """
+        Returns with the 99th percentile of the lag within the monitoring window
+        """
+        return percentile(self.samples, 99)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - expected))
+
+    def record(self, lag):
+        """
+        Records a lag sample, and updates the health state according to the actual 99th percentile
+
+        :param float lag: The measured lag in seconds.
+        """
+        self.samples.append(lag)
+        p99 = self.p99()
+        self.lag.set(lag)
+        self.lag_p99.set(p99)
+
+        if self.threshold is None:
+            return
+
+        if lag > self.threshold:
+            self.logger.warning(
+                "LoopLagMonitor: the event loop was blocked for {:0.5f} seconds", lag
+            )
+
+        if self.health_check is None:
+            return
+
+        # The monitor only adds and clears its own reason of the degradation, so it does not restore
+        # the WORK state, while the service is degraded for other reasons, e.g. a failed supervised task.
+        # The health check does not interfere with the warm-up and the shut-down either.
+        if p99 > self.threshold:
+            if self.health_check.degrade(DEGRADED_REASON):
+                self.logger.warning(
+                    "LoopLagMonitor: the p99 event loop lag is {:0.5f} seconds, the service is degraded",
+                    p99,
+                )
+        elif self.health_check.recover(DEGRADED_REASON):
+            self.logger.info(
+                "LoopLagMonitor: the p99 event loop lag is {:0.5f} seconds, the service recovered",
+                p99,
+            )
@@ -0,0 +1,114 @@
+"""
+Graceful shutdown budget module.
+
+The shutdown of the application is bounded by the ``SHUTDOWN_TIMEOUT`` config parameter, in seconds.
+It should be less than the time the orchestrator waits before it kills the process,
+e.g. the ``terminationGracePeriodSeconds`` of Kubernetes.
+
+The budget is split into phases, that run in the following order:
+
+1. ``health``: flips the health check state to ``SHUTDOWN``,
+2. ``intake``: stops the config watcher, the loop monitor and the supervised tasks, that feed the application,
+3. ``drain``: drains the in-flight items of the pipelines,
+4. ``stop``: calls the ``stop()`` function of the application,
+5. ``cancel``: cancels the remaining tasks,
+6. ``close``: shuts down the asynchronous generators and the executors, then closes the event loop.
+
+Each phase has its own deadline: it can use the time left from the budget, except the shares reserved for
+the later phases. So the time not used by a phase is available for the later phases, but a hanging phase
+can not take the time of the later ones. The duration of each phase is logged.
+If the ``SHUTDOWN_TIMEOUT`` is not set, or it is zero, the phases are not time-limited.
+
+If the shutdown is requested via ``request_shutdown()``, the budget starts, and the ``health`` phase runs
+at the time of the request, so the time the ``jobs()`` takes to finish is included in the budget.
+"""
+import time
+from contextlib import contextmanager
+
+SHUTDOWN_PHASES = {
+    "health": 0.0,
+    "intake": 0.2,
+    "drain": 0.4,
+    "stop": 0.2,
+    "cancel": 0.1,
+    "close": 0.1,
+}
+"""The phases of the shutdown, and their shares of the shutdown budget"""
+
+
+class ShutdownBudget:
+    """
+    Splits the shutdown budget into the deadlines of the phases
+    """
+
+    def __init__(self, logger, timeout=None):
+        """
+        Starts the measurement of the shutdown
+
+        :param logger: The application logger.
+        :param float timeout: The shutdown budget in seconds. If ``None`` or zero, the phases are not time-limited.
+        """
+        self.logger = logger
+        self.total = timeout or None
+        self.started = time.monotonic()
+        self.deadline = None if self.total is None else self.started + self.total
+
+    def remaining(self):
+        """
+        Returns with the time left from the budget in seconds, or ``None`` if there is no budget
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def timeout(self, name):
+        """
+        Returns with the time in seconds, the given phase can take, or ``None`` if there is no budget
+
+        :param str name: The name of the phase.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return None
+
+        phases = list(SHUTDOWN_PHASES)
+        reserved = self.total * sum(
+            SHUTDOWN_PHASES[later] for later in phases[phases.index(name) + 1 :]
+        )
+        own = min(remaining, self.total * SHUTDOWN_PHASES[name])
+        return max(own, remaining - reserved)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        A context manager, that runs a phase, and logs its duration
+
+        :param str name: The name of the phase.
+
+        :return: The time in seconds, the phase can take, or ``None`` if there is no budget.
+        """
+        started = time.monotonic()
+        try:
+            yield self.timeout(name)
+        finally:
+            self.logger.info(
+                "Application._stop: the {} phase took {:0.3f} seconds",
+                name,
+                time.monotonic() - started,
+            )
+
+    def report(self):
+        """
+        Logs the total duration of the shutdown
+        """
+        elapsed = time.monotonic() - self.started
+        if self.total is not None and elapsed > self.total:
+            self.logger.warning(
+                "Application._stop: the shutdown took {:0.3f} seconds, exceeded the {} seconds budget",
+                elapsed,
+                self.total,
+            )
+        else:
+            self.logger.info(
+                "Application._stop: the shutdown took {:0.3f} seconds", elapsed
+            )
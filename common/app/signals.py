@@ -8,9 +8,13 @@ import signal
 
 
 __all__ = [
+    "SIGNAL_MODES",
     "SIGNAL_TRANSLATION_MAP",
 ]
 
+SIGNAL_MODES = ("exception", "loop")
+"""The valid values of the ``SIGNAL_MODE`` config parameter"""
+
 SIGNAL_TRANSLATION_MAP = {
     signal.SIGINT: "SIGINT",
     signal.SIGTERM: "SIGTERM",
@@ -24,7 +28,7 @@ def add_term_signal_handler(logger, callback):
 
     def signal_cb_wrapper(callback):
         def fun(sig, frame):
-            logger.info(f"signal: {sig}, frame: {frame}")
+            logger.info("signal: {}, frame: {}", sig, frame)
             callback()
 
         return fun
@@ -33,6 +37,58 @@ def add_term_signal_handler(logger, callback):
     signal.signal(signal.SIGTERM, signal_cb_wrapper(callback))
 
 
+def add_loop_term_signal_handler(logger, loop, callback):
+    """
+    Register a callback function on the event loop to handle the SIGINT and SIGTERM signals
+
+    The callback is called by the event loop, instead of the signal handler, so no exception is raised
+    in the frame, that happens to be executed, when the signal arrives.
+    If the event loop does not support signal handlers, e.g. on Windows, the signal handler only schedules
+    the callback via the self-pipe of the loop.
+    """
+
+    def signal_cb_wrapper(name):
+        def fun():
+            logger.info("signal: {}, shutting down", name)
+            callback()
+
+        return fun
+
+    for sig, name in SIGNAL_TRANSLATION_MAP.items():
+        fun = signal_cb_wrapper(name)
+        try:
+            loop.add_signal_handler(sig, fun)
+        except NotImplementedError:
+            signal.signal(
+                sig, lambda _sig, _frame, fun=fun: loop.call_soon_threadsafe(fun)
+            )
+
+
+def add_hup_signal_handler(logger, callback):
+    """
+    Register a callback function to catch the SIGHUP signal, that requests the reload of the configuration
+
+    :return: The previous handler of the SIGHUP signal, to be restored via ``restore_hup_signal_handler()``,
+        or ``None`` if the platform does not support the SIGHUP signal.
+    """
+    if not hasattr(signal, "SIGHUP"):
+        return None
+
+    def fun(sig, _frame):
+        logger.info("signal: {}, reloading the configuration", sig)
+        callback()
+
+    return signal.signal(signal.SIGHUP, fun)
+
+
+def restore_hup_signal_handler(handler):
+    """
+    Restores the handler of the SIGHUP signal, returned by ``add_hup_signal_handler()``
+    """
+    if handler is not None:
+        signal.signal(signal.SIGHUP, handler)
+
+
 class DelayedKeyboardInterrupt:
     """
     A context provider class, that makes possible to postpone the handling of exceptions
@@ -83,19 +139,25 @@ class DelayedKeyboardInterrupt:
         if os.getpid() != self._pid:
             if self._propagate_to_forked_processes is False:
                 self.logger.error(
-                    f"!!! DelayedKeyboardInterrupt._handler: {SIGNAL_TRANSLATION_MAP[sig]} received; "
-                    f"PID mismatch: {os.getpid()=}, {self._pid=}, calling original handler"
+                    "!!! DelayedKeyboardInterrupt._handler: {} received; "
+                    "PID mismatch: os.getpid()={}, self._pid={}, calling original handler",
+                    SIGNAL_TRANSLATION_MAP[sig],
+                    os.getpid(),
+                    self._pid,
                 )
                 self._old_signal_handler_map[self._sig](self._sig, self._frame)
             elif self._propagate_to_forked_processes is None:
                 self.logger.error(
-                    f"!!! DelayedKeyboardInterrupt._handler: {SIGNAL_TRANSLATION_MAP[sig]} received; "
-                    f"PID mismatch: {os.getpid()=}, ignoring the signal"
+                    "!!! DelayedKeyboardInterrupt._handler: {} received; "
+                    "PID mismatch: os.getpid()={}, ignoring the signal",
+                    SIGNAL_TRANSLATION_MAP[sig],
+                    os.getpid(),
                 )
                 return
             # elif self._propagate_to_forked_processes is True:
             #   ... passthrough
 
         self.logger.error(
-            f"!!! DelayedKeyboardInterrupt._handler: {SIGNAL_TRANSLATION_MAP[sig]} received; delaying KeyboardInterrupt"
+            "!!! DelayedKeyboardInterrupt._handler: {} received; delaying KeyboardInterrupt",
+            SIGNAL_TRANSLATION_MAP[sig],
         )
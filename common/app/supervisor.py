@@ -0,0 +1,320 @@
+"""
+Task supervisor module.
+
+The background tasks of the application, e.g. the consumers created in ``start()``, can be run under the
+supervision of the ``TaskSupervisor`` of the application, instead of creating them by ``asyncio.create_task()``.
+
+The supervised tasks
+
+- have unique names, that appear in the logs and the metrics,
+- are restarted according to their restart policy, with exponential backoff, if they fail or finish,
+- flip the health check state to ``DEGRADED``, if they failed, and they are not restarted any more,
+- are accounted: the CPU time spent in the steps of the task, and the wall-clock time it was running,
+- are cancelled in dependency order, when the application shuts down: a task is cancelled only after all the tasks,
+  that depend on it, are finished.
+
+The CPU time is measured by a wrapper, that drives the coroutine of the task step by step,
+and measures the thread CPU time of each step.
+
+Example of usage:
+
+.. highlight:: python
+.. code-block:: python
+
+    async def start(self):
+        self.tasks.spawn("db-writer", self.write_rows)
+        self.tasks.spawn("consumer", self.consume, depends_on=["db-writer"])
+"""
+import asyncio
+import time
+from enum import Enum
+
+
+class RestartPolicy(Enum):
+    """
+    The restart policies of the supervised tasks
+    """
+
+    NEVER = "never"
+    """The task is never restarted"""
+
+    ON_FAILURE = "on-failure"
+    """The task is restarted, if it raised an exception"""
+
+    ALWAYS = "always"
+    """The task is restarted, if it raised an exception, or it finished"""
+
+
+# pylint: disable=too-few-public-methods
+class _AccountedCoroutine:
+    """
+    Drives a coroutine step by step, and adds the thread CPU time of the steps to the account of the task
+    """
+
+    def __init__(self, coro, account):
+        self.coro = coro
+        self.account = account
+
+    def __await__(self):
+        coro = self.coro
+        value = None
+        error = None
+        while True:
+            started = time.thread_time()
+            try:
+                if error is None:
+                    future = coro.send(value)
+                else:
+                    future = coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.account.cpu_time += time.thread_time() - started
+
+            try:
+                value = yield future
+                error = None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as err:  # pylint: disable=broad-exception-caught
+                value = None
+                error = err
+
+
+# pylint: disable=too-few-public-methods,too-many-instance-attributes
+class SupervisedTask:
+    """
+    The descriptor and the actual state of a supervised task
+    """
+
+    def __init__(self, name, factory, *, restart, depends_on, max_restarts):
+        """
+        Initializes the supervised task
+
+        The parameters are described at the :meth:`TaskSupervisor.spawn` function.
+        """
+        self.name = name
+        self.factory = factory
+        self.restart = RestartPolicy(restart)
+        self.depends_on = tuple(depends_on)
+        self.max_restarts = max_restarts
+        self.task = None
+        self.restarts = 0
+        self.cpu_time = 0.0
+        self.wall_time = 0.0
+        self.state = "running"
+
+
+class TaskSupervisor:
+    """
+    Runs and supervises the named background tasks of the application
+    """
+
+    def __init__(
+        self,
+        logger,
+        metrics=None,
+        *,
+        health_check=None,
+        backoff_initial=0.5,
+        backoff_max=30.0,
+    ):
+        """
+        Initializes the supervisor
+
+        :param logger: The application logger.
+        :param MetricsRegistry metrics: The registry to record the metrics of the tasks into, if given.
+        :param health_check: The health check of the application, to flip its state, when a task failed finally.
+        :param float backoff_initial: The delay in seconds before the first restart of a task.
+        :param float backoff_max: The maximum delay in seconds between the restarts. The delay is doubled
+            after each restart, and it is reset, if the task was running longer than this.
+        """
+        self.logger = logger
+        self.metrics = metrics
+        self.health_check = health_check
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.tasks = {}
+        self._stopping = False
+
+    def spawn(
+        self,
+        name,
+        factory,
+        *,
+        restart=RestartPolicy.ON_FAILURE,
+        depends_on=(),
+        max_restarts=None,
+    ):
+        """
+        Starts a new supervised task on the running event loop
+
+        :param str name: The unique name of the task.
+        :param factory: An async function without arguments, that is called to (re)start the task.
+        :param RestartPolicy restart: The restart policy of the task.
+        :param Array[str] depends_on: The names of the tasks, this task depends on.
+            They are cancelled after this task, when the supervisor shuts down.
+        :param int max_restarts: The maximum number of restarts. If ``None``, the task is restarted infinitely.
+
+        :return SupervisedTask: The supervised task.
+        """
+        if name in self.tasks:
+            raise ValueError(f"The '{name}' task is already supervised")
+
+        supervised = SupervisedTask(
+            name,
+            factory,
+            restart=restart,
+            depends_on=depends_on,
+            max_restarts=max_restarts,
+        )
+        self.tasks[name] = supervised
+        self._register_metrics(supervised)
+        supervised.task = asyncio.create_task(self._supervise(supervised), name=name)
+        return supervised
+
+    def get(self, name):
+        """
+        Returns with the supervised task of the given name, or ``None`` if not found
+        """
+        return self.tasks.get(name)
+
+    def stats(self):
+        """
+        Returns with the accounting of the tasks
+
+        :return dict: The ``state``, ``restarts``, ``cpu_time`` and ``wall_time`` of the tasks by their names.
+        """
+        return {
+            name: {
+                "state": supervised.state,
+                "restarts": supervised.restarts,
+                "cpu_time": supervised.cpu_time,
+                "wall_time": supervised.wall_time,
+            }
+            for name, supervised in self.tasks.items()
+        }
+
+    async def shutdown(self, timeout=None):
+        """
+        Cancels the tasks in dependency order, and waits for them to finish.
+
+        The tasks, that no other running tasks depend on, are cancelled first, then the tasks they depend on, and so on.
+
+        :param float timeout: The maximum time in seconds to wait for the tasks of each step to finish.
+        """
+        self._stopping = True
+        remaining = {
+            name
+            for name, supervised in self.tasks.items()
+            if supervised.task is not None and not supervised.task.done()
+        }
+        while remaining:
+            layer = [
+                name
+                for name in remaining
+                if not any(name in self.tasks[other].depends_on for other in remaining)
+            ]
+            if not layer:
+                self.logger.warning(
+                    "TaskSupervisor: circular dependencies among the {} tasks",
+                    sorted(remaining),
+                )
+                layer = list(remaining)
+
+            self.logger.debug("TaskSupervisor: cancelling the {} tasks", sorted(layer))
+            tasks = [self.tasks[name].task for name in layer]
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks, timeout=timeout)
+            remaining.difference_update(layer)
+
+    def _register_metrics(self, supervised):
+        if self.metrics is None:
+            return
+
+        self.metrics.gauge(
+            "supervised_task_cpu_seconds",
+            "The CPU time spent in the steps of the supervised task",
+            ["task"],
+        ).labels(supervised.name).set_function(lambda: supervised.cpu_time)
+        self.metrics.gauge(
+            "supervised_task_wall_seconds",
+            "The wall-clock time the supervised task was running",
+            ["task"],
+        ).labels(supervised.name).set_function(lambda: supervised.wall_time)
+        self.metrics.gauge(
+            "supervised_task_running",
+            "1 if the supervised task is running, 0 if it is finished, failed, or waiting for restart",
+            ["task"],
+        ).labels(supervised.name).set_function(
+            lambda: int(supervised.state == "running")
+        )
+
+    def _count_restart(self, supervised):
+        supervised.restarts += 1
+        if self.metrics is not None:
+            self.metrics.counter(
+                "supervised_task_restarts",
+                "The number of the restarts of the supervised task",
+                ["task"],
+            ).labels(supervised.name).inc()
+
+    async def _supervise(self, supervised):
+        """
+        Runs the task, and restarts it according to its restart policy
+        """
+        loop = asyncio.get_running_loop()
+        delay = self.backoff_initial
+        while True:
+            supervised.state = "running"
+            started = loop.time()
+            failed = False
+            try:
+                await _AccountedCoroutine(supervised.factory(), supervised)
+            except asyncio.CancelledError:
+                supervised.state = "cancelled"
+                raise
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                failed = True
+                self.logger.opt(exception=True).error(
+                    "TaskSupervisor: the {} task failed: {}", supervised.name, err
+                )
+            finally:
+                supervised.wall_time += loop.time() - started
+
+            restart = supervised.restart == RestartPolicy.ALWAYS or (
+                failed and supervised.restart == RestartPolicy.ON_FAILURE
+            )
+            if supervised.max_restarts is not None:
+                restart = restart and supervised.restarts < supervised.max_restarts
+            if self._stopping or not restart:
+                supervised.state = "failed" if failed else "finished"
+                if failed:
+                    self._degrade(supervised)
+                return
+
+            if loop.time() - started > self.backoff_max:
+                delay = self.backoff_initial
+            supervised.state = "restarting"
+            self.logger.warning(
+                "TaskSupervisor: restarting the {} task in {:0.3f} seconds",
+                supervised.name,
+                delay,
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.backoff_max)
+            self._count_restart(supervised)
+
+    def _degrade(self, supervised):
+        """
+        Adds the failed task to the reasons of the degradation of the service, because it is not restarted any more
+        """
+        if self.health_check is not None and self.health_check.degrade(
+            f"task:{supervised.name}"
+        ):
+            self.logger.warning(
+                "TaskSupervisor: the {} task is not restarted, the service is degraded",
+                supervised.name,
+            )
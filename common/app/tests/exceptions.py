@@ -1,7 +0,0 @@
-"""Custom exceptions"""
-
-
-class HealthCheckTestError(BaseException):
-    """
-    Raise when test_health_check fails
-    """
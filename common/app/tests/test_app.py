@@ -1,7 +1,13 @@
 """Test the application module"""
+import asyncio
+import os
+import signal
 import unittest
+from unittest import mock
 from common.app import ApplicationBase, application_entrypoint, terminate
-from common.config import Config
+from common.app.signals import DelayedKeyboardInterrupt
+from common.config import Config, ConfigEntry, ConfigError
+from common.logger import is_enabled
 
 
 class TestApplication(ApplicationBase):
@@ -23,6 +29,66 @@ class TestApplication(ApplicationBase):
         terminate()
 
 
+class SignalledApplication(ApplicationBase):
+    """
+    An application, that sends a SIGTERM to itself in its jobs
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.events = []
+        self.stop_handler = None
+
+    async def start(self):
+        """Starts the application"""
+
+    async def stop(self):
+        """Shuts down the application"""
+        self.events.append("stop")
+        self.stop_handler = signal.getsignal(signal.SIGTERM)
+
+    async def jobs(self):
+        """Sends the signal, then works until cancelled"""
+        os.kill(os.getpid(), signal.SIGTERM)
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.events.append("jobs cancelled")
+            raise
+
+
+class CooperativeApplication(ApplicationBase):
+    """
+    An application, that requests its shutdown, while its pipeline has work in progress
+    """
+
+    processed = []
+
+    async def start(self):
+        """Starts the application"""
+
+    async def stop(self):
+        """Shuts down the application"""
+
+    async def jobs(self):
+        """Puts items into the pipeline, then requests the shutdown"""
+
+        async def handle(item):
+            await asyncio.sleep(0.01)
+            self.processed.append(item)
+
+        pipeline = self.create_pipeline("cooperative")
+        pipeline.add_stage("handle", handle, workers=2)
+        pipeline.start()
+        await pipeline.put_many(range(10))
+        await self.request_shutdown("jobs finished", exit_code=3)
+        await self.request_shutdown("ignored", exit_code=4)
+
+        # The jobs are not cancelled, they can finish their work after the shutdown is requested
+        await asyncio.sleep(0.1)
+        self.processed.append("final step")
+
+
 class ApplicationTestCase(unittest.IsolatedAsyncioTestCase):
     """The Application test cases"""
 
@@ -33,3 +99,91 @@ class ApplicationTestCase(unittest.IsolatedAsyncioTestCase):
         config = Config(app_name, "test-app-description", [])
         self.assertEqual(config.app_name, app_name)
         application_entrypoint(TestApplication, config, argv=[])
+
+    def test_reload_config(self) -> None:
+        """Test the reload of the config, and the change callbacks"""
+        with mock.patch.dict(os.environ, {"LOG_LEVEL": "info"}):
+            config = Config(
+                "test-app-name",
+                "test-app-description",
+                [
+                    ConfigEntry(name="LOG_LEVEL", default="info"),
+                    ConfigEntry(name="LOG_FORMAT", default="text"),
+                    ConfigEntry(name="BATCH_SIZE", default=10, entry_type=int),
+                ],
+            )
+            app = TestApplication(config)
+            changes = []
+
+            async def on_change(name, old_value, new_value):
+                changes.append((name, old_value, new_value))
+
+            app.on_config_change("BATCH_SIZE", on_change)
+            self.assertEqual(asyncio.run(app.reload_config()), {})
+            self.assertFalse(is_enabled("debug"))
+
+            os.environ.update({"BATCH_SIZE": "20", "LOG_LEVEL": "debug"})
+            asyncio.run(app.reload_config())
+            self.assertEqual(changes, [("BATCH_SIZE", 10, 20)])
+            self.assertEqual(app.config.BATCH_SIZE, 20)
+            self.assertTrue(is_enabled("debug"))
+
+            os.environ["LOG_LEVEL"] = "info"
+            asyncio.run(app.reload_config())
+            self.assertFalse(is_enabled("debug"))
+
+    def test_hup_handler_restored(self) -> None:
+        """Test that the SIGHUP handler of the config reload is removed, when the application exits"""
+        config = Config(
+            "test-app-name",
+            "test-app-description",
+            [ConfigEntry(name="CONFIG_RELOAD", default=True, entry_type=bool)],
+        )
+        previous = signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        try:
+            application_entrypoint(TestApplication, config, argv=[])
+            self.assertIs(signal.getsignal(signal.SIGHUP), signal.SIG_IGN)
+        finally:
+            signal.signal(signal.SIGHUP, previous)
+
+    def test_loop_signal_mode(self) -> None:
+        """Test that a termination signal shuts down the application without an exception in the loop mode"""
+        config = Config(
+            "test-app-name",
+            "test-app-description",
+            [ConfigEntry(name="SIGNAL_MODE", default="loop")],
+        )
+        handlers = {
+            sig: signal.getsignal(sig) for sig in [signal.SIGINT, signal.SIGTERM]
+        }
+        try:
+            app = SignalledApplication(config)
+            self.assertEqual(app.run(), 0)
+        finally:
+            for sig, handler in handlers.items():
+                signal.signal(sig, handler)
+
+        self.assertEqual(app.events, ["jobs cancelled", "stop"])
+        # The signal handlers of the event loop are not replaced during the stop
+        self.assertNotIsInstance(
+            getattr(app.stop_handler, "__self__", None), DelayedKeyboardInterrupt
+        )
+
+    def test_invalid_signal_mode(self) -> None:
+        """Test that an unknown signal mode is refused"""
+        config = Config(
+            "test-app-name",
+            "test-app-description",
+            [ConfigEntry(name="SIGNAL_MODE", default="lop")],
+        )
+        with self.assertRaises(ConfigError):
+            SignalledApplication(config)
+
+    def test_request_shutdown(self) -> None:
+        """Test that the cooperative shutdown drains the work in progress, and returns with the exit code"""
+        config = Config("test-app-name", "test-app-description", [])
+        self.assertEqual(
+            application_entrypoint(CooperativeApplication, config, argv=[]), 3
+        )
+        self.assertEqual(CooperativeApplication.processed[-1], "final step")
+        self.assertEqual(sorted(CooperativeApplication.processed[:-1]), list(range(10)))
@@ -0,0 +1,40 @@
+"""Test the config file watcher"""
+import asyncio
+import os
+import tempfile
+import unittest
+from common.app.config_reload import ConfigFileWatcher
+from common.logger import get_logger
+
+
+class ConfigFileWatcherTestCase(unittest.IsolatedAsyncioTestCase):
+    """The config file watcher test cases"""
+
+    async def test_failing_callback(self) -> None:
+        """Test that the watcher keeps polling, after the callback has failed"""
+        calls = []
+
+        async def callback():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("reload failed")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, ".env")
+            watcher = ConfigFileWatcher(get_logger(), path, 0.01, callback)
+            watcher.start(asyncio.get_running_loop())
+            # Let the watcher read the initial state of the file
+            await asyncio.sleep(0)
+            try:
+                for content in ["A=1\n", "A=22\n"]:
+                    with open(path, "w", encoding="utf-8") as env_file:
+                        env_file.write(content)
+                    count = len(calls)
+                    for _ in range(100):
+                        await asyncio.sleep(0.01)
+                        if len(calls) > count:
+                            break
+            finally:
+                watcher.stop()
+
+        self.assertEqual(len(calls), 2)
@@ -0,0 +1,89 @@
+"""Test the event loop selection"""
+import asyncio
+import unittest
+from common.app import ApplicationBase, application_entrypoint, terminate
+from common.app.event_loop import get_event_loop_factory
+from common.config import Config, ConfigEntry
+from common.logger import get_logger
+
+created_loops = []
+
+
+def new_recorded_event_loop():
+    """Custom event loop factory that records the loops it creates"""
+    loop = asyncio.new_event_loop()
+    created_loops.append(loop)
+    return loop
+
+
+class TestApplication(ApplicationBase):
+    """
+    The TestApplication class
+    """
+
+    running_loop = None
+
+    async def start(self):
+        """Starts the application"""
+        TestApplication.running_loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        """Shuts down the application"""
+
+    async def jobs(self):
+        """Jobs"""
+        terminate()
+
+
+class EventLoopTestCase(unittest.TestCase):
+    """The event loop factory test cases"""
+
+    def test_default_factory(self) -> None:
+        """Test that the asyncio loop is used by default"""
+        logger = get_logger()
+        self.assertIs(get_event_loop_factory(logger), asyncio.new_event_loop)
+        self.assertIs(get_event_loop_factory(logger, "asyncio"), asyncio.new_event_loop)
+
+    def test_custom_factory(self) -> None:
+        """Test the resolution of custom factories by name and by reference"""
+        logger = get_logger()
+        name = "common.app.tests.test_event_loop:new_recorded_event_loop"
+        self.assertIs(get_event_loop_factory(logger, name), new_recorded_event_loop)
+        self.assertIs(
+            get_event_loop_factory(logger, name.replace(":", ".")),
+            new_recorded_event_loop,
+        )
+        self.assertIs(
+            get_event_loop_factory(logger, new_recorded_event_loop),
+            new_recorded_event_loop,
+        )
+
+    def test_fallback(self) -> None:
+        """Test the fallback to the asyncio loop if the selected loop is not available"""
+        logger = get_logger()
+        self.assertIs(
+            get_event_loop_factory(logger, "no_such_module:new_event_loop"),
+            asyncio.new_event_loop,
+        )
+        self.assertIs(
+            get_event_loop_factory(logger, "asyncio:get_event_loop_policy_missing"),
+            asyncio.new_event_loop,
+        )
+
+    def test_application_uses_factory(self) -> None:
+        """Test that the application runs on the loop made by the selected factory"""
+        config = Config(
+            "test-app-name",
+            "test-app-description",
+            [
+                ConfigEntry(
+                    name="EVENT_LOOP",
+                    help_text="The event loop implementation",
+                    default=new_recorded_event_loop,
+                ),
+            ],
+        )
+        application_entrypoint(TestApplication, config, argv=[])
+        self.assertEqual(len(created_loops), 1)
+        self.assertIs(TestApplication.running_loop, created_loops[0])
+        self.assertTrue(created_loops[0].is_closed())
@@ -0,0 +1,43 @@
+"""Test the managed executors module"""
+import asyncio
+import os
+import threading
+import unittest
+from common.app.executors import ManagedExecutors
+from common.logger import get_logger
+from common.metrics import MetricsRegistry
+
+
+class ManagedExecutorsTestCase(unittest.TestCase):
+    """The managed executors test cases"""
+
+    def test_run_blocking_and_cpu(self) -> None:
+        """Test the offloading to the thread pool and the process pool, and their metrics"""
+        metrics = MetricsRegistry()
+        executors = ManagedExecutors(
+            get_logger(), metrics, thread_pool_size=2, process_pool_size=1
+        )
+
+        async def run():
+            thread_name = await executors.run_blocking(
+                lambda: threading.current_thread().name
+            )
+            power = await executors.run_blocking(pow, 2, exp=10)
+            pid = await executors.run_cpu(os.getpid)
+            return thread_name, power, pid
+
+        try:
+            thread_name, power, pid = asyncio.run(run())
+        finally:
+            executors.shutdown()
+
+        self.assertTrue(thread_name.startswith("app-blocking"))
+        self.assertEqual(power, 1024)
+        self.assertNotEqual(pid, os.getpid())
+
+        lines = metrics.render().splitlines()
+        self.assertIn('executor_pending_tasks{executor="thread"} 0', lines)
+        self.assertIn('executor_task_latency_seconds_count{executor="thread"} 2', lines)
+        self.assertIn(
+            'executor_task_latency_seconds_count{executor="process"} 1', lines
+        )
@@ -1,26 +1,49 @@
 """Test the application module"""
+import asyncio
+import json
+import os
+import tempfile
 import unittest
+from unittest import mock
+import aiohttp
 import requests
 from common.app import ApplicationBase, application_entrypoint, terminate
+from common.app.health_check import HealthCheck
+from common.logger import get_logger
 from common.config import Config, ConfigEntry, CliEntry
-from .exceptions import HealthCheckTestError
+
+# The failures of the checks made by the application. They are asserted by the test case, after the application exits.
+failures = []
 
 
 def check_response(expected_status_code, expected_notes, response):
     """
-    Compare expected and actual status codes and notes from response. Raise a HealthCheckTestError if one of them is
+    Compare expected and actual status codes and notes from response. Record a failure if one of them is
     not equal.
     """
     if expected_status_code != response.status_code:
-        raise HealthCheckTestError(
+        failures.append(
             f"Expected and actual status codes are not equal: {expected_status_code} and {response.status_code}"
         )
-    if expected_notes != response.json()["notes"]:
-        raise HealthCheckTestError(
+    elif expected_notes != response.json()["notes"]:
+        failures.append(
             f"Expected and actual notes are not equal: {expected_notes} and {response.json()['notes']}"
         )
 
 
+def check_probes(expected_status_codes):
+    """
+    Compare the expected and actual status codes of the probe endpoints. Record a failure if they are not equal.
+    """
+    for probe, expected_status_code in expected_status_codes.items():
+        response = requests.get(f"http://127.0.0.1:8008/{probe}", timeout=5)
+        if expected_status_code != response.status_code:
+            failures.append(
+                f"Expected and actual status codes of {probe} are not equal: "
+                f"{expected_status_code} and {response.status_code}"
+            )
+
+
 class TestApplication(ApplicationBase):
     """
     The TestApplication class
@@ -34,13 +57,13 @@ class TestApplication(ApplicationBase):
         expected_status_code = 503
         expected_notes = ["No information about the service"]
 
-        future = self._loop.run_in_executor(
-            None, requests.get, "http://127.0.0.1:8008/health"
-        )
-        response = await future
+        response = await self.run_blocking(requests.get, "http://127.0.0.1:8008/health")
 
         check_response(expected_status_code, expected_notes, response)
-        self.logger.info("1. test case passed")
+        await self.run_blocking(
+            check_probes, {"livez": 503, "readyz": 503, "startupz": 503}
+        )
+        self.logger.info("1. test case checked")
 
         # WARMUP state
         self.logger.info("Set service state to WARMUP")
@@ -49,13 +72,13 @@ class TestApplication(ApplicationBase):
         expected_status_code = 202
         expected_notes = ["Service is not healthy, it is warming up or shutting down"]
 
-        future = self._loop.run_in_executor(
-            None, requests.get, "http://127.0.0.1:8008/health"
-        )
-        response = await future
+        response = await self.run_blocking(requests.get, "http://127.0.0.1:8008/health")
 
         check_response(expected_status_code, expected_notes, response)
-        self.logger.info("2. test case passed")
+        await self.run_blocking(
+            check_probes, {"livez": 200, "readyz": 503, "startupz": 503}
+        )
+        self.logger.info("2. test case checked")
 
         # WORK state
         self.logger.info("Set service state to WORK")
@@ -64,13 +87,24 @@ class TestApplication(ApplicationBase):
         expected_status_code = 200
         expected_notes = ["Service is running"]
 
-        future = self._loop.run_in_executor(
-            None, requests.get, "http://127.0.0.1:8008/health"
-        )
-        response = await future
+        response = await self.run_blocking(requests.get, "http://127.0.0.1:8008/health")
 
         check_response(expected_status_code, expected_notes, response)
-        self.logger.info("3. test case passed")
+        await self.run_blocking(
+            check_probes, {"livez": 200, "readyz": 200, "startupz": 200}
+        )
+        self.logger.info("3. test case checked")
+
+        # Metrics endpoint
+        response = await self.run_blocking(
+            requests.get, "http://127.0.0.1:8008/metrics"
+        )
+
+        if response.status_code != 200 or "process_uptime_seconds" not in response.text:
+            failures.append(
+                f"Unexpected metrics response: {response.status_code} {response.text}"
+            )
+        self.logger.info("Metrics test case checked")
 
     async def stop(self):
         """Shuts down the application"""
@@ -87,13 +121,14 @@ class TestApplication(ApplicationBase):
         expected_status_code = 202
         expected_notes = ["Service is not healthy, it is warming up or shutting down"]
 
-        future = self._loop.run_in_executor(
-            None, requests.get, "http://127.0.0.1:8008/health"
-        )
-        response = await future
+        response = await self.run_blocking(requests.get, "http://127.0.0.1:8008/health")
 
         check_response(expected_status_code, expected_notes, response)
-        self.logger.info("4. test case passed")
+        # The startup probe keeps passing, once the service has been working
+        await self.run_blocking(
+            check_probes, {"livez": 200, "readyz": 503, "startupz": 200}
+        )
+        self.logger.info("4. test case checked")
 
         terminate()
 
@@ -143,4 +178,149 @@ class ApplicationTestCase(unittest.IsolatedAsyncioTestCase):
             ],
         )
         self.assertEqual(config.app_name, app_name)
-        application_entrypoint(TestApplication, config, argv=[])
+        failures.clear()
+        exit_code = application_entrypoint(TestApplication, config, argv=[])
+        self.assertEqual(failures, [])
+        self.assertEqual(exit_code, 0)
+
+        # The server is stopped, when the application shuts down
+        with self.assertRaises(requests.ConnectionError):
+            requests.get("http://127.0.0.1:8008/health", timeout=5)
+
+
+class ComponentCheckTestCase(unittest.IsolatedAsyncioTestCase):
+    """The component health check test cases"""
+
+    async def test_cached_checks(self) -> None:
+        """Test that the checks run in the background, and their cached results are reported"""
+        health_check = HealthCheck(get_logger(), "test-service")
+        health_check.set_state_working()
+        runs = []
+
+        async def pool_size():
+            runs.append("pool")
+            return 5
+
+        async def downstream():
+            raise ConnectionError("refused")
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        async def queue_depth():
+            return {"depth": {1, 2}}
+
+        health_check.add_check("db:connections", pool_size, interval=60)
+        health_check.add_check("api", downstream, interval=60)
+        health_check.add_check("queue", queue_depth, interval=60)
+        health_check.start_checks()
+        health_check.add_check("slow", slow, interval=60, timeout=0.01)
+        await asyncio.sleep(0.05)
+
+        for _ in range(3):
+            response = await health_check.health(None)
+        health_check.stop_checks()
+
+        body = json.loads(response.body)
+        # The failing checks make the whole service fail
+        self.assertEqual(response.status, 503)
+        self.assertEqual(body["status"], "fail")
+        self.assertEqual(runs, ["pool"])
+        checks = body["checks"]
+        self.assertEqual(checks["db:connections"][0]["status"], "pass")
+        self.assertEqual(checks["db:connections"][0]["observedValue"], 5)
+        self.assertEqual(checks["api"][0]["status"], "fail")
+        self.assertEqual(checks["api"][0]["output"], "ConnectionError: refused")
+        self.assertEqual(checks["slow"][0]["status"], "fail")
+        # The value, that can not be encoded to JSON, is reported as string
+        self.assertEqual(checks["queue"][0]["observedValue"], str({"depth": {1, 2}}))
+
+        with self.assertRaises(ValueError):
+            health_check.add_check("api", downstream)
+
+    async def test_check_task_survives_errors(self) -> None:
+        """Test that the check keeps running, if its result could not be recorded"""
+        health_check = HealthCheck(get_logger(), "test-service")
+        runs = []
+
+        async def check():
+            runs.append(True)
+
+        health_check.add_check("db", check, interval=0.01)
+        with mock.patch.object(
+            health_check, "_refresh_responses", side_effect=RuntimeError("broken")
+        ):
+            health_check.start_checks()
+            await asyncio.sleep(0.05)
+        health_check.stop_checks()
+        self.assertGreater(len(runs), 1)
+
+    async def test_passing_checks(self) -> None:
+        """Test that the passing checks keep the status of the service state"""
+        health_check = HealthCheck(get_logger(), "test-service")
+
+        async def passing():
+            return True
+
+        health_check.add_check("db", passing, interval=60)
+        health_check.set_state_working()
+        # Before the first run of the check, the result is unknown
+        self.assertEqual((await health_check.health(None)).status, 202)
+
+        health_check.start_checks()
+        await asyncio.sleep(0.01)
+        response = await health_check.health(None)
+        health_check.stop_checks()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(response.body)["status"], "pass")
+
+
+class BindingTestCase(unittest.IsolatedAsyncioTestCase):
+    """The health check binding mode test cases"""
+
+    async def test_unix_socket(self) -> None:
+        """Test that the health check can be served over a Unix domain socket"""
+        with tempfile.TemporaryDirectory() as directory:
+            socket_path = os.path.join(directory, "health.sock")
+            health_check = HealthCheck(
+                get_logger(), "test-service", socket_path=socket_path, backlog=8
+            )
+            health_check.set_state_working()
+            await health_check.run_server()
+
+            connector = aiohttp.UnixConnector(path=socket_path)
+            async with aiohttp.ClientSession(connector=connector) as session:
+                async with session.get("http://localhost/readyz") as response:
+                    self.assertEqual(response.status, 200)
+
+            await health_check.stop_server()
+            self.assertFalse(os.path.exists(socket_path))
+
+    def test_worker_socket_path(self) -> None:
+        """Test that the workers serve the health check on their own Unix domain sockets"""
+        config = Config(
+            "test-app-name",
+            "test-app-description",
+            [
+                ConfigEntry(name="HEALTH_CHECK_SOCKET", default="/tmp/health.sock"),
+                ConfigEntry(name="WORKERS", default=2, entry_type=int),
+            ],
+        )
+        app = TestApplication(config)
+        # pylint: disable=protected-access
+        self.assertEqual(app._health_check_options()["socket_path"], "/tmp/health.sock")
+        app.worker_id = 1
+        options = app._health_check_options()
+        self.assertEqual(options["socket_path"], "/tmp/health.sock.1")
+        self.assertTrue(options["reuse_port"])
+
+    async def test_reuse_port(self) -> None:
+        """Test that more health check servers can share a port with SO_REUSEPORT"""
+        health_checks = [
+            HealthCheck(get_logger(), "test-service", port=8018, reuse_port=True)
+            for _ in range(2)
+        ]
+        for health_check in health_checks:
+            await health_check.run_server()
+        for health_check in health_checks:
+            await health_check.stop_server()
@@ -0,0 +1,71 @@
+"""Test the event loop lag monitor"""
+import asyncio
+import time
+import unittest
+from common.app.health_check import HealthCheck, State
+from common.app.loop_monitor import LoopLagMonitor, percentile
+from common.logger import get_logger
+from common.metrics import MetricsRegistry
+
+
+class LoopLagMonitorTestCase(unittest.TestCase):
+    """The loop lag monitor test cases"""
+
+    def test_percentile(self) -> None:
+        """Test the nearest-rank percentile calculation"""
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile([0.3], 99), 0.3)
+        self.assertEqual(percentile([], 99), 0.0)
+
+    def test_health_state_flips(self) -> None:
+        """Test that the health state is degraded while the p99 lag exceeds the threshold"""
+        health_check = HealthCheck(get_logger(), "test-service")
+        monitor = LoopLagMonitor(
+            get_logger(), MetricsRegistry(), health_check, window=10, threshold=0.1
+        )
+
+        # The warm-up state is not overridden
+        health_check.set_state_warm_up()
+        monitor.record(0.5)
+        self.assertEqual(health_check.service_state, State.WARMUP)
+
+        health_check.set_state_working()
+        monitor.record(0.5)
+        self.assertEqual(health_check.service_state, State.DEGRADED)
+
+        for _ in range(10):
+            monitor.record(0.01)
+        self.assertEqual(health_check.service_state, State.WORK)
+
+        # The monitor does not clear the degradation of the other components
+        health_check.degrade("task:consumer")
+        monitor.record(0.5)
+        for _ in range(10):
+            monitor.record(0.01)
+        self.assertEqual(health_check.service_state, State.DEGRADED)
+        health_check.recover("task:consumer")
+        self.assertEqual(health_check.service_state, State.WORK)
+
+    def test_lag_measurement(self) -> None:
+        """Test that a blocked loop is detected"""
+        metrics = MetricsRegistry()
+        monitor = LoopLagMonitor(get_logger(), metrics, None, interval=0.01)
+
+        async def block():
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)
+            await asyncio.sleep(0.05)
+
+        loop = asyncio.new_event_loop()
+        try:
+            monitor.start(loop)
+            loop.run_until_complete(block())
+            monitor.stop()
+            loop.run_until_complete(asyncio.sleep(0))
+        finally:
+            loop.close()
+
+        self.assertGreater(max(monitor.samples), 0.05)
+        self.assertGreater(metrics.get("asyncio_loop_lag_p99_seconds").get(), 0.05)
@@ -0,0 +1,181 @@
+"""Test the graceful shutdown module"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import unittest
+from common.app import ApplicationBase, application_entrypoint, terminate
+from common.app.health_check import HealthCheck, State
+from common.app.shutdown import ShutdownBudget
+from common.config import Config, ConfigEntry
+from common.logger import get_logger
+
+
+class HangingApplication(ApplicationBase):
+    """
+    An application, whose stop() and background task do not finish in time
+    """
+
+    async def start(self):
+        """Starts a task, that ignores the first cancellation"""
+
+        async def stubborn():
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                await asyncio.sleep(60)
+
+        asyncio.create_task(stubborn(), name="stubborn")
+
+    async def stop(self):
+        """Hangs"""
+        await asyncio.Event().wait()
+
+    async def jobs(self):
+        """Jobs"""
+        terminate()
+
+
+class AbandoningApplication(ApplicationBase):
+    """
+    An application, that has a blocking task running in the thread pool, when it shuts down
+    """
+
+    async def start(self):
+        """Starts a blocking task"""
+        asyncio.create_task(self.run_blocking(time.sleep, 3))
+
+    async def stop(self):
+        """Shuts down the application"""
+
+    async def jobs(self):
+        """Jobs"""
+        await asyncio.sleep(0.05)
+        await self.request_shutdown("jobs finished", exit_code=5)
+
+
+class SlowCooperativeApplication(ApplicationBase):
+    """
+    An application, whose jobs() and stop() do not finish in time, after the shutdown was requested
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.health_check = HealthCheck(self.logger, "test-service")
+        self.requested = None
+        self.state = None
+
+    async def start(self):
+        """Starts the application"""
+        self.health_check.set_state_working()
+
+    async def stop(self):
+        """Hangs"""
+        await asyncio.Event().wait()
+
+    async def jobs(self):
+        """Requests the shutdown, then keeps working"""
+        self.requested = time.monotonic()
+        await self.request_shutdown("jobs finished")
+        self.state = self.health_check.service_state
+        await asyncio.sleep(60)
+
+
+class FailingStopApplication(ApplicationBase):
+    """
+    An application, whose stop() raises an exception
+    """
+
+    async def start(self):
+        """Starts the application"""
+
+    async def stop(self):
+        """Fails"""
+        raise RuntimeError("stop is broken")
+
+    async def jobs(self):
+        """Jobs"""
+        terminate()
+
+
+def run_abandoning_application():
+    """Runs the AbandoningApplication in a subprocess of the test"""
+    config = Config(
+        "test-app-name",
+        "test-app-description",
+        [ConfigEntry(name="SHUTDOWN_TIMEOUT", default=0.5, entry_type=float)],
+    )
+    return application_entrypoint(AbandoningApplication, config, argv=[])
+
+
+class ShutdownBudgetTestCase(unittest.TestCase):
+    """The shutdown budget test cases"""
+
+    def test_phase_timeouts(self) -> None:
+        """Test that the time not used by a phase is available for the later phases"""
+        budget = ShutdownBudget(get_logger(), 10.0)
+        self.assertAlmostEqual(budget.timeout("health"), 0.0, delta=0.01)
+        # The intake may use the whole budget, except the shares of the later phases
+        self.assertAlmostEqual(budget.timeout("intake"), 2.0, delta=0.01)
+        self.assertAlmostEqual(budget.timeout("close"), 10.0, delta=0.01)
+
+        budget.deadline = time.monotonic() + 1.0
+        # The own share of a phase is kept, even if the earlier phases used up the time of the later ones
+        self.assertAlmostEqual(budget.timeout("drain"), 1.0, delta=0.01)
+
+        with budget.phase("stop") as timeout:
+            self.assertAlmostEqual(timeout, 1.0, delta=0.01)
+
+        self.assertIsNone(ShutdownBudget(get_logger()).timeout("drain"))
+        self.assertIsNone(ShutdownBudget(get_logger(), 0).timeout("drain"))
+
+    def test_hanging_application(self) -> None:
+        """Test that the shutdown of a hanging application finishes within the budget"""
+        config = Config(
+            "test-app-name",
+            "test-app-description",
+            [ConfigEntry(name="SHUTDOWN_TIMEOUT", default=1.0, entry_type=float)],
+        )
+        started = time.monotonic()
+        application_entrypoint(HangingApplication, config, argv=[])
+        self.assertLess(time.monotonic() - started, 2.0)
+
+    def test_requested_shutdown_budget(self) -> None:
+        """Test that the budget starts, and the health state is flipped, when the shutdown is requested"""
+        config = Config(
+            "test-app-name",
+            "test-app-description",
+            [ConfigEntry(name="SHUTDOWN_TIMEOUT", default=2.0, entry_type=float)],
+        )
+        app = SlowCooperativeApplication(config)
+        app.run()
+        self.assertLess(time.monotonic() - app.requested, 2.2)
+        self.assertEqual(app.state, State.SHUTDOWN)
+
+    def test_failing_stop(self) -> None:
+        """Test that the shutdown is completed, and the exit code is set, if the stop() fails"""
+        config = Config("test-app-name", "test-app-description", [])
+        app = FailingStopApplication(config)
+        self.assertEqual(app.run(), 1)
+        self.assertTrue(app._loop.is_closed())  # pylint: disable=protected-access
+
+    def test_abandoned_threads(self) -> None:
+        """Test that the process exits within the budget, even if a thread of the executor is still running"""
+        started = time.monotonic()
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from common.app.tests.test_shutdown import run_abandoning_application; "
+                "sys.exit(run_abandoning_application())",
+            ],
+            cwd=os.path.dirname(
+                os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+            ),
+            capture_output=True,
+            check=False,
+        )
+        self.assertLess(time.monotonic() - started, 2.5)
+        self.assertEqual(result.returncode, 5)
+        self.assertIn(b"abandoned tasks: {'thread': 1, 'process': 0}", result.stderr)
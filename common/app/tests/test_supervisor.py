@@ -0,0 +1,110 @@
+"""Test the task supervisor module"""
+import asyncio
+import time
+import unittest
+from common.app.health_check import HealthCheck, State
+from common.app.supervisor import RestartPolicy, TaskSupervisor
+from common.logger import get_logger
+from common.metrics import MetricsRegistry
+
+
+class TaskSupervisorTestCase(unittest.IsolatedAsyncioTestCase):
+    """The task supervisor test cases"""
+
+    async def test_restart_on_failure(self) -> None:
+        """Test that a failing task is restarted, then the service is degraded, when it is not restarted any more"""
+        health_check = HealthCheck(get_logger(), "test-service")
+        health_check.set_state_working()
+        metrics = MetricsRegistry()
+        supervisor = TaskSupervisor(
+            get_logger(), metrics, health_check=health_check, backoff_initial=0.001
+        )
+        runs = []
+
+        async def crash():
+            runs.append(time.perf_counter())
+            raise ValueError("wrong value")
+
+        supervised = supervisor.spawn("crash", crash, max_restarts=3)
+        await supervised.task
+
+        self.assertEqual(len(runs), 4)
+        self.assertEqual(supervisor.stats()["crash"]["restarts"], 3)
+        self.assertEqual(supervised.state, "failed")
+        self.assertEqual(health_check.service_state, State.DEGRADED)
+        self.assertIn('supervised_task_restarts{task="crash"} 3', metrics.render())
+        self.assertIn('supervised_task_wall_seconds{task="crash"}', metrics.render())
+
+        # The backoff delay is doubled after each restart
+        delays = [later - earlier for earlier, later in zip(runs, runs[1:])]
+        self.assertGreaterEqual(delays[2], 0.004)
+
+    async def test_restart_policies(self) -> None:
+        """Test that the finished tasks are only restarted with the ALWAYS policy"""
+        supervisor = TaskSupervisor(get_logger(), backoff_initial=0.001)
+        runs = {"never": 0, "always": 0}
+
+        def job(name):
+            async def run():
+                runs[name] += 1
+
+            return run
+
+        never = supervisor.spawn("never", job("never"), restart=RestartPolicy.NEVER)
+        always = supervisor.spawn(
+            "always", job("always"), restart="always", max_restarts=2
+        )
+        await asyncio.gather(never.task, always.task)
+
+        self.assertEqual(runs, {"never": 1, "always": 3})
+        self.assertEqual(never.state, "finished")
+
+    async def test_cpu_accounting(self) -> None:
+        """Test that the CPU time is only accounted while the task runs"""
+        supervisor = TaskSupervisor(get_logger())
+
+        async def busy():
+            started = time.thread_time()
+            while time.thread_time() - started < 0.05:
+                pass
+            await asyncio.sleep(0.05)
+
+        async def idle():
+            await asyncio.sleep(0.1)
+
+        tasks = [
+            supervisor.spawn(name, factory, restart=RestartPolicy.NEVER).task
+            for name, factory in [("busy", busy), ("idle", idle)]
+        ]
+        await asyncio.gather(*tasks)
+
+        stats = supervisor.stats()
+        self.assertGreaterEqual(stats["busy"]["cpu_time"], 0.05)
+        self.assertLess(stats["busy"]["cpu_time"], 0.09)
+        self.assertLess(stats["idle"]["cpu_time"], 0.02)
+        self.assertGreaterEqual(stats["idle"]["wall_time"], 0.1)
+
+    async def test_shutdown_order(self) -> None:
+        """Test that the tasks are cancelled after the tasks that depend on them"""
+        supervisor = TaskSupervisor(get_logger())
+        cancelled = []
+
+        def job(name):
+            async def run():
+                try:
+                    await asyncio.Event().wait()
+                finally:
+                    cancelled.append(name)
+
+            return run
+
+        supervisor.spawn("writer", job("writer"))
+        supervisor.spawn("consumer", job("consumer"), depends_on=["writer"])
+        supervisor.spawn("producer", job("producer"), depends_on=["consumer"])
+        await asyncio.sleep(0)
+        await supervisor.shutdown()
+
+        self.assertEqual(cancelled, ["producer", "consumer", "writer"])
+        self.assertEqual(supervisor.get("writer").state, "cancelled")
+        with self.assertRaises(ValueError):
+            supervisor.spawn("writer", job("writer"))
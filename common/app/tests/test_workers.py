@@ -0,0 +1,236 @@
+"""Test the pre-fork worker mode"""
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from common.app import ApplicationBase, application_entrypoint, terminate
+from common.app.workers import WorkerSupervisor
+from common.config import Config, ConfigEntry
+from common.logger import get_logger
+
+
+def open_read(directory, name):
+    """Read the content of a marker file"""
+    with open(os.path.join(directory, name), encoding="utf-8") as marker_file:
+        return marker_file.read()
+
+
+class TestApplication(ApplicationBase):
+    """
+    The TestApplication class, that crashes once per worker before it succeeds
+    """
+
+    markers_dir = None
+
+    async def start(self):
+        """Starts the application, and crashes if this is the first start of the worker"""
+        marker = os.path.join(self.markers_dir, f"worker-{self.worker_id}")
+        if not os.path.exists(marker):
+            with open(marker, "w", encoding="utf-8") as marker_file:
+                marker_file.write(str(os.getpid()))
+            raise RuntimeError(f"worker {self.worker_id} crashes at the first start")
+
+    async def stop(self):
+        """Shuts down the application"""
+
+    async def jobs(self):
+        """Jobs"""
+        with open(
+            os.path.join(self.markers_dir, f"done-{self.worker_id}"),
+            "w",
+            encoding="utf-8",
+        ) as done_file:
+            done_file.write(str(os.getpid()))
+        terminate()
+
+
+class CrashingApplication(TestApplication):
+    """
+    The TestApplication class, that always crashes at start
+    """
+
+    async def start(self):
+        """Crashes"""
+        raise RuntimeError(f"worker {self.worker_id} crashes at every start")
+
+
+class LoggingApplication(TestApplication):
+    """
+    The TestApplication class, that logs a lot after its event loop is closed
+    """
+
+    def run(self):
+        """Runs the application, then logs"""
+        exit_code = super().run()
+        for _ in range(1000):
+            self.logger.info("worker {} finished running", self.worker_id)
+        return exit_code
+
+
+class ReloadingApplication(TestApplication):
+    """
+    The TestApplication class, that shuts down after its config is reloaded
+    """
+
+    async def start(self):
+        """Starts the application"""
+
+    async def jobs(self):
+        """Reports that the worker is ready to reload its config"""
+        with open(
+            os.path.join(self.markers_dir, f"ready-{self.worker_id}"),
+            "w",
+            encoding="utf-8",
+        ) as ready_file:
+            ready_file.write(str(os.getpid()))
+
+    async def reload_config(self):
+        """Reloads the config, then shuts down"""
+        changes = await super().reload_config()
+        with open(
+            os.path.join(self.markers_dir, f"reloaded-{self.worker_id}"),
+            "w",
+            encoding="utf-8",
+        ) as reloaded_file:
+            reloaded_file.write(str(os.getpid()))
+        await self.request_shutdown("config reloaded")
+        return changes
+
+
+def run_workers(application_class, markers_dir, *entries):
+    """Runs the application in 2 workers, with the given extra config entries"""
+    application_class.markers_dir = markers_dir
+    config = Config(
+        "test-app-name",
+        "test-app-description",
+        [
+            ConfigEntry(name="WORKERS", help_text="Number of workers", default=2),
+            ConfigEntry(
+                name="WORKER_RESTART_DELAY", help_text="Restart delay", default=0
+            ),
+            *entries,
+        ],
+    )
+    return application_entrypoint(application_class, config, argv=[])
+
+
+def run_async_logging_workers(markers_dir):
+    """Runs the LoggingApplication in 2 workers with asynchronous logging, in a subprocess of the test"""
+    return run_workers(
+        LoggingApplication,
+        markers_dir,
+        ConfigEntry(name="LOG_ASYNC", default=True, entry_type=bool),
+    )
+
+
+def run_reloading_workers(markers_dir):
+    """Runs the ReloadingApplication in 2 workers with config reload, in a subprocess of the test"""
+    return run_workers(
+        ReloadingApplication,
+        markers_dir,
+        ConfigEntry(name="CONFIG_RELOAD", default=True, entry_type=bool),
+    )
+
+
+class WorkersTestCase(unittest.TestCase):
+    """The worker mode test cases"""
+
+    def test_workers_restarted_after_crash(self) -> None:
+        """Test that every worker runs, and the crashed workers are restarted"""
+        with tempfile.TemporaryDirectory() as markers_dir:
+            exit_code = run_workers(TestApplication, markers_dir)
+
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(
+                sorted(os.listdir(markers_dir)),
+                ["done-0", "done-1", "worker-0", "worker-1"],
+            )
+            self.assertNotEqual(os.getpid(), int(open_read(markers_dir, "done-0")))
+
+    def test_worker_logs_flushed(self) -> None:
+        """Test that the asynchronously written log records of the workers are flushed, before they exit"""
+        with tempfile.TemporaryDirectory() as markers_dir:
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    "import sys; from common.app.tests.test_workers import run_async_logging_workers; "
+                    f"sys.exit(run_async_logging_workers({markers_dir!r}))",
+                ],
+                cwd=os.path.dirname(
+                    os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+                ),
+                capture_output=True,
+                check=False,
+            )
+
+        self.assertEqual(result.returncode, 0)
+        for worker_id in range(2):
+            self.assertIn(
+                f"worker {worker_id} crashes at the first start".encode(),
+                result.stderr,
+            )
+        # The records written after the shutdown of the application are not lost either
+        self.assertEqual(result.stderr.count(b"finished running"), 4000)
+
+    def test_config_reload(self) -> None:
+        """Test that the supervisor survives a SIGHUP, and forwards it to the workers to reload their config"""
+        with tempfile.TemporaryDirectory() as markers_dir:
+            with subprocess.Popen(
+                [
+                    sys.executable,
+                    "-c",
+                    "import sys; from common.app.tests.test_workers import run_reloading_workers; "
+                    f"sys.exit(run_reloading_workers({markers_dir!r}))",
+                ],
+                cwd=os.path.dirname(
+                    os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+                ),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            ) as process:
+                try:
+                    for _ in range(500):
+                        if {"ready-0", "ready-1"} <= set(os.listdir(markers_dir)):
+                            break
+                        time.sleep(0.01)
+                    process.send_signal(signal.SIGHUP)
+                    exit_code = process.wait(10)
+                finally:
+                    process.kill()
+
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(
+                sorted(os.listdir(markers_dir)),
+                ["ready-0", "ready-1", "reloaded-0", "reloaded-1"],
+            )
+
+    def test_restart_limit(self) -> None:
+        """Test that the supervisor gives up, if the workers keep crashing"""
+        with tempfile.TemporaryDirectory() as markers_dir:
+            exit_code = run_workers(
+                CrashingApplication,
+                markers_dir,
+                ConfigEntry(name="WORKER_MAX_RESTARTS", default=3, entry_type=int),
+                ConfigEntry(
+                    name="WORKER_MAX_RESTART_DELAY", default=0.01, entry_type=float
+                ),
+            )
+        self.assertEqual(exit_code, 1)
+
+    def test_restart_backoff(self) -> None:
+        """Test that the restart delay of a worker is doubled after each crash"""
+        # pylint: disable=protected-access
+        supervisor = WorkerSupervisor(
+            get_logger(), None, None, 1, 0.5, max_restart_delay=3.0
+        )
+        supervisor._started[0] = time.monotonic()
+        delays = [supervisor._next_delay(0) for _ in range(5)]
+        self.assertEqual(delays, [0.5, 1.0, 2.0, 3.0, 3.0])
+
+        # The delay is reset, if the worker was running long enough
+        supervisor._started[0] = time.monotonic() - 5
+        self.assertEqual(supervisor._next_delay(0), 0.5)
@@ -0,0 +1,268 @@
+"""
+Pre-fork worker pool module.
+
+If the ``WORKERS`` config parameter is greater than one, the ``application_entrypoint()`` does not run the
+application in its own process, but starts a ``WorkerSupervisor`` instead.
+The supervisor forks the given number of worker processes, and each worker creates its own application instance,
+that runs on its own event loop through the usual ``start()``, ``jobs()`` and ``stop()`` steps.
+
+The supervisor
+
+- restarts the workers that exit with an error, or killed by a signal, after ``WORKER_RESTART_DELAY`` seconds.
+  The delay is doubled after each consecutive crash of a worker, up to ``WORKER_MAX_RESTART_DELAY`` seconds,
+  and it is reset, if the worker was running longer than that,
+- gives up, stops all the workers and exits with an error, if there were more than ``WORKER_MAX_RESTARTS``
+  restarts within ``WORKER_RESTART_WINDOW`` seconds, e.g. because the workers crash at startup,
+- lets the workers go, that finished their job normally,
+- forwards the SIGINT and SIGTERM signals to the workers, then waits until all of them shut down gracefully,
+- forwards the SIGHUP signal to the workers, so they reload their config, if ``CONFIG_RELOAD`` is enabled.
+  The workers ignore the SIGHUP signal otherwise.
+
+NOTE: The workers inherit the health check config of the application,
+so either the health check has to be disabled, or the workers have to be able to share the same port.
+"""
+import os
+import signal
+import time
+from collections import deque
+from ..logger.logger import flush_logger
+from .signals import SIGNAL_TRANSLATION_MAP
+from .app_terminate import TerminalException
+
+
+WORKER_LOG_FLUSH_TIMEOUT = 5.0
+"""The maximum time in seconds a worker waits for its log records to be written, before it exits"""
+
+
+def _exit_code(status):
+    """
+    Converts the status returned by ``os.wait()`` to an exit code.
+
+    The exit code is negative, if the process was killed by a signal.
+    """
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+
+    return os.WEXITSTATUS(status)
+
+
+# pylint: disable=too-few-public-methods
+class WorkerSupervisor:
+    """
+    Runs the application in a pool of forked worker processes
+    """
+
+    def __init__(
+        self,
+        logger,
+        application_class,
+        config,
+        workers,
+        restart_delay=1.0,
+        *,
+        max_restart_delay=30.0,
+        max_restarts=5,
+        restart_window=60.0,
+    ):
+        """
+        Initializes the supervisor
+
+        :param logger: The logger of the supervisor process.
+        :param application_class: The type of the Application class, that origins from the ``ApplicationBase``.
+        :param config: The configuration object handed over to the applications of the workers.
+        :param int workers: The number of worker processes.
+        :param float restart_delay: The delay in seconds, before a crashed worker is restarted first.
+        :param float max_restart_delay: The maximum delay in seconds between the restarts of a worker.
+        :param int max_restarts: The maximum number of restarts within the ``restart_window``.
+        :param float restart_window: The time window of the restart limit in seconds.
+        """
+        self.logger = logger
+        self.application_class = application_class
+        self.config = config
+        self.workers = workers
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.exit_code = 0
+        self._children = {}
+        self._started = {}
+        self._delays = {}
+        self._restarts = deque()
+        self._stopping = False
+
+    def run(self):
+        """
+        Starts the workers, and supervises them until all of them exits.
+
+        :return: The exit code of the supervisor: ``0`` if all workers exited normally, otherwise ``1``.
+        """
+        previous_handlers = {
+            sig: signal.signal(sig, self._signal_handler)
+            for sig in SIGNAL_TRANSLATION_MAP
+        }
+        if hasattr(signal, "SIGHUP"):
+            previous_handlers[signal.SIGHUP] = signal.signal(
+                signal.SIGHUP, self._hup_handler
+            )
+
+        try:
+            for worker_id in range(self.workers):
+                self._spawn(worker_id)
+
+            self._supervise()
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+
+        self.logger.info(
+            "WorkerSupervisor: all workers exited, exit code: {}", self.exit_code
+        )
+        return self.exit_code
+
+    def _spawn(self, worker_id):
+        """
+        Forks a new worker process with the given id
+        """
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker(worker_id)
+
+        self._children[pid] = worker_id
+        self._started[worker_id] = time.monotonic()
+        self.logger.info("WorkerSupervisor: worker {} started, pid: {}", worker_id, pid)
+
+    def _run_worker(self, worker_id):
+        """
+        Runs the application in the forked worker process. It never returns.
+        """
+        # The worker process must not inherit the signal handlers of the supervisor
+        for sig in SIGNAL_TRANSLATION_MAP:
+            signal.signal(sig, signal.SIG_DFL)
+        # The SIGHUP is ignored, until the application installs its config reload handler
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+        exit_code = 1
+        try:
+            app = self.application_class(self.config)
+            app.worker_id = worker_id
+            exit_code = app.run()
+        except TerminalException:
+            # A repeated termination signal arrived during the shutdown
+            exit_code = 0
+        except BaseException as err:
+            self.logger.opt(exception=True).error(
+                "WorkerSupervisor: worker {} failed: {}", worker_id, err
+            )
+        finally:
+            # The atexit handlers are skipped, so the asynchronously written log records are flushed here.
+            # The wait is bounded, because the writer thread of the supervisor's log queue does not exist
+            # in the fork, if the application failed before it initialized its own logger.
+            flush_logger(WORKER_LOG_FLUSH_TIMEOUT)
+
+            # Skip the cleanup of the supervisor's interpreter state, e.g. the atexit handlers
+            os._exit(exit_code)
+
+    def _supervise(self):
+        """
+        Waits for the workers to exit, and restarts them, if they crashed
+        """
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            worker_id = self._children.pop(pid, None)
+            if worker_id is None:
+                continue
+
+            exit_code = _exit_code(status)
+            if exit_code == 0:
+                self.logger.info("WorkerSupervisor: worker {} exited", worker_id)
+                continue
+
+            self.logger.error(
+                "WorkerSupervisor: worker {} exited with code {}", worker_id, exit_code
+            )
+            if self._stopping:
+                self.exit_code = 1
+                continue
+
+            if self._restart_limit_exceeded():
+                self.logger.error(
+                    "WorkerSupervisor: more than {} restarts within {} seconds, giving up",
+                    self.max_restarts,
+                    self.restart_window,
+                )
+                self.exit_code = 1
+                self._stop_workers(signal.SIGTERM)
+                continue
+
+            time.sleep(self._next_delay(worker_id))
+            if not self._stopping:
+                self._spawn(worker_id)
+
+    def _restart_limit_exceeded(self):
+        """
+        Records a restart, and checks the number of the restarts within the restart window
+        """
+        now = time.monotonic()
+        self._restarts.append(now)
+        while now - self._restarts[0] > self.restart_window:
+            self._restarts.popleft()
+        return len(self._restarts) > self.max_restarts
+
+    def _next_delay(self, worker_id):
+        """
+        Returns with the delay before the restart of the worker, with exponential backoff
+        """
+        if time.monotonic() - self._started[worker_id] > self.max_restart_delay:
+            # The worker was running long enough, so it is not crashing repeatedly
+            self._delays.pop(worker_id, None)
+
+        delay = self._delays.get(worker_id, self.restart_delay)
+        self._delays[worker_id] = min(delay * 2, self.max_restart_delay)
+        self.logger.info(
+            "WorkerSupervisor: restarting worker {} in {:0.3f} seconds",
+            worker_id,
+            delay,
+        )
+        return delay
+
+    def _signal_handler(self, sig, _frame):
+        """
+        Forwards the termination signals to the workers
+        """
+        self.logger.info(
+            "WorkerSupervisor: {} received, stopping {} workers",
+            SIGNAL_TRANSLATION_MAP[sig],
+            len(self._children),
+        )
+        self._stop_workers(sig)
+
+    def _hup_handler(self, sig, _frame):
+        """
+        Forwards the SIGHUP signal to the workers, so they reload their config
+        """
+        self.logger.info(
+            "WorkerSupervisor: SIGHUP received, forwarding to {} workers",
+            len(self._children),
+        )
+        for pid in list(self._children):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def _stop_workers(self, sig):
+        """
+        Sends the signal to the workers, and stops restarting them
+        """
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
@@ -1,6 +1,32 @@
 """
 This sub-module holds the classes for the configuration management.
 """
-from .config import Config, ConfigEntry, CliEntry, json_string
+from typing import TYPE_CHECKING
+from ..lazy_import import lazy_attributes
+
+# The public names are imported on demand, see: common.lazy_import
+if TYPE_CHECKING:
+    from .config import (
+        Config,
+        ConfigEntry,
+        ConfigError,
+        ConfigSnapshot,
+        CliEntry,
+        bool_string,
+        json_string,
+    )
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "Config": ".config",
+        "ConfigEntry": ".config",
+        "ConfigError": ".config",
+        "ConfigSnapshot": ".config",
+        "CliEntry": ".config",
+        "bool_string": ".config",
+        "json_string": ".config",
+    },
+)
 
 __all__ = ["config"]
@@ -14,12 +14,59 @@ The precedence is the following, in ascending order (command-line is the stronge
 - environment variable,
 - command-line parameter.
 
+The values taken from the environment are strings, so they are converted to the type of the config entry,
+given by the ``entry_type`` property of the ``ConfigEntry``, or of its ``CliEntry``.
+The converters are compiled once, when the ``Config`` object is created, and the conversion errors
+of all entries are reported together via a ``ConfigError``.
+
+The config parameters can be re-resolved at runtime via the ``Config.reload()`` function, that reloads the ``.env``
+file, and applies the actual environment and the last applied command-line parameters again.
 """
 import argparse
+import copy
+import keyword
 import os
-import re
 import json
 import dotenv
+from ..profiler import startup_profiler
+
+DOTENV_PATH = ".env"
+"""The path of the file, the environment variables are loaded from, if it exists"""
+
+
+class ConfigError(ValueError):
+    """
+    Raised when the config parameters can not be converted to their types.
+    The ``errors`` property holds the list of the error messages of all the failed entries.
+    """
+
+    def __init__(self, errors):
+        super().__init__("Invalid config parameters: " + "; ".join(errors))
+        self.errors = errors
+
+
+TRUE_STRINGS = ("true", "t", "yes", "y", "on", "1")
+"""The string values that are converted to ``True`` in case of boolean config entries"""
+
+FALSE_STRINGS = ("false", "f", "no", "n", "off", "0", "")
+"""The string values that are converted to ``False`` in case of boolean config entries"""
+
+
+def bool_string(string):
+    """
+    Converts a string to boolean value, e.g. ``"true"``, ``"yes"``, ``"1"`` to ``True``
+    and ``"false"``, ``"no"``, ``"0"`` to ``False``.
+    Can be used as `entry_type` parameter of the `ConfigEntry` object.
+    """
+    if isinstance(string, bool):
+        return string
+
+    value = string.strip().lower()
+    if value in TRUE_STRINGS:
+        return True
+    if value in FALSE_STRINGS:
+        return False
+    raise ValueError(f"'{string}' is not a boolean value")
 
 
 def json_string(string):
@@ -153,12 +200,49 @@ class ConfigEntry:
     be masked with '****'.
     """
 
-    def __init__(self, name=None, help_text="", default=None, cli=None, masked=False):
+    entry_type: type
+    """
+    The type of the config parameter, e.g. ``int``, ``float``, ``bool``, or a function that converts
+    a string to the value of the parameter, e.g. ``json_string``.
+
+    The string values taken from the environment are converted by it.
+    If it is not given, the ``entry_type`` of the ``cli`` is used.
+    """
+
+    def __init__(
+        self,
+        name=None,
+        help_text="",
+        default=None,
+        cli=None,
+        masked=False,
+        *,
+        entry_type=None,
+    ):
         self.name = name
         self.help_text = help_text
         self.default = default
         self.cli = cli
         self.masked = masked
+        self.entry_type = entry_type
+
+    def get_converter(self):
+        """
+        Returns with the function that converts a string value to the type of the config parameter,
+        or ``None``, if no conversion is needed.
+        """
+        entry_type = self.entry_type
+        if entry_type is None and self.cli is not None:
+            if self.cli.action in ["store_false", "store_true"]:
+                entry_type = bool
+            else:
+                entry_type = self.cli.entry_type
+
+        if entry_type is None or entry_type is str:
+            return None
+        if entry_type is bool:
+            return bool_string
+        return entry_type
 
     def __iter__(self):
         """
@@ -193,18 +277,125 @@ class Config:
         It fills the object with the properties given by the `config_entries` argument.
         It also sets the initial value of each parameter from the environment, if it is found
         or set to its default value if the corresponding environment var is missing.
+        The values taken from the environment are converted to the type of the config entries.
+
+        :raises ConfigError: if any of the environment values can not be converted.
         """
         self.app_name = app_name
         self.app_description = app_description
         self.config_entries = config_entries
+        self._argv = None
+
+        with startup_profiler.phase("config"):
+            # Load environment variables from .env if exists.
+            # The keys set by the .env file are tracked, the reload only overrides those ones.
+            process_env_keys = frozenset(os.environ)
+            dotenv.load_dotenv(DOTENV_PATH)
+            self._dotenv_keys = {
+                key
+                for key in dotenv.dotenv_values(DOTENV_PATH)
+                if key not in process_env_keys
+            }
+
+            self._resolve_env()
+
+    @property
+    def config_entries(self):
+        """
+        The array of the definitions of config entries.
 
-        # Load environment variables from .env if exists
-        dotenv.load_dotenv(".env")
+        The type converters and the CLI args parser are built from the entries, and they are cached
+        until the entries are replaced by assigning a new array to this property.
+        """
+        return self._config_entries
+
+    @config_entries.setter
+    def config_entries(self, config_entries):
+        self._config_entries = config_entries
+        self._converters = {
+            config_entry.name: config_entry.get_converter()
+            for config_entry in config_entries
+        }
+        self._parser = None
+        self._cli_dests = None
+
+    def _resolve_env(self):
+        """
+        Sets the value of each parameter from the environment, or to its default value.
 
-        for config_entry in config_entries:
-            self.__dict__[config_entry.name] = os.environ.get(
-                config_entry.name, config_entry.default
-            )
+        :raises ConfigError: if any of the environment values can not be converted.
+        """
+        errors = []
+        for config_entry in self.config_entries:
+            name = config_entry.name
+            value = os.environ.get(name)
+            if value is None:
+                value = config_entry.default
+            else:
+                value = self._convert(name, value, errors)
+            self.__dict__[name] = value
+
+        if errors:
+            raise ConfigError(errors)
+
+    def reload(self):
+        """
+        Re-resolves the config parameters.
+
+        It reloads the variables of the ``.env`` file into the environment, except those that were set
+        in the environment by others than the former loads of the ``.env`` file, then it resolves the parameters from the environment,
+        and applies the last applied command-line parameters again.
+
+        :return dict: The ``(old value, new value)`` pairs of the changed parameters by their names.
+
+        :raises ConfigError: if any of the environment values can not be converted.
+            In this case the config parameters keep their previous values.
+        """
+        previous = {
+            config_entry.name: self.__dict__[config_entry.name]
+            for config_entry in self.config_entries
+        }
+
+        dotenv_values = dotenv.dotenv_values(DOTENV_PATH)
+        dotenv_keys = self._dotenv_keys
+        for key in dotenv_keys.difference(dotenv_values):
+            os.environ.pop(key, None)
+        self._dotenv_keys = set()
+        for key, value in dotenv_values.items():
+            if value is None or (key in os.environ and key not in dotenv_keys):
+                continue
+            os.environ[key] = value
+            self._dotenv_keys.add(key)
+
+        try:
+            self._resolve_env()
+        except ConfigError:
+            self.apply_parameters(previous)
+            raise
+
+        if self._argv is not None:
+            self.apply_parameters(self.get_the_cli_args(self._argv))
+
+        return {
+            name: (value, self.__dict__[name])
+            for name, value in previous.items()
+            if self.__dict__[name] != value
+        }
+
+    def _convert(self, name, value, errors):
+        """
+        Converts a string value to the type of the config entry.
+        In case of failure, appends the error message to the `errors`, and returns with the original value.
+        """
+        converter = self._converters[name]
+        if converter is None:
+            return value
+
+        try:
+            return converter(value)
+        except (ValueError, TypeError) as err:
+            errors.append(f"{name}: {err}")
+            return value
 
     def apply_parameters(self, parameters):
         """
@@ -228,6 +419,7 @@ class Config:
         """
         args = self.get_the_cli_args(argv)
         self.apply_parameters(args)
+        self._argv = list(argv)
 
     def get(self, name):
         """
@@ -237,111 +429,57 @@ class Config:
 
         :return: The value of the config parameter found, or ``None``, if not found.
         """
-        if name in self.__dict__:
-            return self.__dict__[name]
+        return self.__dict__.get(name)
 
-        return None
-
-    def get_the_cli_args(self, argv):
+    def _build_parser(self):
         """
-        Parse the CLI parameters, and returns with them as a dictionary
-
-        :param Array[str] argv: The command-line parameters
+        Builds the CLI args parser, and the list of ``(entry name, argparse dest)`` pairs of the CLI entries.
         """
         parser = argparse.ArgumentParser(
             prog=self.app_name, description=self.app_description
         )
-
-        # Build the CLI args parser
+        cli_dests = []
         for config_entry in self.config_entries:
-            name = config_entry.name
-            help_text = config_entry.help_text
             cli = config_entry.cli
-            default = self.__dict__[name]
-
-            if cli is not None:
-                short_flag = cli.short_flag
-                name = cli.name
-                entry_type = cli.entry_type
-                action = cli.action
-                choices = cli.choices
-
-                if action in ["store_false", "store_true"]:
-                    # It is a boolean flag
-                    if short_flag is None:
-                        parser.add_argument(
-                            name, help=help_text, default=default, action=action
-                        )
-                    else:
-                        parser.add_argument(
-                            short_flag,
-                            name,
-                            help=help_text,
-                            default=default,
-                            action=action,
-                        )
-                else:
-                    if short_flag is None:
-                        if choices is not None:
-                            # It is a selection from the list of choices
-                            parser.add_argument(
-                                name,
-                                type=entry_type,
-                                help=help_text,
-                                default=default,
-                                action=action,
-                                choices=choices,
-                            )
-                        else:
-                            # It is a normal flag or positional parameter
-                            parser.add_argument(
-                                name,
-                                type=entry_type,
-                                help=help_text,
-                                default=default,
-                                action=action,
-                            )
-                    else:
-                        if choices is not None:
-                            # It is a selection from the list of choices
-                            parser.add_argument(
-                                short_flag,
-                                name,
-                                type=entry_type,
-                                help=help_text,
-                                default=default,
-                                action=action,
-                                choices=choices,
-                            )
-                        else:
-                            # It is a normal flag or positional parameter
-                            parser.add_argument(
-                                short_flag,
-                                name,
-                                type=entry_type,
-                                help=help_text,
-                                default=default,
-                                action=action,
-                            )
+            if cli is None:
+                continue
 
-        # Parse the CLI args
-        args = vars(parser.parse_args(argv))
+            flags = [cli.name] if cli.short_flag is None else [cli.short_flag, cli.name]
+            kwargs = {"help": config_entry.help_text, "action": cli.action}
+            if cli.action not in ["store_false", "store_true"]:
+                # It is a normal flag or positional parameter
+                kwargs["type"] = cli.entry_type
+                if cli.choices is not None:
+                    # It is a selection from the list of choices
+                    kwargs["choices"] = cli.choices
 
-        # Build a dictionary of actual CLI arg values, using the original parameter name
-        results = {}
-        for config_entry in self.config_entries:
-            # Take the original entry name
-            entry_name = config_entry.name
-            cli = config_entry.cli
+            action = parser.add_argument(*flags, **kwargs)
+            cli_dests.append((config_entry.name, action.dest))
 
-            if cli is not None:
-                # Take the parameter value of the CLI arg
-                name = re.sub(r"^--", "", cli.name).replace("-", "_")
+        self._parser = parser
+        self._cli_dests = cli_dests
+
+    def get_the_cli_args(self, argv):
+        """
+        Parse the CLI parameters, and returns with them as a dictionary
 
-                # Add the value to the results with the original name
-                results[entry_name] = args[name]
+        The parser is built at the first call, then it is reused until the ``config_entries`` are replaced.
+        The actual values of the config parameters are used as the defaults of the CLI args.
 
-        return results
+        :param Array[str] argv: The command-line parameters
+        """
+        if self._parser is None:
+            self._build_parser()
+
+        self._parser.set_defaults(
+            **{dest: self.__dict__[name] for name, dest in self._cli_dests}
+        )
+
+        # Parse the CLI args
+        args = vars(self._parser.parse_args(argv))
+
+        # Build a dictionary of actual CLI arg values, using the original parameter name
+        return {name: args[dest] for name, dest in self._cli_dests}
 
     def dump(self):
         """
@@ -363,8 +501,192 @@ class Config:
         """
         Returns with the string representation of the object
         """
-        str_repr = ""
-        for key, value in self.__dict__.items():
-            str_repr += f"{key}='{value}', "
+        return "".join(
+            f"{key}='{value}', "
+            for key, value in self.__dict__.items()
+            if not key.startswith("_")
+        )
+
+    def snapshot(self):
+        """
+        Creates an immutable snapshot of the actual values of the config parameters.
+
+        The values are deep copied, so the later in-place changes of the lists and dicts of the config
+        do not change the snapshot, nor its hash.
+
+        :return ConfigSnapshot: The snapshot object.
+        """
+        return make_snapshot(
+            self.app_name,
+            self.app_description,
+            tuple(config_entry.name for config_entry in self.config_entries),
+            copy.deepcopy(
+                tuple(self.__dict__[entry.name] for entry in self.config_entries)
+            ),
+        )
+
+
+def _freeze(value):
+    """
+    Converts the mutable containers to immutable ones, to make the value hashable
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class ConfigSnapshot:
+    """
+    Immutable snapshot of the config parameters.
+
+    The config parameters are stored in slots, and can be accessed as attributes, e.g. ``config.LOG_LEVEL``,
+    or via the ``get()`` function, like in case of the ``Config`` object.
+    A snapshot is hashable, and cheap to pickle, so it can safely be shared among threads and processes.
+    Its list and dict values are its own copies, that must not be changed in place.
+
+    The snapshots are created by the ``Config.snapshot()`` function. Their classes are generated from
+    the names of the config entries. The parameters, whose names are not valid identifiers, start with an underscore,
+    or collide with the attributes of the snapshot, e.g. ``get``, are stored in a dict instead of the slots,
+    and can only be accessed via the ``get()`` function.
+    """
+
+    # The slots are set via object.__setattr__(), that pylint does not follow
+    # pylint: disable=no-member
+
+    __slots__ = ("app_name", "app_description", "_hash", "_other")
+
+    _names = ()
+    _slot_names = frozenset()
+
+    def __init__(self, app_name, app_description, values):
+        object.__setattr__(self, "app_name", app_name)
+        object.__setattr__(self, "app_description", app_description)
+        object.__setattr__(self, "_hash", None)
+        other = {}
+        for name, value in zip(self._names, values):
+            if name in self._slot_names:
+                object.__setattr__(self, name, value)
+            else:
+                other[name] = value
+        object.__setattr__(self, "_other", other)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"The config snapshot is immutable, can not set '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(
+            f"The config snapshot is immutable, can not delete '{name}'"
+        )
+
+    def get(self, name):
+        """
+        Get the value of a config parameter by its name.
+
+        :param str name: The name of the config parameter
+
+        :return: The value of the config parameter found, or ``None``, if not found.
+        """
+        if name in self._other:
+            return self._other[name]
+        return getattr(self, name, None)
+
+    def snapshot(self):
+        """
+        Returns with the snapshot itself, since it is immutable
+        """
+        return self
+
+    def values(self):
+        """
+        Returns with the tuple of the values of the config parameters
+        """
+        return tuple(self.get(name) for name in self._names)
+
+    def items(self):
+        """
+        Returns with the list of the (name, value) pairs of the config parameters
+        """
+        return list(zip(self._names, self.values()))
+
+    def __eq__(self, other):
+        if not isinstance(other, ConfigSnapshot):
+            return NotImplemented
+        return (
+            self.app_name == other.app_name
+            and self.app_description == other.app_description
+            and self.items() == other.items()
+        )
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(
+                self,
+                "_hash",
+                hash((self.app_name, self._names, _freeze(list(self.values())))),
+            )
+        return self._hash
+
+    def __reduce__(self):
+        return (
+            make_snapshot,
+            (self.app_name, self.app_description, self._names, self.values()),
+        )
+
+    def __str__(self):
+        """
+        Returns with the string representation of the object
+        """
+        return "".join(
+            f"{key}='{value}', "
+            for key, value in [
+                ("app_name", self.app_name),
+                ("app_description", self.app_description),
+            ]
+            + self.items()
+        )
+
+
+# The generated snapshot classes by the tuple of the names of the config parameters
+_snapshot_classes = {}
+
+
+def _is_slot_name(name):
+    """
+    Tells whether a config parameter can be stored in a slot of the snapshot, and accessed as its attribute
+    """
+    return (
+        name.isidentifier()
+        and not keyword.iskeyword(name)
+        and not name.startswith("_")
+        and not hasattr(ConfigSnapshot, name)
+    )
+
+
+def make_snapshot(app_name, app_description, names, values):
+    """
+    Creates a config snapshot object
+
+    :param str app_name: The name of the application.
+    :param str app_description: The short description of the application.
+    :param tuple[str] names: The names of the config parameters.
+    :param tuple values: The values of the config parameters, in the order of the names.
+
+    :return ConfigSnapshot: The snapshot object.
+    """
+    snapshot_class = _snapshot_classes.get(names)
+    if snapshot_class is None:
+        slot_names = tuple(name for name in names if _is_slot_name(name))
+        snapshot_class = type(
+            "ConfigSnapshot",
+            (ConfigSnapshot,),
+            {
+                "__slots__": slot_names,
+                "_names": names,
+                "_slot_names": frozenset(slot_names),
+            },
+        )
+        _snapshot_classes[names] = snapshot_class
 
-        return str_repr
+    return snapshot_class(app_name, app_description, values)
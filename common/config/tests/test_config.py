@@ -1,8 +1,12 @@
 """Test the config module"""
 import os
+import pickle
+import tempfile
 import unittest
+from unittest import mock
 from common.logger.logger import get_format_choices, get_level_choices
-from common.config import Config, ConfigEntry, CliEntry, json_string
+from common.config import Config, ConfigEntry, ConfigError, CliEntry, json_string
+from common.config import config as config_module
 
 # The expected values for parameters used via env and/or CLI parameter
 test_set_input = dict(
@@ -129,7 +133,61 @@ class ConfigTestCase(unittest.TestCase):
         # setup the environment
         os.environ.update(test_set_input)
         config = Config(APP_NAME, APP_DESCRIPTION, config_entries)
-        assert_with_expected(self, config, test_set_input)
+        assert_with_expected(
+            self, config, {name: test_set_expected[name] for name in test_set_input}
+        )
+
+    def test_config_env_type_conversion(self) -> None:
+        """Test the conversion of the environment values to the types of the entries"""
+        entries = [
+            ConfigEntry(name="TEST_FLAG", default=True, entry_type=bool),
+            ConfigEntry(
+                name="TEST_SWITCH",
+                default=False,
+                cli=CliEntry(name="--test-switch", action="store_true"),
+            ),
+            ConfigEntry(name="TEST_PORT", default=8008, entry_type=int),
+            ConfigEntry(name="TEST_HOST", default="127.0.0.1", entry_type=str),
+            ConfigEntry(name="TEST_UNTYPED", default=None),
+        ]
+        env = {
+            "TEST_FLAG": "false",
+            "TEST_SWITCH": "yes",
+            "TEST_PORT": "9000",
+            "TEST_HOST": "0.0.0.0",
+            "TEST_UNTYPED": "42",
+        }
+        os.environ.update(env)
+        try:
+            config = Config(APP_NAME, APP_DESCRIPTION, entries)
+        finally:
+            for name in env:
+                del os.environ[name]
+
+        self.assertIs(config.get("TEST_FLAG"), False)
+        self.assertIs(config.get("TEST_SWITCH"), True)
+        self.assertEqual(config.get("TEST_PORT"), 9000)
+        self.assertEqual(config.get("TEST_HOST"), "0.0.0.0")
+        self.assertEqual(config.get("TEST_UNTYPED"), "42")
+
+    def test_config_env_type_errors(self) -> None:
+        """Test that the conversion errors of all entries are reported together"""
+        entries = [
+            ConfigEntry(name="TEST_FLAG", default=True, entry_type=bool),
+            ConfigEntry(name="TEST_PORT", default=8008, entry_type=int),
+        ]
+        env = {"TEST_FLAG": "maybe", "TEST_PORT": "eighty"}
+        os.environ.update(env)
+        try:
+            with self.assertRaises(ConfigError) as context:
+                Config(APP_NAME, APP_DESCRIPTION, entries)
+        finally:
+            for name in env:
+                del os.environ[name]
+
+        self.assertEqual(len(context.exception.errors), 2)
+        self.assertTrue(context.exception.errors[0].startswith("TEST_FLAG:"))
+        self.assertTrue(context.exception.errors[1].startswith("TEST_PORT:"))
 
     def test_config_via_argv(self) -> None:
         """Test the config via parsing the CLI arguments"""
@@ -153,3 +211,157 @@ class ConfigTestCase(unittest.TestCase):
         assert_with_expected(self, config, test_set_expected)
         config.dump()
         print(f"\nconfig: {config}")
+
+    def test_config_cli_parser_cache(self) -> None:
+        """Test that the CLI args parser is reused, and rebuilt when the entries are replaced"""
+        config = Config(APP_NAME, APP_DESCRIPTION, config_entries)
+        self.assertEqual(config.get_the_cli_args(["-i", "1"])["INTEGER"], 1)
+        parser = config._parser  # pylint: disable=protected-access
+
+        # The actual values are the defaults of the CLI args
+        config.apply_parameters({"INTEGER": 2})
+        self.assertEqual(config.get_the_cli_args([])["INTEGER"], 2)
+        self.assertIs(config._parser, parser)  # pylint: disable=protected-access
+
+        config.config_entries = config_entries[:1]
+        self.assertEqual(
+            config.get_the_cli_args([]), {"LOG_LEVEL": config.get("LOG_LEVEL")}
+        )
+        self.assertIsNot(config._parser, parser)  # pylint: disable=protected-access
+
+    def test_config_reload(self) -> None:
+        """Test the reload of the config from the .env file, keeping the CLI parameters"""
+        entries = [
+            ConfigEntry(name="TEST_RELOAD_PORT", default=8008, entry_type=int),
+            ConfigEntry(
+                name="TEST_RELOAD_HOST",
+                default="localhost",
+                cli=CliEntry(name="--test-reload-host"),
+            ),
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dotenv_path = os.path.join(tmp_dir, ".env")
+            with mock.patch.object(config_module, "DOTENV_PATH", dotenv_path):
+                try:
+                    with open(dotenv_path, "w", encoding="utf-8") as dotenv_file:
+                        dotenv_file.write("TEST_RELOAD_PORT=9000\n")
+                    config = Config(APP_NAME, APP_DESCRIPTION, entries)
+                    config.apply_cli_args(["--test-reload-host", "0.0.0.0"])
+                    self.assertEqual(config.get("TEST_RELOAD_PORT"), 9000)
+
+                    with open(dotenv_path, "w", encoding="utf-8") as dotenv_file:
+                        dotenv_file.write(
+                            "TEST_RELOAD_PORT=9001\nTEST_RELOAD_HOST=127.0.0.1\n"
+                        )
+                    self.assertEqual(
+                        config.reload(), {"TEST_RELOAD_PORT": (9000, 9001)}
+                    )
+                    self.assertEqual(config.get("TEST_RELOAD_HOST"), "0.0.0.0")
+
+                    # Invalid values are rejected, and the previous values are kept
+                    with open(dotenv_path, "w", encoding="utf-8") as dotenv_file:
+                        dotenv_file.write("TEST_RELOAD_PORT=eighty\n")
+                    with self.assertRaises(ConfigError):
+                        config.reload()
+                    self.assertEqual(config.get("TEST_RELOAD_PORT"), 9001)
+
+                    # The variables removed from the .env file fall back to the defaults
+                    os.remove(dotenv_path)
+                    self.assertEqual(
+                        config.reload(), {"TEST_RELOAD_PORT": (9001, 8008)}
+                    )
+                finally:
+                    os.environ.pop("TEST_RELOAD_PORT", None)
+                    os.environ.pop("TEST_RELOAD_HOST", None)
+
+    def test_config_reload_keeps_exported_variables(self) -> None:
+        """Test that the reload does not override the variables exported after the import of the module"""
+        entries = [ConfigEntry(name="TEST_RELOAD_EXPORTED", default=0, entry_type=int)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dotenv_path = os.path.join(tmp_dir, ".env")
+            with mock.patch.object(
+                config_module, "DOTENV_PATH", dotenv_path
+            ), mock.patch.dict(os.environ, {"TEST_RELOAD_EXPORTED": "1111"}):
+                with open(dotenv_path, "w", encoding="utf-8") as dotenv_file:
+                    dotenv_file.write("TEST_RELOAD_EXPORTED=2222\n")
+                config = Config(APP_NAME, APP_DESCRIPTION, entries)
+                self.assertEqual(config.get("TEST_RELOAD_EXPORTED"), 1111)
+                self.assertEqual(config.reload(), {})
+                self.assertEqual(config.get("TEST_RELOAD_EXPORTED"), 1111)
+
+
+class ConfigSnapshotTestCase(unittest.TestCase):
+    """The config snapshot test cases"""
+
+    def test_snapshot(self) -> None:
+        """Test the attribute access and the immutability of the snapshot"""
+        config = Config(APP_NAME, APP_DESCRIPTION, config_entries)
+        config.apply_parameters(test_set_expected)
+        snapshot = config.snapshot()
+
+        self.assertEqual(snapshot.app_name, APP_NAME)
+        self.assertEqual(snapshot.INTEGER, 55)
+        self.assertEqual(snapshot.get("JSON_OBJECT"), test_set_expected["JSON_OBJECT"])
+        self.assertIsNone(snapshot.get("UNKNOWN"))
+        self.assertIs(snapshot.snapshot(), snapshot)
+        self.assertFalse(hasattr(snapshot, "__dict__"))
+        with self.assertRaises(AttributeError):
+            snapshot.INTEGER = 56
+
+        # Later changes of the config do not affect the snapshot
+        config.apply_parameters({"INTEGER": 56})
+        self.assertEqual(snapshot.INTEGER, 55)
+        self.assertNotEqual(config.snapshot(), snapshot)
+
+    def test_snapshot_of_special_names(self) -> None:
+        """Test the parameters, whose names can not be the attributes of the snapshot"""
+        entries = [
+            ConfigEntry(name=name, default=value)
+            for name, value in [
+                ("MY-VAR", "dash"),
+                ("get", "getter"),
+                ("items", "list"),
+                ("class", "keyword"),
+                ("_hash", "private"),
+                ("PORT", "8080"),
+            ]
+        ]
+        config = Config(APP_NAME, APP_DESCRIPTION, entries)
+        snapshot = config.snapshot()
+
+        self.assertEqual(snapshot.PORT, "8080")
+        for entry in entries:
+            self.assertEqual(snapshot.get(entry.name), entry.default)
+        self.assertEqual(
+            snapshot.items(), [(entry.name, entry.default) for entry in entries]
+        )
+        self.assertEqual(pickle.loads(pickle.dumps(snapshot)), snapshot)
+        self.assertEqual(hash(config.snapshot()), hash(snapshot))
+        with self.assertRaises(AttributeError):
+            snapshot.PORT = "8081"
+
+    def test_snapshot_of_mutable_values(self) -> None:
+        """Test that the in-place changes of the config values do not change the snapshot, nor its hash"""
+        config = Config(APP_NAME, APP_DESCRIPTION, config_entries)
+        config.apply_parameters({"JSON_OBJECT": {"id": 42}})
+        snapshot = config.snapshot()
+        snapshot_hash = hash(snapshot)
+
+        config.get("JSON_OBJECT")["added"] = True
+        self.assertEqual(snapshot.JSON_OBJECT, {"id": 42})
+        self.assertEqual(hash(snapshot), snapshot_hash)
+        self.assertNotEqual(config.snapshot(), snapshot)
+
+    def test_snapshot_hash_and_pickle(self) -> None:
+        """Test that the snapshot is hashable, and survives pickling"""
+        config = Config(APP_NAME, APP_DESCRIPTION, config_entries)
+        config.apply_parameters(test_set_expected)
+        snapshot = config.snapshot()
+
+        self.assertEqual(snapshot, config.snapshot())
+        self.assertEqual(hash(snapshot), hash(config.snapshot()))
+        self.assertIs(type(snapshot), type(config.snapshot()))
+
+        restored = pickle.loads(pickle.dumps(snapshot))
+        self.assertEqual(restored, snapshot)
+        self.assertEqual(restored.JSON_STRING_ARRAY, ["first", "second", "third"])
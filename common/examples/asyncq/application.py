@@ -4,7 +4,8 @@ import itertools as it
 import os
 import random
 import time
-from common.app import ApplicationBase, terminate
+from common.app import ApplicationBase
+from common.pipeline import Pipeline
 
 
 async def makeitem(size: int = 5) -> str:
@@ -12,36 +13,40 @@ async def makeitem(size: int = 5) -> str:
     return os.urandom(size).hex()
 
 
-async def randsleep(logger, caller=None) -> None:
+async def randsleep(logger, caller=None, name=None) -> None:
     """Makes the caller to sleep for a randomly selected period between 1-3 seconds"""
     i = random.randint(1, 3)
     if caller:
-        logger.info(f"{caller} sleeping for {i} seconds.")
+        logger.info("{} {} sleeping for {} seconds.", caller, name, i)
     await asyncio.sleep(i)
 
 
-async def produce(logger, name: int, queue: asyncio.Queue) -> None:
-    """Send randomly generated payloads into the `queue` randomly selected times between 1-5"""
+async def produce(logger, name: int, pipeline: Pipeline) -> None:
+    """Send randomly generated payloads into the `pipeline` randomly selected times between 1-5"""
     num = random.randint(1, 5)
     for _ in it.repeat(None, num):  # Synchronous loop for each single producer
-        await randsleep(logger, caller=f"Producer {name}")
+        await randsleep(logger, caller="Producer", name=name)
         item = await makeitem()
         perf_counter = time.perf_counter()
-        await queue.put((item, perf_counter))
-        logger.info(f"Producer {name} added <{item}> to queue.")
+        # Waits, while the queue of the consumers is full
+        await pipeline.put((item, perf_counter))
+        logger.info("Producer {} added <{}> to queue.", name, item)
 
 
-async def consume(logger, name: int, queue: asyncio.Queue) -> None:
-    """Consumes the"""
-    while True:
-        await randsleep(logger, caller=f"Consumer {name}")
-        item, perf_counter = await queue.get()
+def consumer(logger):
+    """Creates the handler of the consumer stage, that consumes the payloads"""
+
+    async def consume(payload) -> None:
+        item, perf_counter = payload
+        await randsleep(logger, caller="Consumer", name=item)
         now = time.perf_counter()
         logger.info(
-            f"Consumer {name} got element <{item}>"
-            f" in {now-perf_counter:0.5f} seconds."
+            "Consumer got element <{}> in {:0.5f} seconds.",
+            item,
+            now - perf_counter,
         )
-        queue.task_done()
+
+    return consume
 
 
 class Application(ApplicationBase):
@@ -75,46 +80,39 @@ class Application(ApplicationBase):
         self.health_check.set_state_shut_down()
 
         elapsed = time.perf_counter() - self.started
-        self.logger.info(f"Program completed in {elapsed:0.5f} seconds.")
+        self.logger.info("Program completed in {:0.5f} seconds.", elapsed)
 
     async def jobs(self):
         """
         Jobs definition of the application.
 
-        It will create producers and consumers, that will communicate with each other via an async queue.
+        It will create producers and a pool of consumers, that will communicate with each other via a pipeline.
         The producers will randomly select how many messages will send, with how long delay among the sendings.
 
-        This will run the producers, until they finish their work,
-        waits until the queue will be empty, then closes the consumers, finally it terminates.
+        This will run the producers, until they finish their work, then it requests the shutdown of the application.
+        The application drains the pipeline, so the consumers process all the remaining messages before it stops.
         """
 
-        # Create the async queue for communication
-        queue = asyncio.Queue()
-
         # Takes the command-line parameters to determine the number of producers and consumers
         nprod = self.config.get("NUM_PRODUCERS")
         ncon = self.config.get("NUM_CONSUMERS")
-        self.logger.info(f"jobs started with {nprod} producers and {ncon} consumers.")
+        self.logger.info(
+            "jobs started with {} producers and {} consumers.", nprod, ncon
+        )
+
+        # Create the pipeline with `ncon` number of consumer workers, and a bounded queue
+        pipeline = self.create_pipeline("asyncq")
+        pipeline.add_stage(
+            "consume", consumer(self.logger), workers=ncon, queue_size=ncon
+        )
+        pipeline.start()
 
-        # Create the `nprod` number of producer and `ncon` number of consumer tasks
+        # Create the `nprod` number of producer tasks, and make them running
         producers = [
-            asyncio.create_task(produce(self.logger, num, queue))
+            asyncio.create_task(produce(self.logger, num, pipeline))
             for num in range(nprod)
         ]
-        consumers = [
-            asyncio.create_task(consume(self.logger, num, queue)) for num in range(ncon)
-        ]
-
-        # Make the tasks running
         await asyncio.gather(*producers)
 
-        # Implicitly awaits consumers
-        await queue.join()
-
-        # Stops the consumers
-        for consumer in consumers:
-            consumer.cancel()
-
-        # Terminate the application, the `stop()` will take care for closing the consumers
-        self.logger.info("jobs finished")
-        terminate()
+        # Shut down the application, it drains the pipeline before the `stop()`
+        await self.request_shutdown("jobs finished")
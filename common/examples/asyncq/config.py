@@ -36,6 +36,18 @@ config_entries = [
             short_flag="-f", name="--log-format", choices=get_format_choices()
         ),
     ),
+    ConfigEntry(
+        name="LOG_SAMPLE_RATE",
+        help_text="The probability of writing an info or lower level log record",
+        default=1.0,
+        cli=CliEntry(short_flag="-sr", name="--log-sample-rate", entry_type=float),
+    ),
+    ConfigEntry(
+        name="LOG_SAMPLE_RATE_LIMIT",
+        help_text="The maximum number of info or lower level log records per second per call site, 0 means no limit",
+        default=0,
+        cli=CliEntry(short_flag="-sl", name="--log-sample-rate-limit", entry_type=int),
+    ),
     ConfigEntry(
         name="DUMP_CONFIG",
         help_text="Dump the actual configuration parameters of the application",
@@ -1,6 +1,7 @@
 """
 This is a bare-minimum application made, using the py-12f-common package.
 """
+import sys
 from common.app import ApplicationBase, application_entrypoint
 from common.config import Config, ConfigEntry, CliEntry
 from common.logger import get_level_choices, get_format_choices
@@ -63,7 +64,7 @@ class Application(ApplicationBase):
 
 def main():
     """The main entry point of the application"""
-    application_entrypoint(Application, application_config)
+    sys.exit(application_entrypoint(Application, application_config))
 
 
 if __name__ == "__main__":
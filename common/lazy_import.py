@@ -0,0 +1,37 @@
+"""
+Lazy import helper of the sub-packages.
+
+The sub-packages do not import their modules when they are imported, instead they use a module-level
+``__getattr__`` function (`PEP 562 <https://peps.python.org/pep-0562/>`_), that imports the module of a public
+name, when the name is accessed first, e.g. by ``from common.app import terminate``.
+So a tool, that only needs the config, does not pay for the import of the application machinery.
+"""
+from importlib import import_module
+
+
+def lazy_attributes(package_name, attributes):
+    """
+    Creates the module-level ``__getattr__`` and ``__dir__`` functions of a package.
+
+    :param str package_name: The name of the package, i.e. its ``__name__``.
+    :param dict attributes: The names of the modules relative to the package, that hold the public names,
+        by the public names, e.g. ``{"Config": ".config"}``.
+
+    :return: The ``(__getattr__, __dir__)`` functions.
+    """
+    package = import_module(package_name)
+
+    def __getattr__(name):
+        module_name = attributes.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+        value = getattr(import_module(module_name, package_name), name)
+        # Cache the value, so the __getattr__ is not called again for the same name
+        setattr(package, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(package)).union(attributes))
+
+    return __getattr__, __dir__
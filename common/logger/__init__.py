@@ -1,4 +1,34 @@
 """Logger related classes"""
-from .logger import get_level_choices, get_format_choices, get_logger, init_logger
+from typing import TYPE_CHECKING
+from ..lazy_import import lazy_attributes
+
+# The public names are imported on demand, see: common.lazy_import
+if TYPE_CHECKING:
+    from .logger import (
+        get_level_choices,
+        get_format_choices,
+        get_overflow_choices,
+        get_logger,
+        init_logger,
+        flush_logger,
+        get_dropped_count,
+        is_enabled,
+        log_lazy,
+    )
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "get_level_choices": ".logger",
+        "get_format_choices": ".logger",
+        "get_overflow_choices": ".logger",
+        "get_logger": ".logger",
+        "init_logger": ".logger",
+        "flush_logger": ".logger",
+        "get_dropped_count": ".logger",
+        "is_enabled": ".logger",
+        "log_lazy": ".logger",
+    },
+)
 
 __all__ = ["logger"]
@@ -9,13 +9,53 @@ in the meaning of setting the ``LOG_LEVEL`` and the ``LOG_FORMAT``.
 
 The module provides helper functions to access to the logger instance,
 as well as to enable the command line parser to gain the list of possible choices for log level and format.
+
+The log records can optionally be written asynchronously. In this case the records are put into
+a bounded in-memory queue, and a background writer thread writes them to the output in batches,
+so the event loop does not have to wait for the output.
+
+The ``json`` log format writes every record as a compact, flat JSON object.
+If the `orjson <https://github.com/ijl/orjson>`_ package is installed, it is used to encode the records.
+
+The volume of the low-level records can be reduced by sampling and rate limiting them per call site.
+The rate limiting lets through at most a given number of records per second from every call site,
+and the next record let through reports how many similar records were suppressed.
+Loguru formats the message of a record before running the filters, so the sampling only saves the emission
+of the suppressed records, not the formatting of their messages.
+
+To avoid paying the formatting cost of the records below the log level, the messages should be formatted by the logger
+from a template and arguments, e.g. ``logger.info("got {} items", count)``, instead of f-strings.
+The ``is_enabled()`` function tells cheaply, whether a level is enabled, and the ``log_lazy()`` function
+evaluates its callable message and arguments only when the record is going to be written.
 """
+import atexit
+import json
+import os
+import random
+import re
 import sys
+import threading
+import time
+import traceback
+from collections import deque
 from loguru import logger
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # pylint: disable=invalid-name
+
 # Use the loguru as logger
 app_logger = logger
 
+# The actual queued sink, if the asynchronous logging is enabled
+_queued_sink = None  # pylint: disable=invalid-name
+
+# The lowest level number written by the logger, and the cache of the enabled flags of the levels by their names.
+# Until the logger is initialized, loguru's default handler writes the DEBUG and higher level records.
+_min_level_no = 10  # pylint: disable=invalid-name
+_enabled_levels = {}
+
 
 def get_level_choices():
     """
@@ -36,6 +76,385 @@ def get_format_choices():
     return ["text", "json"]
 
 
+def get_overflow_choices():
+    """
+    Provides the list of valid overflow policies of the asynchronous logging
+
+    :return Array[str]: The array of the policies, that can be applied when the log queue is full.
+    """
+    return ["block", "drop-oldest", "drop-new"]
+
+
+class QueuedSink:
+    """
+    A loguru sink that puts the formatted log records into a bounded queue,
+    and writes them to the output stream from a background writer thread in batches.
+    """
+
+    def __init__(self, stream, queue_size=10000, overflow="block", batch_size=512):
+        """
+        Creates the sink, and starts its writer thread
+
+        :param stream: The output stream, e.g. ``sys.stderr``.
+        :param int queue_size: The maximum number of records waiting in the queue.
+        :param str overflow: The policy applied when the queue is full, one of ``get_overflow_choices()``.
+        :param int batch_size: The maximum number of records written at once.
+        """
+        if overflow not in get_overflow_choices():
+            raise ValueError(f"Unknown log queue overflow policy: '{overflow}'")
+
+        self.stream = stream
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue = deque()
+        self._writing = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = None
+        self._start_writer()
+
+    def _start_writer(self):
+        self._thread = threading.Thread(
+            target=self._write_batches, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, message):
+        """
+        Puts a formatted record into the queue, according to the overflow policy
+        """
+        with self._condition:
+            if len(self._queue) >= self.queue_size:
+                if self.overflow == "drop-new":
+                    self.dropped += 1
+                    return
+                if self.overflow == "drop-oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._queue) >= self.queue_size and not self._closed:
+                        self._condition.wait()
+
+            self._queue.append(message)
+            self._condition.notify_all()
+
+    def _write_batches(self):
+        """
+        Writes the queued records to the output stream, until the sink is closed
+        """
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(self.batch_size, len(self._queue)))
+                ]
+                self._writing = len(batch)
+                self._condition.notify_all()
+
+            try:
+                self.stream.write("".join(batch))
+                self.stream.flush()
+            finally:
+                with self._condition:
+                    self._writing = 0
+                    self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Waits until all the queued records are written
+
+        :param float timeout: The maximum time to wait in seconds, or ``None`` to wait until the queue is empty.
+
+        :return bool: ``True`` if all the records are written.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._writing, timeout
+            )
+
+    def stop(self, timeout=None):
+        """
+        Writes the queued records, then stops the writer thread
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def reset_after_fork(self):
+        """
+        Drops the records inherited from the parent process, and restarts the writer thread in the child process
+        """
+        self._queue = deque()
+        self._writing = 0
+        self._condition = threading.Condition()
+        if not self._closed:
+            self._start_writer()
+
+
+def flush_logger(timeout=None):
+    """
+    Waits until the asynchronously written log records are flushed to the output
+
+    :param float timeout: The maximum time to wait in seconds, or ``None`` to wait until all the records are written.
+    """
+    if _queued_sink is not None:
+        _queued_sink.flush(timeout)
+
+
+def get_dropped_count():
+    """
+    Returns with the number of log records dropped because the log queue was full
+    """
+    if _queued_sink is None:
+        return 0
+    return _queued_sink.dropped
+
+
+def _stop_queued_sink():
+    global _queued_sink  # pylint: disable=global-statement
+    if _queued_sink is not None:
+        _queued_sink.stop()
+        _queued_sink = None
+
+
+def _reset_queued_sink_after_fork():
+    if _queued_sink is not None:
+        _queued_sink.reset_after_fork()
+
+
+atexit.register(_stop_queued_sink)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_queued_sink_after_fork)
+
+
+# The format of the sinks with text format, the same as the default format of loguru
+_TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+    "<level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+# The extra key of the number of the records suppressed by the rate limiting before the record
+SUPPRESSED_EXTRA_KEY = "suppressed"
+
+# The markup tags of the loguru format strings, with the backslashes preceding them
+_MARKUP_TAG = re.compile(r"(\\*)(</?(?:[fb]g\s)?[^<>\s]*>)")
+
+
+# pylint: disable=too-few-public-methods
+class SamplingFilter:
+    """
+    A loguru filter, that samples and rate limits the records per call site
+
+    The records above the given level are always let through.
+    The first record let through in a new rate limiting period gets the number of the records suppressed
+    in the previous period in its ``suppressed`` extra value, that the formats of the sinks render.
+
+    The message of a record is already formatted, when the filter runs, so only the emission
+    of the suppressed records is saved.
+    """
+
+    def __init__(
+        self,
+        sample_rate=1.0,
+        rate_limit=0,
+        level="INFO",
+        period=1.0,
+        rand=random.random,
+    ):
+        """
+        Creates the filter
+
+        :param float sample_rate: The probability of letting through a record, between 0 and 1.
+        :param int rate_limit: The maximum number of records let through from a call site within a period.
+            If ``0``, then there is no limit.
+        :param str level: The name of the highest level, that is sampled and rate limited.
+        :param float period: The length of the rate limiting period in seconds.
+        :param rand: The random number generator function used for the sampling.
+        """
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        self.level_no = app_logger.level(level.upper()).no
+        self.period = period
+        self._rand = rand
+        # The (period start, records let through, records suppressed) of the call sites
+        self._sites = {}
+
+    def __call__(self, record):
+        if record["level"].no > self.level_no:
+            return True
+
+        if self.sample_rate < 1.0 and self._rand() >= self.sample_rate:
+            return False
+
+        if not self.rate_limit:
+            return True
+
+        site = (record["name"], record["function"], record["line"])
+        now = time.monotonic()
+        state = self._sites.get(site)
+        if state is None or now - state[0] >= self.period:
+            suppressed = state[2] if state is not None else 0
+            self._sites[site] = [now, 1, 0]
+            if suppressed:
+                record["extra"][SUPPRESSED_EXTRA_KEY] = suppressed
+            return True
+
+        if state[1] < self.rate_limit:
+            state[1] += 1
+            return True
+
+        state[2] += 1
+        return False
+
+
+def _dumps(data):
+    """
+    Encodes the data to a compact JSON string
+    """
+    if orjson is not None:
+        try:
+            # pylint: disable=no-member
+            return orjson.dumps(data, default=str).decode("utf-8")
+        except TypeError:
+            # e.g. integers out of the 64-bit range
+            pass
+    return json.dumps(data, default=str, separators=(",", ":"), ensure_ascii=False)
+
+
+def format_json_record(record):
+    """
+    Formats a loguru record to a compact, flat JSON string
+
+    The JSON object contains the timestamp, level, message, the source location of the record,
+    the bound extra values at the top level, and the formatted exception, if there is any.
+
+    :param dict record: The loguru record.
+
+    :return str: The JSON string, without a trailing newline.
+    """
+    data = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "name": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+    }
+    for key, value in record["extra"].items():
+        data.setdefault(key, value)
+
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_traceback = record["exception"]
+        data["exception"] = "".join(
+            traceback.format_exception(exc_type, exc_value, exc_traceback)
+        )
+
+    return _dumps(data)
+
+
+def _text_format(record):
+    """
+    The format function of the sinks with text format
+
+    The number of the records suppressed by the rate limiting is appended to the message.
+    """
+    if SUPPRESSED_EXTRA_KEY in record["extra"]:
+        return (
+            _TEXT_FORMAT
+            + " [{extra["
+            + SUPPRESSED_EXTRA_KEY
+            + "]} similar records suppressed]\n{exception}"
+        )
+    return _TEXT_FORMAT + "\n{exception}"
+
+
+def _escape_format(text):
+    """
+    Escapes a text to be returned literally by a loguru format function
+
+    The braces are doubled, and the markup tags are escaped with a backslash,
+    while the backslashes preceding them are doubled.
+    """
+    text = text.replace("{", "{{").replace("}", "}}")
+    return _MARKUP_TAG.sub(
+        lambda match: match.group(1) * 2 + "\\" + match.group(2), text
+    )
+
+
+def _json_format(record):
+    """
+    The format function of the sinks with JSON format
+
+    The JSON string is returned escaped, as the format string of the record.
+    """
+    return _escape_format(format_json_record(record)) + "\n"
+
+
+def _set_enabled_levels(log_level):
+    """
+    Resets the cache of the enabled flags of the levels, according to the actual log level
+    """
+    global _min_level_no  # pylint: disable=global-statement
+    _min_level_no = app_logger.level(log_level.upper()).no
+    _enabled_levels.clear()
+
+
+def is_enabled(level: str) -> bool:
+    """
+    Tells whether the records of the given level are written by the logger
+
+    The result is cached until the next call of ``init_logger()``.
+
+    :param str level: The name of the log level, e.g. ``debug``.
+
+    :return bool: ``True`` if the records of the level are written.
+    """
+    enabled = _enabled_levels.get(level)
+    if enabled is None:
+        enabled = app_logger.level(level.upper()).no >= _min_level_no
+        _enabled_levels[level] = enabled
+    return enabled
+
+
+def log_lazy(level: str, message, *args, **kwargs):
+    """
+    Logs a record, only if its level is enabled
+
+    The message and the arguments can be callables without parameters. They are called only
+    if the record is going to be written, and their return values are used instead of them.
+
+    :param str level: The name of the log level, e.g. ``debug``.
+    :param message: The message, or the template of the message, or a callable that returns with it.
+    :param args: The positional arguments of the message template.
+    :param kwargs: The keyword arguments of the message template.
+
+    Example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        log_lazy("debug", "The queue holds: {}", lambda: list(queue))
+    """
+    if not is_enabled(level):
+        return
+
+    if callable(message):
+        message = message()
+    args = [arg() if callable(arg) else arg for arg in args]
+    kwargs = {
+        key: value() if callable(value) else value for key, value in kwargs.items()
+    }
+    app_logger.opt(depth=1).log(level.upper(), message, *args, **kwargs)
+
+
 def get_logger():
     """
     Returns with the application logger
@@ -45,17 +464,40 @@ def get_logger():
     return app_logger
 
 
-def init_logger(log_level: str, log_format: str):
+def init_logger(
+    log_level: str,
+    log_format: str,
+    *,
+    log_async: bool = False,
+    queue_size: int = None,
+    overflow: str = None,
+    sample_rate: float = None,
+    rate_limit: int = None,
+    sample_level: str = None,
+):
     """
     Configures the logger instance
 
     :param str log_level: The selected log level to use.
     :param str log_format: The selected log format to use.
+    :param bool log_async: If ``True``, the records are written by a background thread via a bounded queue.
+    :param int queue_size: The maximum number of records in the queue of the asynchronous logging.
+        The default is 10000.
+    :param str overflow: The policy applied, when the queue of the asynchronous logging is full,
+        one of ``get_overflow_choices()``. The default is ``block``.
+    :param float sample_rate: The probability of writing a record, that is not above the ``sample_level``.
+        The default is 1.0, that means all records are written.
+    :param int rate_limit: The maximum number of records per second written from a call site,
+        that are not above the ``sample_level``. The default is 0, that means no limit.
+    :param str sample_level: The highest level, that is sampled and rate limited. The default is ``info``.
 
     :return: the logger object
     """
+    global _queued_sink  # pylint: disable=global-statement
+
     # Remove the default logger before configuring
     app_logger.remove()
+    _stop_queued_sink()
 
     if log_level is None:
         log_level = "info"
@@ -63,10 +505,33 @@ def init_logger(log_level: str, log_format: str):
     if log_format is None:
         log_format = "text"
 
+    _set_enabled_levels(log_level)
+
+    sink = sys.stderr
+    if log_async:
+        _queued_sink = QueuedSink(
+            sys.stderr,
+            queue_size=10000 if queue_size is None else int(queue_size),
+            overflow="block" if overflow is None else overflow,
+        )
+        sink = _queued_sink
+
+    sample_rate = 1.0 if sample_rate is None else float(sample_rate)
+    rate_limit = 0 if rate_limit is None else int(rate_limit)
+    log_filter = None
+    if sample_rate < 1.0 or rate_limit > 0:
+        log_filter = SamplingFilter(
+            sample_rate, rate_limit, "info" if sample_level is None else sample_level
+        )
+
     # Create a new sink instance, and set the format and level
     if log_format.upper() == "JSON":
-        app_logger.add(sys.stderr, level=log_level.upper(), serialize=True)
+        app_logger.add(
+            sink, level=log_level.upper(), filter=log_filter, format=_json_format
+        )
     else:
-        app_logger.add(sys.stderr, level=log_level.upper())
+        app_logger.add(
+            sink, level=log_level.upper(), filter=log_filter, format=_text_format
+        )
 
     return app_logger
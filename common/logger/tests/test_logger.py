@@ -0,0 +1,248 @@
+"""Test the logger module"""
+# pylint: disable=protected-access
+import io
+import json
+import threading
+import unittest
+from common.logger import (
+    get_logger,
+    init_logger,
+    flush_logger,
+    get_dropped_count,
+    is_enabled,
+    log_lazy,
+)
+from common.logger.logger import (
+    QueuedSink,
+    SamplingFilter,
+    _json_format,
+    _text_format,
+)
+
+
+class BlockedStream(io.StringIO):
+    """A stream, that blocks the writes until it is released"""
+
+    def __init__(self):
+        super().__init__()
+        self.released = threading.Event()
+
+    def write(self, s):
+        self.released.wait()
+        return super().write(s)
+
+
+class QueuedSinkTestCase(unittest.TestCase):
+    """The queued sink test cases"""
+
+    def test_records_are_written_in_order(self) -> None:
+        """Test that all the records are written by the writer thread"""
+        stream = io.StringIO()
+        sink = QueuedSink(stream, queue_size=10, batch_size=3)
+        for i in range(25):
+            sink(f"{i}\n")
+        self.assertTrue(sink.flush(timeout=5))
+        sink.stop()
+
+        self.assertEqual(stream.getvalue(), "".join(f"{i}\n" for i in range(25)))
+        self.assertEqual(sink.dropped, 0)
+
+    def test_drop_policies(self) -> None:
+        """Test the drop-new and drop-oldest overflow policies"""
+        for overflow, expected in [
+            ("drop-new", ["0", "1", "2"]),
+            ("drop-oldest", ["0", "3", "4"]),
+        ]:
+            stream = BlockedStream()
+            sink = QueuedSink(stream, queue_size=2, overflow=overflow)
+            sink("0")
+            # Wait until the writer thread takes the first record, and blocks on writing it
+            with sink._condition:
+                sink._condition.wait_for(lambda s=sink: not s._queue)
+            for i in range(1, 5):
+                sink(str(i))
+
+            stream.released.set()
+            sink.stop()
+            self.assertEqual(list(stream.getvalue()), expected)
+            self.assertEqual(sink.dropped, 2)
+
+    def test_unknown_policy(self) -> None:
+        """Test that an unknown overflow policy is refused"""
+        with self.assertRaises(ValueError):
+            QueuedSink(io.StringIO(), overflow="unknown")
+
+    def test_async_logger(self) -> None:
+        """Test the asynchronous logging via the logger"""
+        logger = init_logger("info", "text", log_async=True, queue_size=100)
+        logger.info("asynchronous log record")
+        flush_logger()
+        self.assertEqual(get_dropped_count(), 0)
+        init_logger("info", "text")
+
+
+class JsonFormatTestCase(unittest.TestCase):
+    """The JSON log format test cases"""
+
+    def test_flat_json_record(self) -> None:
+        """Test that the records are formatted to flat JSON objects with the extras and the exception"""
+        logger = get_logger()
+        stream = io.StringIO()
+        handler_id = logger.add(stream, format=_json_format)
+        try:
+            logger.bind(request_id="c0ffee").info("got {} items", 3)
+            try:
+                raise ValueError("wrong value")
+            except ValueError:
+                logger.exception("failed")
+        finally:
+            logger.remove(handler_id)
+
+        first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(first["message"], "got 3 items")
+        self.assertEqual(first["level"], "INFO")
+        self.assertEqual(first["request_id"], "c0ffee")
+        self.assertEqual(first["function"], "test_flat_json_record")
+        self.assertNotIn("exception", first)
+        self.assertEqual(second["level"], "ERROR")
+        self.assertIn("ValueError: wrong value", second["exception"])
+
+    def test_literal_json_record(self) -> None:
+        """Test that the braces and markup-like tags are written literally, and the extras are not changed"""
+        logger = get_logger()
+        stream = io.StringIO()
+        extras = []
+        handler_id = logger.add(stream, format=_json_format)
+        second_id = logger.add(
+            lambda message: extras.append(dict(message.record["extra"])),
+            format="{message}",
+        )
+        messages = ["{braces}", "<red>tag</red>", "escaped \\<b>tag</b>", "a < b"]
+        try:
+            for message in messages:
+                logger.bind(key="value").info(message)
+        finally:
+            logger.remove(handler_id)
+            logger.remove(second_id)
+
+        self.assertEqual(
+            [json.loads(line)["message"] for line in stream.getvalue().splitlines()],
+            messages,
+        )
+        self.assertEqual(extras, [{"key": "value"}] * len(messages))
+
+
+class SamplingFilterTestCase(unittest.TestCase):
+    """The sampling filter test cases"""
+
+    def test_rate_limit(self) -> None:
+        """Test that the records are rate limited per call site, and the suppressed ones are reported"""
+        logger = get_logger()
+        stream = io.StringIO()
+        json_stream = io.StringIO()
+        unfiltered = []
+        log_filter = SamplingFilter(rate_limit=2, period=3600)
+        handler_id = logger.add(stream, format=_text_format, filter=log_filter)
+        json_filter = SamplingFilter(rate_limit=2, period=3600)
+        json_id = logger.add(json_stream, format=_json_format, filter=json_filter)
+        unfiltered_id = logger.add(
+            lambda message: unfiltered.append(message.record["message"]),
+            format="{message}",
+        )
+
+        def first_site(value):
+            logger.info("first site {}", value)
+
+        try:
+            for i in range(5):
+                first_site(i)
+                logger.info("second site {}", i)
+            logger.warning("warnings are not limited")
+            logger.warning("warnings are not limited")
+            logger.warning("warnings are not limited")
+
+            # Start a new period
+            for state in [*log_filter._sites.values(), *json_filter._sites.values()]:
+                state[0] -= 3600
+            first_site("again")
+        finally:
+            logger.remove(handler_id)
+            logger.remove(json_id)
+            logger.remove(unfiltered_id)
+
+        self.assertEqual(
+            [line.split(" - ", 1)[1] for line in stream.getvalue().splitlines()],
+            [
+                "first site 0",
+                "second site 0",
+                "first site 1",
+                "second site 1",
+            ]
+            + ["warnings are not limited"] * 3
+            + ["first site again [3 similar records suppressed]"],
+        )
+        last = json.loads(json_stream.getvalue().splitlines()[-1])
+        self.assertEqual(last["message"], "first site again")
+        self.assertEqual(last["suppressed"], 3)
+        self.assertEqual(unfiltered[-1], "first site again")
+
+    def test_sample_rate(self) -> None:
+        """Test the probabilistic sampling"""
+        logger = get_logger()
+        stream = io.StringIO()
+        samples = iter([0.1, 0.9, 0.4, 0.6])
+        log_filter = SamplingFilter(sample_rate=0.5, rand=lambda: next(samples))
+        handler_id = logger.add(stream, format="{message}", filter=log_filter)
+        try:
+            for i in range(4):
+                logger.info("record {}", i)
+            logger.error("errors are not sampled")
+        finally:
+            logger.remove(handler_id)
+
+        self.assertEqual(
+            stream.getvalue().splitlines(),
+            ["record 0", "record 2", "errors are not sampled"],
+        )
+
+
+class LazyLoggingTestCase(unittest.TestCase):
+    """The level-gated logging test cases"""
+
+    def tearDown(self) -> None:
+        init_logger("info", "text")
+
+    def test_is_enabled(self) -> None:
+        """Test that the enabled levels follow the level set by init_logger()"""
+        init_logger("warning", "text")
+        self.assertFalse(is_enabled("debug"))
+        self.assertFalse(is_enabled("info"))
+        self.assertTrue(is_enabled("warning"))
+        self.assertTrue(is_enabled("ERROR"))
+
+        init_logger("debug", "text")
+        self.assertTrue(is_enabled("debug"))
+        self.assertFalse(is_enabled("trace"))
+
+    def test_log_lazy(self) -> None:
+        """Test that the callables are only evaluated, when the record is written"""
+        init_logger("info", "text")
+        logger = get_logger()
+        stream = io.StringIO()
+        handler_id = logger.add(stream, format="{function} {message}")
+        calls = []
+
+        def expensive():
+            calls.append(1)
+            return "expensive"
+
+        try:
+            log_lazy("debug", "filtered out {}", expensive)
+            log_lazy("info", lambda: "written {} {value}", expensive, value=42)
+        finally:
+            logger.remove(handler_id)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(
+            stream.getvalue().splitlines(), ["test_log_lazy written expensive 42"]
+        )
@@ -0,0 +1,30 @@
+"""
+This sub-module holds the metrics registry of the application.
+"""
+from typing import TYPE_CHECKING
+from ..lazy_import import lazy_attributes
+
+# The public names are imported on demand, see: common.lazy_import
+if TYPE_CHECKING:
+    from .metrics import (
+        Counter,
+        Gauge,
+        Histogram,
+        MetricsRegistry,
+        ProcessMetrics,
+        CONTENT_TYPE,
+    )
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "Counter": ".metrics",
+        "Gauge": ".metrics",
+        "Histogram": ".metrics",
+        "MetricsRegistry": ".metrics",
+        "ProcessMetrics": ".metrics",
+        "CONTENT_TYPE": ".metrics",
+    },
+)
+
+__all__ = ["metrics"]
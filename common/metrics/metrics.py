@@ -0,0 +1,389 @@
+"""
+The metrics module of the application
+
+This module provides a simple metrics registry that holds counters, gauges and histograms,
+and renders them in the `Prometheus text exposition format
+<https://prometheus.io/docs/instrumenting/exposition_formats/#text-based-format>`_.
+
+The metrics are meant to be updated from the event loop of the application,
+so the update operations are plain attribute modifications without any locking.
+
+The ``ProcessMetrics`` class registers the default metrics of the application process:
+the number of asyncio tasks, the garbage collector pauses, the resident memory size and the uptime.
+The event loop lag is recorded by the :class:`~common.app.loop_monitor.LoopLagMonitor`.
+"""
+import bisect
+import gc
+from abc import ABC, abstractmethod
+import math
+import os
+import time
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+"""The default upper bounds of the histogram buckets, in seconds"""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+"""The content type of the text exposition format"""
+
+
+def _format_value(value):
+    """
+    Formats a sample value according to the text exposition format
+    """
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    """
+    Formats a list of label name-value pairs according to the text exposition format
+    """
+    if not labels:
+        return ""
+
+    pairs = []
+    for name, value in labels:
+        value = (
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric(ABC):
+    """
+    Base class of the metrics.
+
+    A metric that has label names is a family of metrics. Its children can be reached via the ``labels()`` function,
+    and the children hold the actual values.
+    """
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, help_text: str = "", labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.labelpairs = []
+        self._children = {}
+
+    def labels(self, *labelvalues, **labelkwargs):
+        """
+        Returns with the child metric that belongs to the given label values
+
+        The label values can be given either positionally, in the order of the label names, or as keyword arguments.
+        """
+        if labelkwargs:
+            labelvalues = tuple(str(labelkwargs[name]) for name in self.labelnames)
+        else:
+            labelvalues = tuple(str(value) for value in labelvalues)
+
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(
+                f"The '{self.name}' metric expects the {self.labelnames} labels"
+            )
+
+        child = self._children.get(labelvalues)
+        if child is None:
+            child = self._new_child()
+            child.labelpairs = list(zip(self.labelnames, labelvalues))
+            self._children[labelvalues] = child
+        return child
+
+    def _new_child(self):
+        """
+        Creates a new child metric, without labels
+        """
+        return self.__class__(self.name, self.help_text)
+
+    def samples(self):
+        """
+        Returns with the list of (suffix, labels, value) tuples of the metric
+        """
+        return [("", self.labelpairs, self.get())]
+
+    @abstractmethod
+    def get(self):
+        """
+        Returns with the actual value of the metric
+        """
+
+    def render(self):
+        """
+        Renders the metric in text exposition format
+
+        :return Array[str]: The lines of the rendered metric.
+        """
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        metrics = self._children.values() if self.labelnames else [self]
+        for metric in metrics:
+            for suffix, labels, value in metric.samples():
+                lines.append(
+                    f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+                )
+        return lines
+
+
+class Counter(Metric):
+    """
+    A counter is a cumulative metric, whose value can only increase
+    """
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, help_text: str = "", labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.value = 0
+
+    def inc(self, amount=1):
+        """
+        Increments the counter with the given amount
+        """
+        self.value += amount
+
+    def get(self):
+        return self.value
+
+
+class Gauge(Metric):
+    """
+    A gauge is a metric, whose value can arbitrarily go up and down
+
+    The value of a gauge can also be calculated by a function, when the metric is collected.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, help_text: str = "", labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.value = 0
+        self._function = None
+
+    def set(self, value):
+        """
+        Sets the value of the gauge
+        """
+        self.value = value
+
+    def inc(self, amount=1):
+        """
+        Increments the value of the gauge
+        """
+        self.value += amount
+
+    def dec(self, amount=1):
+        """
+        Decrements the value of the gauge
+        """
+        self.value -= amount
+
+    def set_function(self, function):
+        """
+        Sets a function without arguments, that calculates the value of the gauge, when it is collected
+        """
+        self._function = function
+
+    def get(self):
+        if self._function is not None:
+            return self._function()
+        return self.value
+
+
+class Histogram(Metric):
+    """
+    A histogram counts the observed values in buckets with fixed upper bounds
+    """
+
+    metric_type = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str = "", labelnames=(), buckets=DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self):
+        return self.__class__(self.name, self.help_text, buckets=self.buckets)
+
+    def observe(self, value):
+        """
+        Observes a value
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def get(self):
+        return self.count
+
+    def samples(self):
+        labels = self.labelpairs
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            samples.append(
+                ("_bucket", labels + [("le", _format_value(float(bound)))], cumulative)
+            )
+        samples.append(("_sum", labels, self.sum))
+        samples.append(("_count", labels, self.count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    The registry of the metrics of the application
+    """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _get_or_create(self, metric_class, name, *args, **kwargs):
+        """
+        Returns with the metric registered with the given name, or creates a new one if it does not exist yet
+        """
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = metric_class(name, *args, **kwargs)
+            self._metrics[name] = metric
+        elif not isinstance(metric, metric_class):
+            raise ValueError(
+                f"The '{name}' metric is already registered as {metric.metric_type}"
+            )
+        return metric
+
+    def counter(self, name: str, help_text: str = "", labelnames=()) -> Counter:
+        """
+        Returns with the counter registered with the given name, or creates it
+        """
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str = "", labelnames=()) -> Gauge:
+        """
+        Returns with the gauge registered with the given name, or creates it
+        """
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self, name: str, help_text: str = "", labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        """
+        Returns with the histogram registered with the given name, or creates it
+        """
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets)
+
+    def get(self, name: str):
+        """
+        Returns with the metric registered with the given name, or ``None`` if not found
+        """
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Renders all the registered metrics in text exposition format
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        lines.append("")
+        return "\n".join(lines)
+
+
+def _resident_memory_bytes():
+    """
+    Returns with the resident memory size of the process, or 0 if it can not be determined
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class ProcessMetrics:
+    """
+    Registers and updates the default metrics of the application process
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        """
+        Registers the default metrics
+
+        :param MetricsRegistry registry: The registry to register the metrics into.
+        """
+        self._loop = None
+        self._gc_started = None
+        self._started = time.monotonic()
+
+        self.tasks = registry.gauge(
+            "asyncio_tasks", "The number of the not yet finished asyncio tasks"
+        )
+        self.tasks.set_function(self._count_tasks)
+        self.gc_pauses = registry.histogram(
+            "python_gc_pause_seconds", "The pauses caused by the garbage collector"
+        )
+        self.rss = registry.gauge(
+            "process_resident_memory_bytes", "The resident memory size of the process"
+        )
+        self.rss.set_function(_resident_memory_bytes)
+        self.uptime = registry.gauge(
+            "process_uptime_seconds", "The time elapsed since the application started"
+        )
+        self.uptime.set_function(lambda: time.monotonic() - self._started)
+
+    def install(self, loop):
+        """
+        Starts the measurement of the uptime and the garbage collector pauses
+
+        :param loop: The event loop of the application.
+        """
+        self._loop = loop
+        self._started = time.monotonic()
+        gc.callbacks.append(self._gc_callback)
+
+    def uninstall(self):
+        """
+        Stops the measurement of the garbage collector pauses
+        """
+        if self._gc_callback in gc.callbacks:
+            gc.callbacks.remove(self._gc_callback)
+
+    def _count_tasks(self):
+        if self._loop is None or self._loop.is_closed():
+            return 0
+
+        # The asyncio is only imported here, so the metrics can be used without the event loop machinery.
+        # It is already imported, when the metrics of a running event loop are collected.
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        return len(asyncio.all_tasks(self._loop))
+
+    def _gc_callback(self, phase, _info):
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            self.gc_pauses.observe(time.perf_counter() - self._gc_started)
+            self._gc_started = None
@@ -0,0 +1,86 @@
+"""Test the metrics module"""
+import asyncio
+import unittest
+from common.metrics import MetricsRegistry, ProcessMetrics
+
+
+class MetricsTestCase(unittest.TestCase):
+    """The metrics test cases"""
+
+    def test_counter_and_gauge(self) -> None:
+        """Test the rendering of counters and gauges"""
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "The number of requests")
+        counter.inc()
+        counter.inc(2)
+        gauge = registry.gauge("queue_size", "The queue size", labelnames=["queue"])
+        gauge.labels("input").set(5)
+        gauge.labels(queue='out"put').inc()
+
+        self.assertIs(registry.counter("requests_total"), counter)
+        self.assertEqual(
+            registry.render(),
+            "\n".join(
+                [
+                    "# HELP requests_total The number of requests",
+                    "# TYPE requests_total counter",
+                    "requests_total 3",
+                    "# HELP queue_size The queue size",
+                    "# TYPE queue_size gauge",
+                    'queue_size{queue="input"} 5',
+                    'queue_size{queue="out\\"put"} 1',
+                    "",
+                ]
+            ),
+        )
+
+    def test_histogram(self) -> None:
+        """Test the bucketing and rendering of histograms"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=[0.1, 1])
+        for value in [0.05, 0.1, 0.5, 3]:
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()
+        self.assertEqual(
+            lines[2:],
+            [
+                'latency_seconds_bucket{le="0.1"} 2',
+                'latency_seconds_bucket{le="1.0"} 3',
+                'latency_seconds_bucket{le="+Inf"} 4',
+                "latency_seconds_sum 3.65",
+                "latency_seconds_count 4",
+            ],
+        )
+
+    def test_registry_type_conflict(self) -> None:
+        """Test that a name can not be registered with different metric types"""
+        registry = MetricsRegistry()
+        registry.counter("name")
+        with self.assertRaises(ValueError):
+            registry.gauge("name")
+
+    def test_process_metrics(self) -> None:
+        """Test the default process metrics"""
+        registry = MetricsRegistry()
+        process_metrics = ProcessMetrics(registry)
+        loop = asyncio.new_event_loop()
+        try:
+            process_metrics.install(loop)
+            loop.run_until_complete(asyncio.sleep(0.05))
+            rendered = loop.run_until_complete(self._render(registry))
+        finally:
+            process_metrics.uninstall()
+            loop.close()
+
+        for name in [
+            "asyncio_tasks 1",
+            "python_gc_pause_seconds_count",
+            "process_resident_memory_bytes",
+            "process_uptime_seconds",
+        ]:
+            self.assertIn(name, rendered)
+
+    @staticmethod
+    async def _render(registry):
+        return registry.render()
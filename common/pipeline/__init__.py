@@ -0,0 +1,25 @@
+"""
+This sub-module holds the bounded, backpressure-aware queue pipeline of the application,
+and the micro-batching consumer.
+"""
+from typing import TYPE_CHECKING
+from ..lazy_import import lazy_attributes
+
+# The public names are imported on demand, see: common.lazy_import
+if TYPE_CHECKING:
+    from .pipeline import Pipeline, Stage, StageQueue, QueueClosed, get_batch
+    from .batching import BatchConsumer
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "Pipeline": ".pipeline",
+        "Stage": ".pipeline",
+        "StageQueue": ".pipeline",
+        "QueueClosed": ".pipeline",
+        "get_batch": ".pipeline",
+        "BatchConsumer": ".batching",
+    },
+)
+
+__all__ = ["pipeline"]
@@ -0,0 +1,135 @@
+"""
+The micro-batching consumer module
+
+The ``BatchConsumer`` takes the items from an ``asyncio.Queue`` in batches: it accumulates the items until
+either ``max_batch`` items are collected, or ``max_latency_ms`` milliseconds are elapsed since the first item
+of the batch arrived. Then it hands over the list of items to an async handler, and marks the whole batch as done
+at once. So the sinks, that are cheaper per item in bulk, e.g. database writes, or HTTP posts,
+are called with batches, without delaying the items for more than the given latency.
+
+The consumer records the size of the batches relative to ``max_batch`` into the ``batch_fill_ratio``
+histogram. If the ratio is mostly low, the ``max_latency_ms`` can be increased to make bigger batches,
+if it is mostly one, the ``max_batch`` can be increased.
+
+Example of usage:
+
+.. highlight:: python
+.. code-block:: python
+
+    async def write_rows(rows):
+        await db.executemany(INSERT_ROW, rows)
+
+    consumer = BatchConsumer(self.logger, queue, write_rows, max_batch=500, max_latency_ms=20, metrics=self.metrics)
+    consumer.start()
+    ...
+    await consumer.drain()
+"""
+import asyncio
+from .pipeline import FILL_RATIO_BUCKETS, ack, get_batch
+
+
+class BatchConsumer:
+    """
+    Consumes the items of a queue in batches
+    """
+
+    def __init__(
+        self,
+        logger,
+        queue,
+        handler,
+        *,
+        max_batch=100,
+        max_latency_ms=50,
+        workers=1,
+        name="batch",
+        metrics=None,
+    ):
+        """
+        Initializes the consumer
+
+        :param logger: The application logger.
+        :param asyncio.Queue queue: The queue to consume. It can be a ``StageQueue`` too.
+        :param handler: The async function, that is called with the list of items of a batch.
+        :param int max_batch: The maximum number of items in a batch.
+        :param float max_latency_ms: The maximum time in milliseconds to wait for a batch to fill up,
+            after its first item arrived.
+        :param int workers: The number of the consumer tasks.
+        :param str name: The name of the consumer, used in the logs and the metrics.
+        :param MetricsRegistry metrics: The registry to record the metrics of the consumer into, if given.
+        """
+        self.logger = logger
+        self.queue = queue
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_latency_ms / 1000
+        self.workers = workers
+        self.name = name
+        self._tasks = []
+
+        self.fill_ratio = None
+        self.errors = None
+        if metrics is not None:
+            self.fill_ratio = metrics.histogram(
+                "batch_fill_ratio",
+                "The size of the batches relative to the maximum batch size",
+                ["consumer"],
+                buckets=FILL_RATIO_BUCKETS,
+            ).labels(name)
+            self.errors = metrics.counter(
+                "batch_errors",
+                "The number of the items in the batches the handler failed to process",
+                ["consumer"],
+            ).labels(name)
+
+    def start(self):
+        """
+        Starts the consumer tasks on the running event loop
+        """
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._consume()))
+
+    async def drain(self, timeout=None):
+        """
+        Waits until the items of the queue are consumed, then stops the consumer tasks
+
+        :param float timeout: The maximum time in seconds to wait for the items to be consumed.
+        """
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                "BatchConsumer {}: the drain timed out, dropping {} items",
+                self.name,
+                self.queue.qsize(),
+            )
+        await self.stop()
+
+    async def stop(self):
+        """
+        Cancels the consumer tasks immediately
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _consume(self):
+        while True:
+            items = await get_batch(self.queue, self.max_batch, self.max_wait)
+            if self.fill_ratio is not None:
+                self.fill_ratio.observe(len(items) / self.max_batch)
+
+            try:
+                await self.handler(items)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                self.logger.opt(exception=True).error(
+                    "BatchConsumer {}: failed to process a batch of {} items: {}",
+                    self.name,
+                    len(items),
+                    err,
+                )
+                if self.errors is not None:
+                    self.errors.inc(len(items))
+            finally:
+                ack(self.queue, len(items))
@@ -0,0 +1,378 @@
+"""
+The pipeline module
+
+A pipeline is a chain of stages. Each stage has a bounded input queue, and a pool of worker tasks,
+that take the items from the queue, process them with the handler function of the stage,
+and put the results into the queue of the next stage.
+
+The queues are bounded, so a fast producer is slowed down by the ``put()`` and ``put_many()`` functions,
+until the workers catch up with it, instead of growing the memory without limit.
+
+The workers of a stage can take the items one by one, or in batches of at most ``batch_size`` items,
+waiting at most ``max_wait`` seconds to fill up the batch.
+
+The pipeline can be drained gracefully: it stops accepting new items, waits until the items already taken
+are processed by all the stages, then it cancels the workers.
+The pipelines created via ``ApplicationBase.create_pipeline()`` are drained automatically,
+when the application shuts down.
+
+Example of usage:
+
+.. highlight:: python
+.. code-block:: python
+
+    async def start(self):
+        self.pipeline = self.create_pipeline("orders")
+        self.pipeline.add_stage("parse", parse_order, workers=4, queue_size=1000)
+        self.pipeline.add_stage("store", store_orders, workers=2, batch_size=100, max_wait=0.05)
+        self.pipeline.start()
+
+    async def on_message(self, message):
+        # Blocks, while the queue of the first stage is full
+        await self.pipeline.put(message)
+"""
+import asyncio
+
+DEFAULT_QUEUE_SIZE = 100
+"""The default capacity of the stage queues"""
+
+FILL_RATIO_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+"""The upper bounds of the buckets of the batch fill ratio histograms"""
+
+
+class QueueClosed(Exception):
+    """
+    Raised when an item is put into a closed queue
+    """
+
+
+async def get_batch(queue, max_n, max_wait=0.0):
+    """
+    Takes at most ``max_n`` items from an ``asyncio.Queue``.
+
+    Waits until the first item is available, then takes the available items,
+    and waits at most ``max_wait`` seconds for more items to fill up the batch.
+
+    Each item taken has to be marked as done via the ``task_done()`` function of the queue.
+
+    :param asyncio.Queue queue: The queue to take the items from.
+    :param int max_n: The maximum number of items to take.
+    :param float max_wait: The maximum time in seconds to wait for the batch to fill up, after the first item.
+
+    :return Array: The list of items, that contains at least one item.
+    """
+    items = [await queue.get()]
+    deadline = None
+    while len(items) < max_n:
+        if not queue.empty():
+            items.append(queue.get_nowait())
+            continue
+
+        if max_wait <= 0:
+            break
+
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            deadline = loop.time() + max_wait
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+
+        try:
+            items.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return items
+
+
+def ack(queue, count):
+    """
+    Marks the given number of items taken from an ``asyncio.Queue`` as done
+    """
+    if isinstance(queue, StageQueue):
+        queue.task_done(count)
+    else:
+        for _ in range(count):
+            queue.task_done()
+
+
+class StageQueue(asyncio.Queue):
+    """
+    A bounded queue, with batch operations
+
+    The number of unfinished items is tracked like in case of the ``asyncio.Queue``,
+    so the ``join()`` function waits until all the items taken from the queue are marked as done.
+    """
+
+    def __init__(self, maxsize=DEFAULT_QUEUE_SIZE):
+        """
+        Initializes the queue
+
+        :param int maxsize: The capacity of the queue. It must be a positive number, to make backpressure.
+        """
+        if maxsize <= 0:
+            raise ValueError("The size of the stage queue must be a positive number")
+        super().__init__(maxsize)
+        self.closed = False
+
+    def close(self):
+        """
+        Closes the queue, so it does not accept new items any more. The items already in the queue can be taken.
+        """
+        self.closed = True
+
+    async def put(self, item):
+        """
+        Puts an item into the queue. Waits, while the queue is full.
+
+        :raises QueueClosed: if the queue is closed.
+        """
+        if self.closed:
+            raise QueueClosed()
+        await super().put(item)
+
+    async def put_many(self, items):
+        """
+        Puts the items into the queue. Waits, while the queue is full.
+
+        :raises QueueClosed: if the queue is closed.
+        """
+        for item in items:
+            if self.full():
+                await self.put(item)
+            elif self.closed:
+                raise QueueClosed()
+            else:
+                self.put_nowait(item)
+
+    async def get_many(self, max_n, max_wait=0.0):
+        """
+        Takes at most ``max_n`` items from the queue. See also: :func:`get_batch`.
+
+        Each item taken has to be marked as done via the ``task_done()`` function.
+
+        :return Array: The list of items, that contains at least one item.
+        """
+        return await get_batch(self, max_n, max_wait)
+
+    def task_done(self, count=1):
+        """
+        Marks the given number of items taken from the queue as done
+
+        :raises ValueError: if it is called more times than there were items taken from the queue.
+        """
+        for _ in range(count):
+            super().task_done()
+
+
+# pylint: disable=too-few-public-methods
+class Stage:
+    """
+    A stage of the pipeline
+    """
+
+    def __init__(
+        self,
+        name,
+        handler,
+        *,
+        workers=1,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        batch_size=1,
+        max_wait=0.0,
+    ):
+        """
+        Initializes the stage
+
+        :param str name: The name of the stage.
+        :param handler: The async function, that processes the items.
+            If ``batch_size`` is 1, it is called with an item, and returns with the result.
+            Otherwise it is called with the list of items, and returns with the list of results.
+            The results are put into the queue of the next stage, unless the result is ``None``.
+        :param int workers: The number of the worker tasks.
+        :param int queue_size: The capacity of the input queue of the stage.
+        :param int batch_size: The maximum number of items the handler is called with.
+        :param float max_wait: The maximum time in seconds to wait for a batch to fill up.
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.queue = StageQueue(queue_size)
+        self.next_stage = None
+
+
+class Pipeline:
+    """
+    A chain of stages, connected with bounded queues
+    """
+
+    def __init__(self, logger, name, *, metrics=None):
+        """
+        Initializes the pipeline
+
+        :param logger: The application logger.
+        :param str name: The name of the pipeline, used in the logs and the metrics.
+        :param MetricsRegistry metrics: The registry to record the metrics of the stages into, if given.
+        """
+        self.logger = logger
+        self.name = name
+        self.metrics = metrics
+        self.stages = []
+        self._tasks = []
+
+    def add_stage(self, name, handler, **kwargs):
+        """
+        Appends a new stage to the end of the pipeline.
+
+        The parameters are the same as the parameters of the :class:`Stage`.
+
+        :return Stage: The new stage.
+        """
+        stage = Stage(name, handler, **kwargs)
+        if self.stages:
+            self.stages[-1].next_stage = stage
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        """
+        Starts the workers of the stages on the running event loop
+        """
+        for stage in self.stages:
+            for _ in range(stage.workers):
+                self._tasks.append(asyncio.create_task(self._work(stage)))
+        self.logger.debug(
+            "Pipeline {}: started with {} workers", self.name, len(self._tasks)
+        )
+
+    @property
+    def started(self):
+        """
+        ``True``, if the workers are running
+        """
+        return bool(self._tasks)
+
+    async def put(self, item):
+        """
+        Puts an item into the pipeline. Waits, while the queue of the first stage is full.
+
+        :raises QueueClosed: if the pipeline is being drained.
+        """
+        await self.stages[0].queue.put(item)
+
+    async def put_many(self, items):
+        """
+        Puts the items into the pipeline. Waits, while the queue of the first stage is full.
+
+        :raises QueueClosed: if the pipeline is being drained.
+        """
+        await self.stages[0].queue.put_many(items)
+
+    async def drain(self, timeout=None):
+        """
+        Drains the pipeline gracefully.
+
+        It closes the queue of the first stage, waits until all the queued items are processed by all the stages,
+        then cancels the workers.
+
+        :param float timeout: The maximum time in seconds to wait for the items to be processed.
+            If it is elapsed, the remaining items are dropped.
+        """
+        if self.stages:
+            self.stages[0].queue.close()
+
+        try:
+            await asyncio.wait_for(self._join(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                "Pipeline {}: the drain timed out, dropping {} items",
+                self.name,
+                sum(stage.queue.qsize() for stage in self.stages),
+            )
+        await self.stop()
+
+    async def _join(self):
+        for stage in self.stages:
+            await stage.queue.join()
+
+    async def stop(self):
+        """
+        Cancels the workers immediately
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _stage_metrics(self, stage):
+        """
+        Returns with the ``(processed, errors, fill ratio)`` metrics of the stage, and registers the queue size gauge
+        """
+        labels = (self.name, stage.name)
+        labelnames = ["pipeline", "stage"]
+        self.metrics.gauge(
+            "pipeline_queue_size",
+            "The number of the items waiting in the queue of the stage",
+            labelnames,
+        ).labels(*labels).set_function(stage.queue.qsize)
+        processed = self.metrics.counter(
+            "pipeline_items_processed",
+            "The number of the items processed by the stage",
+            labelnames,
+        ).labels(*labels)
+        errors = self.metrics.counter(
+            "pipeline_errors",
+            "The number of the items the stage failed to process",
+            labelnames,
+        ).labels(*labels)
+        fill_ratio = self.metrics.histogram(
+            "pipeline_batch_fill_ratio",
+            "The size of the batches relative to the maximum batch size of the stage",
+            labelnames,
+            buckets=FILL_RATIO_BUCKETS,
+        ).labels(*labels)
+        return processed, errors, fill_ratio
+
+    async def _work(self, stage):
+        """
+        The worker task of a stage
+        """
+        processed, errors, fill_ratio = (None, None, None)
+        if self.metrics is not None:
+            processed, errors, fill_ratio = self._stage_metrics(stage)
+
+        queue = stage.queue
+        while True:
+            if stage.batch_size > 1:
+                items = await queue.get_many(stage.batch_size, stage.max_wait)
+                if fill_ratio is not None:
+                    fill_ratio.observe(len(items) / stage.batch_size)
+            else:
+                items = [await queue.get()]
+
+            try:
+                if stage.batch_size > 1:
+                    results = await stage.handler(items)
+                else:
+                    results = [await stage.handler(items[0])]
+
+                if stage.next_stage is not None and results:
+                    await stage.next_stage.queue.put_many(
+                        [result for result in results if result is not None]
+                    )
+                if processed is not None:
+                    processed.inc(len(items))
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                self.logger.opt(exception=True).error(
+                    "Pipeline {}: stage {} failed to process {} items: {}",
+                    self.name,
+                    stage.name,
+                    len(items),
+                    err,
+                )
+                if errors is not None:
+                    errors.inc(len(items))
+            finally:
+                queue.task_done(len(items))
@@ -0,0 +1,199 @@
+"""Test the pipeline module"""
+import asyncio
+import time
+import unittest
+from common.app import ApplicationBase, application_entrypoint, terminate
+from common.config import Config, ConfigEntry
+from common.logger import get_logger
+from common.metrics import MetricsRegistry
+from common.pipeline import BatchConsumer, Pipeline, StageQueue, QueueClosed
+
+
+class StageQueueTestCase(unittest.IsolatedAsyncioTestCase):
+    """The stage queue test cases"""
+
+    async def test_backpressure(self) -> None:
+        """Test that the put waits while the queue is full"""
+        queue = StageQueue(2)
+        await queue.put_many([1, 2])
+        put = asyncio.create_task(queue.put(3))
+        await asyncio.sleep(0.01)
+        self.assertFalse(put.done())
+
+        self.assertEqual(await queue.get_many(10), [1, 2])
+        await put
+        self.assertEqual(queue.qsize(), 1)
+
+        queue.close()
+        with self.assertRaises(QueueClosed):
+            await queue.put(4)
+        self.assertEqual(await queue.get(), 3)
+
+    async def test_get_many(self) -> None:
+        """Test that the get_many waits at most max_wait seconds for the batch to fill up"""
+        queue = StageQueue(10)
+
+        async def produce():
+            for item in range(5):
+                await queue.put(item)
+                await asyncio.sleep(0.01)
+
+        producer = asyncio.create_task(produce())
+        self.assertEqual(await queue.get_many(3, 1.0), [0, 1, 2])
+        self.assertEqual(await queue.get_many(3, 0.001), [3])
+        await producer
+        self.assertEqual(await queue.get_many(3), [4])
+
+
+class PipelineTestCase(unittest.IsolatedAsyncioTestCase):
+    """The pipeline test cases"""
+
+    async def test_stages_and_drain(self) -> None:
+        """Test that the items flow through the stages, and the drain processes all of them"""
+        metrics = MetricsRegistry()
+        pipeline = Pipeline(get_logger(), "test", metrics=metrics)
+        batches = []
+
+        async def double(item):
+            if item == 3:
+                raise ValueError("wrong value")
+            await asyncio.sleep(0.001)
+            return item * 2
+
+        async def collect(items):
+            batches.append(items)
+
+        pipeline.add_stage("double", double, workers=3, queue_size=2)
+        pipeline.add_stage("collect", collect, queue_size=4, batch_size=4)
+        pipeline.start()
+
+        await pipeline.put_many(range(10))
+        await pipeline.drain(timeout=5)
+
+        self.assertFalse(pipeline.started)
+        self.assertEqual(
+            sorted(item for batch in batches for item in batch),
+            [0, 2, 4, 8, 10, 12, 14, 16, 18],
+        )
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        rendered = metrics.render()
+        self.assertIn(
+            'pipeline_items_processed{pipeline="test",stage="collect"} 9', rendered
+        )
+        self.assertIn('pipeline_errors{pipeline="test",stage="double"} 1', rendered)
+        with self.assertRaises(QueueClosed):
+            await pipeline.put(11)
+
+
+class PipelineApplication(ApplicationBase):
+    """An application, that leaves items in its pipeline, when it terminates"""
+
+    processed = []
+
+    async def start(self):
+        async def process(item):
+            await asyncio.sleep(0.001)
+            self.processed.append(item)
+
+        pipeline = self.create_pipeline("app")
+        pipeline.add_stage("process", process, queue_size=5)
+        pipeline.start()
+
+    async def stop(self):
+        self.logger.info("app shuts down")
+
+    async def jobs(self):
+        await self.pipelines[0].put_many(range(20))
+        terminate()
+
+
+class HangingPipelinesApplication(ApplicationBase):
+    """An application, whose pipelines do not finish processing their items"""
+
+    async def start(self):
+        async def process(_item):
+            await asyncio.sleep(60)
+
+        for i in range(3):
+            pipeline = self.create_pipeline(f"hanging-{i}")
+            pipeline.add_stage("process", process)
+            pipeline.start()
+
+    async def stop(self):
+        self.logger.info("app shuts down")
+
+    async def jobs(self):
+        for pipeline in self.pipelines:
+            await pipeline.put(1)
+        terminate()
+
+
+class ApplicationPipelineTestCase(unittest.TestCase):
+    """The application pipeline test cases"""
+
+    def test_drain_on_stop(self) -> None:
+        """Test that the application drains its pipelines, when it shuts down"""
+        config = Config("test-app-name", "test-app-description", [])
+        self.assertEqual(
+            application_entrypoint(PipelineApplication, config, argv=[]), 0
+        )
+        self.assertEqual(PipelineApplication.processed, list(range(20)))
+
+    def test_drain_timeout_is_shared(self) -> None:
+        """Test that the drain timeout applies to all the pipelines together"""
+        config = Config(
+            "test-app-name",
+            "test-app-description",
+            [ConfigEntry(name="PIPELINE_DRAIN_TIMEOUT", default=0.4, entry_type=float)],
+        )
+        started = time.monotonic()
+        application_entrypoint(HangingPipelinesApplication, config, argv=[])
+        self.assertLess(time.monotonic() - started, 0.9)
+
+
+class BatchConsumerTestCase(unittest.IsolatedAsyncioTestCase):
+    """The batch consumer test cases"""
+
+    async def test_size_and_time_flush(self) -> None:
+        """Test that the batches are flushed when they are full, or the latency is elapsed"""
+        metrics = MetricsRegistry()
+        queue = asyncio.Queue()
+        batches = []
+
+        async def handler(items):
+            batches.append(items)
+
+        consumer = BatchConsumer(
+            get_logger(),
+            queue,
+            handler,
+            max_batch=4,
+            max_latency_ms=20,
+            name="test",
+            metrics=metrics,
+        )
+        for item in range(6):
+            queue.put_nowait(item)
+        consumer.start()
+        await asyncio.sleep(0.05)
+        self.assertEqual(batches, [[0, 1, 2, 3], [4, 5]])
+
+        queue.put_nowait(6)
+        await consumer.drain(timeout=1)
+        self.assertEqual(batches[-1], [6])
+        self.assertEqual(queue._unfinished_tasks, 0)  # pylint: disable=protected-access
+
+        lines = metrics.render().splitlines()
+        self.assertIn('batch_fill_ratio_bucket{consumer="test",le="0.3"} 1', lines)
+        self.assertIn('batch_fill_ratio_bucket{consumer="test",le="0.5"} 2', lines)
+        self.assertIn('batch_fill_ratio_count{consumer="test"} 3', lines)
+
+    async def test_bulk_ack(self) -> None:
+        """Test that the stage queue acks a batch at once"""
+        queue = StageQueue(10)
+        await queue.put_many(range(3))
+        items = await queue.get_many(3)
+        queue.task_done(len(items))
+        await asyncio.wait_for(queue.join(), 0.1)
+        with self.assertRaises(ValueError):
+            queue.task_done(1)
@@ -0,0 +1,6 @@
+"""
+This sub-module holds the startup profiler of the application.
+"""
+from .profiler import StartupProfiler, startup_profiler
+
+__all__ = ["profiler"]
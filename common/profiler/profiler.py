@@ -0,0 +1,93 @@
+"""
+The startup profiler module
+
+The startup profiler measures the duration of the phases of the application startup, and logs them
+as one structured record, when the application has started. It is turned on by the ``PROFILE_STARTUP``
+environment variable, e.g. ``PROFILE_STARTUP=1``. It is read directly from the environment,
+because the profiling starts before the configuration is resolved.
+
+The measured phases are:
+
+- ``imports``: the time elapsed since the ``common`` package was imported until the first measured phase,
+  that is mostly spent by importing the modules of the application,
+- ``config``: the resolution of the config parameters from the environment and the command-line,
+- ``init_logger``: the initialization of the logger,
+- ``health_check``: the import and the start of the health check server, incl. binding its port,
+- ``start``: the ``start()`` function of the application.
+
+The profiler module only depends on the standard library, so it can be imported before anything else.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+ENABLED_STRINGS = ("true", "t", "yes", "y", "on", "1")
+"""The values of the ``PROFILE_STARTUP`` environment variable that turn on the profiler"""
+
+
+class StartupProfiler:
+    """
+    Measures the duration of the startup phases
+    """
+
+    def __init__(self, enabled: bool):
+        """
+        Initializes the profiler, and starts the measurement of the ``imports`` phase
+
+        :param bool enabled: The profiler only measures if it is enabled.
+        """
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases = {}
+        self._reported = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        A context manager, that measures the duration of a phase
+
+        The durations of the phases with the same name are summed up.
+        The first measured phase closes the ``imports`` phase.
+
+        :param str name: The name of the phase.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started = time.perf_counter()
+        if not self.phases:
+            self.phases["imports"] = started - self.started
+        try:
+            yield
+        finally:
+            self.phases[name] = (
+                self.phases.get(name, 0.0) + time.perf_counter() - started
+            )
+
+    def report(self, logger):
+        """
+        Logs the durations of the phases as one structured record, once.
+
+        The durations are bound to the record as the ``startup_profile`` extra property in milliseconds.
+
+        :param logger: The application logger.
+        """
+        if not self.enabled or self._reported:
+            return
+
+        self._reported = True
+        profile = {
+            name: round(duration * 1000, 3) for name, duration in self.phases.items()
+        }
+        profile["total"] = round((time.perf_counter() - self.started) * 1000, 3)
+        logger.bind(startup_profile=profile).info(
+            "Startup profile: {}",
+            ", ".join(f"{name}={duration}ms" for name, duration in profile.items()),
+        )
+
+
+startup_profiler = StartupProfiler(
+    os.environ.get("PROFILE_STARTUP", "").strip().lower() in ENABLED_STRINGS
+)
+"""The startup profiler of the process"""
@@ -0,0 +1,83 @@
+"""Test the startup profiler module"""
+import os
+import subprocess
+import sys
+import unittest
+from common.logger import get_logger
+from common.profiler import StartupProfiler
+
+IMPORT_TIME_BUDGET = 1.0
+"""The maximum time in seconds, the import of the ``ApplicationBase`` class may take"""
+
+IMPORT_TIME_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+from common.app import ApplicationBase
+print(time.perf_counter() - started)
+print(",".join(name for name in ["aiohttp", "common.app.health_check"] if name in sys.modules))
+"""
+
+LAZY_IMPORT_SCRIPT = """
+import sys
+from common.config import Config
+from common.metrics import MetricsRegistry
+print(",".join(name for name in ["asyncio", "loguru", "common.app.app_base"] if name in sys.modules))
+"""
+
+
+def run_script(script):
+    """Runs the script in a new interpreter, and returns with the lines of its output"""
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    return result.stdout.splitlines()
+
+
+class StartupProfilerTestCase(unittest.TestCase):
+    """The startup profiler test cases"""
+
+    def test_phases_and_report(self) -> None:
+        """Test the measurement of the phases, and that the profile is reported once"""
+        profiler = StartupProfiler(True)
+        with profiler.phase("config"):
+            pass
+        with profiler.phase("start"):
+            pass
+        with profiler.phase("config"):
+            pass
+        self.assertEqual(list(profiler.phases), ["imports", "config", "start"])
+
+        records = []
+        logger = get_logger()
+        handler_id = logger.add(records.append, level="INFO")
+        try:
+            profiler.report(logger)
+            profiler.report(logger)
+        finally:
+            logger.remove(handler_id)
+
+        self.assertEqual(len(records), 1)
+        profile = records[0].record["extra"]["startup_profile"]
+        self.assertEqual(list(profile), ["imports", "config", "start", "total"])
+
+    def test_disabled(self) -> None:
+        """Test that the disabled profiler does not measure"""
+        profiler = StartupProfiler(False)
+        with profiler.phase("config"):
+            pass
+        self.assertEqual(profiler.phases, {})
+
+    def test_import_time_budget(self) -> None:
+        """Test that the import of ApplicationBase fits into the budget, and does not import the health check server"""
+        import_time, heavy_modules = run_script(IMPORT_TIME_SCRIPT)
+        self.assertLess(float(import_time), IMPORT_TIME_BUDGET)
+        self.assertEqual(heavy_modules, "")
+
+    def test_lazy_imports(self) -> None:
+        """Test that the config and the metrics can be used without importing the application machinery"""
+        self.assertEqual(run_script(LAZY_IMPORT_SCRIPT), [""])
@@ -27,6 +27,11 @@ REQUIRED = [
     "requests",
 ]
 
+# Optional packages, that make some parts of the library faster
+SPEEDUP_REQUIREMENTS = [
+    "orjson",
+]
+
 DEV_REQUIREMENTS = [
     "build",
     "coverage",
@@ -54,7 +59,7 @@ setup(
     packages=find_packages(exclude=("tests", "docs")),
     include_package_data=True,
     install_requires=REQUIRED,
-    extras_require={"dev": DEV_REQUIREMENTS},
+    extras_require={"dev": DEV_REQUIREMENTS, "speedups": SPEEDUP_REQUIREMENTS},
     entry_points={},
     classifiers=[
         "Programming Language :: Python",